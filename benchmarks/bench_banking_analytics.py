@@ -0,0 +1,168 @@
+"""
+Measures what streaming TransferAnalytics cost BankingSystem.transfer_batch,
+and how long a snapshot takes against recomputing the same figures from a
+full log of the accepted transfers.
+
+Transfers run in batches with no analytics, with TransferAnalytics and with
+a log of every accepted transfer, a snapshot taken after each batch. Then
+the sketches of several workers are pickled and merged as the sharded
+system does, checking the quantiles against the exact ones.
+
+Run with: python -m benchmarks.bench_banking_analytics [--transfers 1000000]
+"""
+
+import argparse
+import bisect
+import math
+import pickle
+import random
+import time
+
+from benchmarks.bench_banking_transfers import (
+    build_system,
+    check_conserved,
+    random_transfers,
+)
+from white_box.banking_analytics import TransferAnalytics
+from white_box.integration_exercises import BankingSystem
+from white_box.money import Money
+
+
+class TransferLog:
+    """
+    Analytics recomputed from a list of every accepted transfer.
+    """
+
+    def __init__(self):
+        self.transfers = []
+
+    def record(self, transaction_type, cents, fee):
+        """Appends the transfer to the log."""
+        self.transfers.append((transaction_type, cents, fee))
+
+    def snapshot(self):
+        """Groups the log by type, summing and sorting each group."""
+        groups = {}
+        for transaction_type, cents, fee in self.transfers:
+            groups.setdefault(transaction_type, []).append((cents, fee))
+        snapshot = {}
+        for transaction_type, group in groups.items():
+            amounts = sorted(cents for cents, _ in group)
+            snapshot[transaction_type] = {
+                "transfers": len(group),
+                "amount": Money(sum(amounts)),
+                "fees": Money(sum(fee for _, fee in group)),
+                "p50": Money(amounts[exact_rank(len(amounts), 0.5)]),
+                "p99": Money(amounts[exact_rank(len(amounts), 0.99)]),
+            }
+        return snapshot
+
+
+def exact_rank(count, fraction):
+    """
+    Returns the index of the `fraction` quantile among `count` sorted values,
+    ranked like KLLSketch.quantile.
+    """
+    return max(0, math.ceil(fraction * count) - 1)
+
+
+def run(transfers, batch, analytics=None):
+    """
+    Applies the transfers in batches, taking a snapshot after each one.
+    Returns the seconds spent in transfer_batch, the mean seconds per
+    snapshot and the last snapshot.
+    """
+    system = build_system(10_000, lambda: BankingSystem(analytics=analytics))
+    applying = snapshotting = 0.0
+    snapshot = None
+    for offset in range(0, len(transfers), batch):
+        start = time.perf_counter()
+        system.transfer_batch(transfers[offset : offset + batch])
+        applying += time.perf_counter() - start
+        if analytics is not None:
+            start = time.perf_counter()
+            snapshot = analytics.snapshot()
+            snapshotting += time.perf_counter() - start
+    check_conserved(system)
+    return applying, snapshotting / -(-len(transfers) // batch), snapshot
+
+
+def merge_workers(workers, per_worker):
+    """
+    Builds TransferAnalytics on `workers` streams of lognormal amounts, then
+    pickles and merges them. Returns the merged analytics, the exact
+    amounts, the bytes sent per worker and the merge seconds.
+    """
+    rng = random.Random(1)
+    pickled, amounts = [], []
+    for seed in range(workers):
+        analytics = TransferAnalytics(seed=seed)
+        for _ in range(per_worker):
+            cents = round(rng.lognormvariate(8, 1.5)) + 1
+            amounts.append(cents)
+            analytics.record("regular", cents, cents // 50)
+        pickled.append(pickle.dumps(analytics))
+    start = time.perf_counter()
+    merged = TransferAnalytics()
+    for data in pickled:
+        merged.merge(pickle.loads(data))
+    elapsed = time.perf_counter() - start
+    return merged, sorted(amounts), len(pickled[0]), elapsed
+
+
+def compare(transfers, batch):
+    """
+    Prints transfers/s and snapshot time without analytics, with sketches
+    and with a full log, checking the sketch totals against the log.
+    """
+    print(f"{'analytics':>10} {'transfers/s':>12} {'snapshot ms':>12}")
+    snapshots = []
+    for name, analytics in (
+        ("none", None),
+        ("sketch", TransferAnalytics()),
+        ("full log", TransferLog()),
+    ):
+        applying, snapshot_time, snapshot = run(transfers, batch, analytics)
+        snapshots.append(snapshot)
+        print(
+            f"{name:>10} {len(transfers) / applying:>12,.0f}"
+            f" {snapshot_time * 1000:>12,.3f}"
+        )
+    sketch, exact = snapshots[1], snapshots[2]
+    for key in ("transfers", "amount", "fees"):
+        assert {t: s[key] for t, s in sketch.items()} == {
+            t: s[key] for t, s in exact.items()
+        }
+    print(
+        "regular p50/p99: sketch"
+        f" {sketch['regular']['p50']}/{sketch['regular']['p99']},"
+        f" exact {exact['regular']['p50']}/{exact['regular']['p99']}"
+    )
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transfers", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    compare(random_transfers(random.Random(0), args.transfers, 10_000), args.batch)
+
+    merged, amounts, size, elapsed = merge_workers(args.workers, args.transfers)
+    print(
+        f"{args.workers} workers x {args.transfers:,} transfers:"
+        f" {size:,} bytes pickled per worker, merged in {elapsed * 1000:,.1f} ms"
+    )
+    for fraction in (0.5, 0.99):
+        estimate = merged.quantile("regular", fraction)
+        rank = bisect.bisect_left(amounts, estimate.cents) / len(amounts)
+        print(
+            f"  p{fraction * 100:g}: sketch {estimate} (exact rank {rank:.4f}),"
+            f" exact {Money(amounts[exact_rank(len(amounts), fraction)])}"
+        )
+
+
+if __name__ == "__main__":
+    main()
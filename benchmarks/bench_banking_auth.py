@@ -0,0 +1,129 @@
+"""
+Measures BankingSystem.authenticate logins per second with users held in a
+dict loaded from a credentials CSV file, and in a CredentialStore written
+from the same file.
+
+Three kinds of attempts are timed: logins of known users, wrong passwords
+and unknown usernames, the last mostly answered by the Bloom filter. Also
+reports the memory each way of holding the users takes.
+
+Run with: python -m benchmarks.bench_banking_auth [--users 1000000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from white_box.banking_auth import CredentialStore, iter_credentials, write_store
+from white_box.integration_exercises import BankingSystem
+from white_box.output_sinks import NullSink
+
+
+def write_csv(path, users):
+    """
+    Writes a credentials CSV file of `users` users.
+    """
+    with open(path, "w", encoding="utf-8") as stream:
+        stream.write("username,password\n")
+        for number in range(users):
+            stream.write(f"user{number},pw{number * 7919 % 1_000_003}\n")
+
+
+def traced(load):
+    """
+    Returns what `load()` returns and the bytes it left allocated.
+    """
+    tracemalloc.start()
+    loaded = load()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return loaded, size
+
+
+def load_dict(path):
+    """
+    Reads the credentials CSV file into a username -> password dict.
+    """
+    with open(path, encoding="utf-8", newline="") as stream:
+        return dict(iter_credentials(stream))
+
+
+def attempts(rng, users, count):
+    """
+    Returns `count` (username, password) attempts of each kind.
+    """
+    known = [
+        (f"user{number}", f"pw{number * 7919 % 1_000_003}")
+        for number in rng.sample(range(users), count)
+    ]
+    return {
+        "known": known,
+        "wrong password": [(username, "guess") for username, _ in known],
+        "unknown user": [
+            (f"nobody{rng.randrange(10**9)}", "guess") for _ in range(count)
+        ],
+    }
+
+
+def run(system, tries):
+    """
+    Authenticates every attempt. Returns the elapsed seconds.
+    """
+    authenticate = system.authenticate
+    start = time.perf_counter()
+    for username, password in tries:
+        authenticate(username, password)
+    return time.perf_counter() - start
+
+
+def compare(users, store, tries):
+    """
+    Prints the logins/s of each kind of attempt with the `users` dict and
+    with the store, each kind on fresh systems.
+    """
+    print(f"{'attempts':>15} {'dict/s':>12} {'store/s':>12}")
+    for kind, batch in tries.items():
+        rates = []
+        for credentials in (None, store):
+            system = BankingSystem(credentials=credentials, sink=NullSink())
+            if credentials is None:
+                system.users = users
+            rates.append(len(batch) / run(system, batch))
+        print(f"{kind:>15} {rates[0]:>12,.0f} {rates[1]:>12,.0f}")
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--attempts", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "credentials.csv")
+        store_path = os.path.join(directory, "credentials.store")
+        write_csv(csv_path, args.users)
+
+        users, dict_bytes = traced(lambda: load_dict(csv_path))
+        start = time.perf_counter()
+        with open(csv_path, encoding="utf-8", newline="") as stream:
+            write_store(store_path, iter_credentials(stream))
+        build = time.perf_counter() - start
+        store, store_bytes = traced(lambda: CredentialStore(store_path))
+
+        print(f"{args.users:,} users, store written in {build:.1f}s")
+        print(f"dict: {dict_bytes / 2**20:,.1f} MiB in memory")
+        print(
+            f"store: {store_bytes / 2**20:,.1f} MiB in memory,"
+            f" {os.path.getsize(store_path) / 2**20:,.1f} MiB file"
+        )
+        compare(users, store, attempts(random.Random(0), args.users, args.attempts))
+        print(store.info())
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
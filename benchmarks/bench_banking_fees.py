@@ -0,0 +1,66 @@
+"""
+Measures FeeSchedule.batch_fees against pricing transfers one call at a time.
+
+Uses the NumPy path when NumPy is installed and the pure Python fallback
+otherwise; the header line says which one ran.
+
+Run with: python -m benchmarks.bench_banking_fees [--transfers 10000000]
+"""
+
+import argparse
+import random
+import time
+
+from white_box import fee_schedule
+from white_box.fee_schedule import FeeSchedule
+from white_box.money import Money
+
+
+def random_batch(rng, schedule, count):
+    """
+    Builds `count` random amounts in cents and type codes, as NumPy arrays
+    when NumPy is available.
+    """
+    amounts = [rng.randint(1, 500_000) for _ in range(count)]
+    types = rng.choices(schedule.types, k=count)
+    codes = schedule.encode(types)
+    if fee_schedule.np is not None:
+        amounts = fee_schedule.np.array(amounts, dtype=fee_schedule.np.int64)
+    return amounts, codes, types
+
+
+def price(schedule, amount, transaction_type):
+    """
+    Returns the fee and total of one transfer in cents, the per-call
+    baseline.
+    """
+    fee = schedule.fee(Money(amount), transaction_type).cents
+    return fee, amount + fee
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transfers", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    schedule = FeeSchedule()
+    amounts, codes, types = random_batch(random.Random(0), schedule, args.transfers)
+
+    start = time.perf_counter()
+    fees, totals = schedule.batch_fees(amounts, codes)
+    batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [price(schedule, amount, kind) for amount, kind in zip(amounts, types)]
+    calls = time.perf_counter() - start
+
+    assert list(zip(fees, totals)) == single
+    path = "numpy" if fee_schedule.np is not None else "pure Python"
+    print(f"{args.transfers:,} transfers, {path} batch path")
+    print(f"batch_fees: {args.transfers / batch:,.0f} transfers/s")
+    print(f"per call:   {args.transfers / calls:,.0f} transfers/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Measures transfer_money with idempotency keys under a stream of retries.
+
+Requests arrive at `--keys-per-hour` on a simulated clock and a share of them
+are retries of a recent request. Reports throughput against transfers made
+without keys, the cache counters and the memory the run added, which stays
+flat once the cache is full however many keys go by.
+
+Run with: python -m benchmarks.bench_banking_idempotency [--requests 2000000]
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import resource
+import time
+
+from benchmarks.bench_banking_transfers import build_system, random_transfers
+from white_box.integration_exercises import (
+    IDEMPOTENCY_KEYS,
+    IDEMPOTENCY_TTL,
+    BankingSystem,
+)
+from white_box.lru_cache import TTLCache
+
+
+class SimulatedClock:  # pylint: disable=too-few-public-methods
+    """
+    Clock the benchmark moves forward one request at a time.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def requests(rng, transfers, retry_ratio):
+    """
+    Yields (key, transfer) requests, a `retry_ratio` share of them repeating
+    one of the last hundred.
+    """
+    recent = []
+    for number, transfer in enumerate(transfers):
+        if recent and rng.random() < retry_ratio:
+            yield recent[rng.randrange(len(recent))]
+            continue
+        request = (f"key-{number}", transfer)
+        recent.append(request)
+        if len(recent) > 100:
+            recent.pop(0)
+        yield request
+
+
+def run(system, batch, clock=None, step=0.0):
+    """
+    Sends the requests, with their keys when given a clock to move forward
+    `step` seconds per request. Returns the elapsed seconds.
+    """
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(
+        devnull
+    ):
+        start = time.perf_counter()
+        if clock is None:
+            for _, transfer in batch:
+                system.transfer_money(*transfer)
+        else:
+            for key, transfer in batch:
+                clock.now += step
+                system.transfer_money(*transfer, idempotency_key=key)
+        return time.perf_counter() - start
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1_000_000)
+    parser.add_argument("--keys-per-hour", type=float, default=2_000_000)
+    parser.add_argument("--retry-ratio", type=float, default=0.1)
+    parser.add_argument("--maxsize", type=int, default=IDEMPOTENCY_KEYS)
+    parser.add_argument("--ttl", type=float, default=IDEMPOTENCY_TTL)
+    parser.add_argument("--users", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    transfers = random_transfers(rng, args.requests, args.users)
+    batch = list(requests(rng, transfers, args.retry_ratio))
+    clock = SimulatedClock()
+
+    plain = build_system(args.users)
+    without_keys = run(plain, batch)
+
+    cache = TTLCache(args.maxsize, args.ttl, clock)
+    system = build_system(args.users, lambda: BankingSystem(idempotency_cache=cache))
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with_keys = run(system, batch, clock, 3600 / args.keys_per_hour)
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    info = cache.info()
+    print(f"without keys: {args.requests / without_keys:,.0f} requests/s")
+    print(f"with keys:    {args.requests / with_keys:,.0f} requests/s")
+    print(
+        f"hits {info['hits']:,} ({info['hits'] / args.requests:.1%}),"
+        f" evictions {info['evictions']:,}, expirations {info['expirations']:,},"
+        f" size {info['size']:,}/{info['maxsize']:,},"
+        f" peak RSS +{(after - before) / 1024:.0f} MiB"
+    )
+    window = min(args.ttl, args.maxsize / args.keys_per_hour * 3600)
+    print(f"retries recognized for {window / 60:,.1f} min")
+
+
+if __name__ == "__main__":
+    main()
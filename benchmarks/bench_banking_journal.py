@@ -0,0 +1,91 @@
+"""
+Measures journaled transfer throughput across group-commit window sizes.
+
+Each run journals the same transfers with a different `max_records` window,
+then recovers the journal into a fresh system and checks the rebuilt ledger
+matches. A window of 1 is an fsync per transfer.
+
+Run with: python -m benchmarks.bench_banking_journal [--windows 1 16 256 4096]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.bench_banking_transfers import (
+    build_system,
+    check_conserved,
+    random_transfers,
+)
+from white_box.banking_journal import TransferJournal, recover
+from white_box.integration_exercises import BankingSystem
+
+
+def run(path, transfers, users, window, max_delay):
+    """
+    Journals `transfers` with the given window. Returns the system, the
+    journal and the elapsed seconds.
+    """
+    with TransferJournal(path, max_records=window, max_delay=max_delay) as journal:
+        system = build_system(users, lambda: BankingSystem(journal=journal))
+        start = time.perf_counter()
+        system.transfer_batch(transfers)
+        journal.commit()
+        elapsed = time.perf_counter() - start
+    return system, journal, elapsed
+
+
+def check_recovered(path, system, users):
+    """
+    Asserts recovering the journal rebuilds the same balances and fees.
+    """
+    recovered = build_system(users)
+    recover(recovered, path)
+    assert recovered.fee_cents == system.fee_cents
+    for number, account in system.accounts.items():
+        assert recovered.account(number).cents == account.cents
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transfers", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--windows", type=int, nargs="+", default=[1, 16, 256, 4096])
+    parser.add_argument("--max-delay", type=float, default=0.01)
+    parser.add_argument(
+        "--fsync-budget",
+        type=int,
+        default=20_000,
+        help="cap on transfers per run so small windows finish",
+    )
+    args = parser.parse_args()
+
+    transfers = random_transfers(random.Random(0), args.transfers, args.users)
+    baseline = build_system(args.users)
+    start = time.perf_counter()
+    baseline.transfer_batch(transfers)
+    print(
+        f"no journal: {args.transfers / (time.perf_counter() - start):,.0f} transfers/s"
+    )
+
+    print(f"{'window':>7} {'transfers/s':>12} {'fsyncs':>8} {'MiB':>6}")
+    with tempfile.TemporaryDirectory() as directory:
+        for window in args.windows:
+            path = os.path.join(directory, f"window{window}.journal")
+            count = min(args.transfers, window * args.fsync_budget)
+            system, journal, elapsed = run(
+                path, transfers[:count], args.users, window, args.max_delay
+            )
+            check_conserved(system)
+            check_recovered(path, system, args.users)
+            print(
+                f"{window:>7} {count / elapsed:>12,.0f} {journal.commits:>8,}"
+                f" {os.path.getsize(path) / 2**20:>6.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
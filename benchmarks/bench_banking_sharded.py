@@ -0,0 +1,83 @@
+"""
+Measures ShardedBankingSystem.transfer_batch throughput as shards go from 1
+to 8, against one in-process BankingSystem.
+
+Random transfers cross shards more often as shards are added, each such
+transfer going through both phases. Checks after every run that no money
+was created or lost and that nothing was left in escrow. Throughput only
+scales with shards given as many free cores.
+
+Run with: python -m benchmarks.bench_banking_sharded [--shards 1 2 4 8]
+"""
+
+import argparse
+import os
+import random
+import time
+
+from benchmarks.bench_banking_transfers import (
+    build_system,
+    check_conserved,
+    random_transfers,
+)
+from white_box.banking_sharded import ShardedBankingSystem, shard_of
+from white_box.output_sinks import NullSink
+
+
+def run(system, transfers, batch):
+    """
+    Applies `transfers` in batches of `batch`. Returns the elapsed seconds.
+    """
+    start = time.perf_counter()
+    for offset in range(0, len(transfers), batch):
+        system.transfer_batch(transfers[offset : offset + batch])
+    return time.perf_counter() - start
+
+
+def check_sharded(system):
+    """
+    Asserts no money was created or lost, nor left in escrow.
+    """
+    totals = system.totals()
+    assert totals["escrow"] == 0
+    assert totals["held"] + totals["fees"] == totals["opened"]
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transfers", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--batch", type=int, default=50_000)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    transfers = random_transfers(random.Random(0), args.transfers, args.users)
+    users = {f"user{number}": "secret" for number in range(args.users)}
+
+    system = build_system(args.users)
+    elapsed = run(system, transfers, args.batch)
+    check_conserved(system)
+    print(f"{os.cpu_count()} cores, batches of {args.batch:,}")
+    print(f"{'shards':>7} {'transfers/s':>12} {'cross-shard':>12}")
+    print(f"{'single':>7} {args.transfers / elapsed:>12,.0f} {'-':>12}")
+
+    for shards in args.shards:
+        with ShardedBankingSystem(shards, sink=NullSink()) as system:
+            system.add_users(users)
+            for username in users:
+                system.authenticate(username, "secret")
+            elapsed = run(system, transfers, args.batch)
+            check_sharded(system)
+        crossing = sum(
+            shard_of(sender, shards) != shard_of(receiver, shards)
+            for sender, receiver, _, _ in transfers
+        )
+        print(
+            f"{shards:>7} {args.transfers / elapsed:>12,.0f}"
+            f" {crossing / args.transfers:>12.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
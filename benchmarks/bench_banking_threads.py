@@ -0,0 +1,94 @@
+"""
+Stress test and throughput of concurrent transfers as threads go from 1 to 32.
+
+Compares ConcurrentBankingSystem lock striping with a BankingSystem behind a
+single lock, and checks money is conserved after every run. With the GIL
+throughput stays roughly flat either way; on a free-threaded CPython build
+(python3.13t and later) striped transfers between unrelated accounts scale
+with the cores.
+
+Run with: python -m benchmarks.bench_banking_threads [--threads 1 2 4 8 16 32]
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+
+from benchmarks.bench_banking_transfers import (
+    build_system,
+    check_conserved,
+    random_transfers,
+)
+from white_box.banking_concurrent import ConcurrentBankingSystem
+from white_box.integration_exercises import BankingSystem
+
+
+class LockedBankingSystem(BankingSystem):
+    """
+    BankingSystem with every transfer behind one lock.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+
+    def transfer(self, *transfer):
+        """Applies one transfer under the lock."""
+        with self.lock:
+            return self.transfer_batch((transfer,))
+
+
+def run(system, transfers, threads):
+    """
+    Splits `transfers` between `threads` threads, each applying its share one
+    transfer at a time. Returns the elapsed seconds.
+    """
+
+    def work(share):
+        transfer = system.transfer
+        for item in share:
+            transfer(*item)
+
+    workers = [
+        threading.Thread(target=work, args=(transfers[number::threads],))
+        for number in range(threads)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transfers", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument(
+        "--switch-interval",
+        type=float,
+        default=sys.getswitchinterval(),
+        help="seconds between GIL switches, lower for more contention",
+    )
+    args = parser.parse_args()
+    sys.setswitchinterval(args.switch_interval)
+
+    transfers = random_transfers(random.Random(0), args.transfers, args.users)
+    print(f"{'threads':>7} {'striped/s':>12} {'one lock/s':>12}")
+    for threads in args.threads:
+        rates = []
+        for factory in (ConcurrentBankingSystem, LockedBankingSystem):
+            system = build_system(args.users, factory)
+            elapsed = run(system, transfers, threads)
+            check_conserved(system)
+            rates.append(args.transfers / elapsed)
+        print(f"{threads:>7} {rates[0]:>12,.0f} {rates[1]:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
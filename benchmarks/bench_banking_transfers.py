@@ -0,0 +1,93 @@
+"""
+Measures BankingSystem.transfer_batch throughput against transfer_money.
+
+Checks that money is conserved: the balances plus the collected fees always
+add up to what the accounts opened with.
+
+Run with: python -m benchmarks.bench_banking_transfers [--transfers 1000000]
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import time
+
+from white_box.fee_schedule import DEFAULT_RATES
+from white_box.integration_exercises import OPENING_BALANCE, BankingSystem
+
+
+def build_system(users, factory=BankingSystem):
+    """
+    Builds a `factory()` system with `users` registered and logged in users.
+    """
+    system = factory()
+    for number in range(users):
+        username = f"user{number}"
+        system.users[username] = "secret"
+        system.logged_in_users.add(username)
+    return system
+
+
+def random_transfers(rng, count, users):
+    """
+    Builds `count` transfers between random users, a few of them invalid.
+    """
+    types = [*DEFAULT_RATES, "invalid"]
+    return [
+        (
+            f"user{rng.randrange(users)}",
+            f"user{rng.randrange(users)}",
+            rng.randint(1, 60),
+            types[rng.randrange(len(types))] if rng.random() < 0.01 else "regular",
+        )
+        for _ in range(count)
+    ]
+
+
+def check_conserved(system):
+    """
+    Asserts no money was created or lost.
+    """
+    opened = OPENING_BALANCE * 100 * len(system.users)
+    held = sum(account.cents for account in system.accounts.values())
+    held += OPENING_BALANCE * 100 * (len(system.users) - len(system.accounts))
+    assert held + system.fee_cents == opened
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transfers", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    transfers = random_transfers(rng, args.transfers, args.users)
+
+    system = build_system(args.users)
+    start = time.perf_counter()
+    report = system.transfer_batch(transfers)
+    batch = time.perf_counter() - start
+    check_conserved(system)
+
+    sample = transfers[: max(1, args.transfers // 10)]
+    system = build_system(args.users)
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(
+        devnull
+    ):
+        start = time.perf_counter()
+        for transfer in sample:
+            system.transfer_money(*transfer)
+        single = time.perf_counter() - start
+    check_conserved(system)
+
+    print(
+        f"transfer_batch: {args.transfers / batch:,.0f} transfers/s"
+        f" ({len(report['accepted']):,} accepted, {len(report['rejected']):,} rejected)"
+    )
+    print(f"transfer_money: {len(sample) / single:,.0f} transfers/s")
+
+
+if __name__ == "__main__":
+    main()
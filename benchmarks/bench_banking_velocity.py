@@ -0,0 +1,120 @@
+"""
+Measures the cost of velocity limits on BankingSystem.transfer_batch and
+the memory they keep under millions of distinct senders.
+
+Transfers run in batches, the simulated clock moving one second per batch,
+without limits, with VelocityLimits and with limits that scan each sender's
+whole history on every transfer. Then VelocityLimits alone admits
+transfers from a stream of distinct senders to show the table stays within
+`maxsize` senders.
+
+Run with: python -m benchmarks.bench_banking_velocity [--senders 2000000]
+"""
+
+import argparse
+import random
+import resource
+import time
+
+from benchmarks.bench_banking_idempotency import SimulatedClock
+from benchmarks.bench_banking_transfers import (
+    build_system,
+    check_conserved,
+    random_transfers,
+)
+from white_box.banking_velocity import VelocityLimits
+from white_box.integration_exercises import BankingSystem
+
+# Window seconds, max transfers and max amount per sender.
+LIMIT = (60, 40, 1000)
+
+
+class ScanningLimits:  # pylint: disable=too-few-public-methods
+    """
+    Velocity limit on regular transfers recomputed from every transfer the
+    sender ever made.
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.history = {}
+
+    def admit(self, sender, cents, transaction_type, now):
+        """Scans the sender's history, then records the transfer."""
+        if transaction_type != "regular":
+            return True
+        window, count, amount = LIMIT
+        history = self.history.setdefault(sender, [])
+        recent = [spent for at, spent in history if at > now - window]
+        if len(recent) >= count or sum(recent) + cents > amount * 100:
+            return False
+        history.append((now, cents))
+        return True
+
+
+def run(transfers, batch, limits=None):
+    """
+    Applies the transfers in batches, one simulated second apart. Returns
+    the elapsed seconds and the number of velocity rejections.
+    """
+    clock = SimulatedClock()
+    if limits is not None:
+        limits = limits(clock)
+    system = build_system(10_000, lambda: BankingSystem(velocity_limits=limits))
+    rejected = 0
+    start = time.perf_counter()
+    for offset in range(0, len(transfers), batch):
+        report = system.transfer_batch(transfers[offset : offset + batch])
+        rejected += sum(reason == "velocity_limit" for _, reason in report["rejected"])
+        clock.now += 1
+    elapsed = time.perf_counter() - start
+    check_conserved(system)
+    return elapsed, rejected
+
+
+def distinct_senders(senders, maxsize):
+    """
+    Admits one transfer from each of `senders` distinct senders, a thousand
+    a second. Returns the admissions per second, the table counters and how
+    much the peak resident memory grew, in bytes.
+    """
+    limits = VelocityLimits({"regular": LIMIT}, maxsize=maxsize)
+    admit = limits.admit
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    for number in range(senders):
+        admit(f"sender{number}", 100, "regular", number / 1000)
+    elapsed = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return senders / elapsed, limits.info(), (after - before) * 1024
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transfers", type=int, default=500_000)
+    parser.add_argument("--batch", type=int, default=5_000)
+    parser.add_argument("--senders", type=int, default=2_000_000)
+    parser.add_argument("--maxsize", type=int, default=100_000)
+    args = parser.parse_args()
+
+    transfers = random_transfers(random.Random(0), args.transfers, 10_000)
+    print(f"{'limits':>10} {'transfers/s':>12} {'rejected':>10}")
+    for name, limits in (
+        ("none", None),
+        ("buckets", lambda clock: VelocityLimits({"regular": LIMIT}, clock=clock)),
+        ("scanning", ScanningLimits),
+    ):
+        elapsed, rejected = run(transfers, args.batch, limits)
+        print(f"{name:>10} {args.transfers / elapsed:>12,.0f} {rejected:>10,}")
+
+    rate, info, size = distinct_senders(args.senders, args.maxsize)
+    print(
+        f"{args.senders:,} distinct senders: {rate:,.0f} admissions/s,"
+        f" {info['senders']:,} tracked, peak memory +{size / 2**20:,.1f} MiB,"
+        f" {info['expirations']:,} expired, {info['evictions']:,} evicted"
+    )
+
+
+if __name__ == "__main__":
+    main()
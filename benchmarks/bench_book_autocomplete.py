@@ -0,0 +1,66 @@
+"""
+Measures BookStore.search latency for autocomplete-style queries.
+
+Run with: python -m benchmarks.bench_book_autocomplete [--sizes 100000 1000000]
+"""
+
+import argparse
+import random
+import time
+from itertools import islice
+
+from white_box.book_store import Book, BookStore
+
+WORDS = (
+    "dune night garden river shadow empire silent winter house storm glass "
+    "fire island letters ocean crown stone secret journey moon city song "
+    "forest dream memory light iron road paper queen wolf harbor"
+).split()
+NAMES = (
+    "ana luis maria jose frank jane leo emma carlos sofia ian marta hugo "
+    "clara diego elena pablo irene raul lucia"
+).split()
+
+
+def random_book(rng):
+    """
+    Builds a book with a few random words as title and a random author.
+    """
+    title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 4)))
+    author = f"{rng.choice(NAMES)} {rng.choice(NAMES)}son"
+    return Book(title.title(), author.title(), 9.99, 1)
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--limit", type=int, default=10, help="results per query")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'books':>10} {'build s':>9} {'mean us':>9} {'p99 us':>9}")
+    for size in args.sizes:
+        store = BookStore()
+        store.books.extend(random_book(rng) for _ in range(size))
+        start = time.perf_counter()
+        store.search("")
+        build = time.perf_counter() - start
+
+        latencies = []
+        for _ in range(args.queries):
+            word = rng.choice(WORDS + NAMES)
+            query = word[: rng.randint(2, len(word))]
+            start = time.perf_counter()
+            list(islice(store.search(query), args.limit))
+            latencies.append((time.perf_counter() - start) * 1e6)
+
+        latencies.sort()
+        mean = sum(latencies) / len(latencies)
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print(f"{size:>10} {build:>9.1f} {mean:>9.1f} {p99:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
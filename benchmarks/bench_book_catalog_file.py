@@ -0,0 +1,132 @@
+"""
+Measures BookStore cold start from a memory-mapped catalog file.
+
+Compares opening the catalog against reloading the same books from CSV, then
+times the first add_book, search_book, search and stats calls after opening
+it for the first time, which writes its title index, and after reopening it.
+The substring and stats indexes are not persisted and built on every open.
+Run with: python -m benchmarks.bench_book_catalog_file [--sizes 10000 1000000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from io import StringIO
+
+from white_box.book_store import Book, BookStore
+
+
+def write_catalogs(path, csv_path, size):
+    """
+    Writes the same `size` books to a catalog file and to a CSV file.
+    """
+    with BookStore.open(path).books as catalog, open(
+        csv_path, "w", encoding="utf-8"
+    ) as csv_file:
+        csv_file.write("title,author,price,quantity\n")
+        for start in range(0, size, 10_000):
+            batch = [
+                Book(f"Title {i}", f"Author {i % 5000}", 9.99, i % 9)
+                for i in range(start, min(size, start + 10_000))
+            ]
+            catalog.extend(batch)
+            csv_file.writelines(
+                f"{b.title},{b.author},{b.price},{b.quantity}\n" for b in batch
+            )
+
+
+def time_cold_start(path, size, reads, rng):
+    """
+    Returns the open time, the first read time and the mean random read time.
+    """
+    start = time.perf_counter()
+    store = BookStore.open(path)
+    opened = time.perf_counter()
+    last = store.books[size - 1]
+    first_read = time.perf_counter()
+    for _ in range(reads):
+        last = store.books[rng.randrange(size)]
+    done = time.perf_counter()
+    store.books.close()
+    del last
+    return opened - start, first_read - opened, (done - first_read) / reads
+
+
+def time_first_calls(path):
+    """
+    Returns the seconds taken by the first add_book, search_book, search and
+    stats calls on a freshly opened store, each building its indexes.
+    """
+    store = BookStore.open(path)
+    store.sink = StringIO()
+    calls = (
+        lambda: store.add_book(Book("Added", "Someone", 1.0, 1)),
+        lambda: store.search_book("Title 1"),
+        lambda: store.search("author 4"),
+        store.stats,
+    )
+    times = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+    store.books.close()
+    return times
+
+
+def bench_size(directory, size, reads, rng):
+    """
+    Prints the cold start and CSV reload times of a catalog of `size` books.
+    Returns the first call times after the first open, which writes the
+    title index, and after a second one, which reuses it.
+    """
+    path = os.path.join(directory, f"catalog-{size}.bin")
+    csv_path = os.path.join(directory, f"catalog-{size}.csv")
+    write_catalogs(path, csv_path, size)
+
+    opened, first_read, read = time_cold_start(path, size, reads, rng)
+    start = time.perf_counter()
+    BookStore().load_from(csv_path)
+    reload = time.perf_counter() - start
+    print(
+        f"{size:>10} {opened * 1e3:>9.2f} {first_read * 1e6:>14.1f}"
+        f" {read * 1e6:>15.2f} {reload:>13.2f}"
+    )
+    return time_first_calls(path), time_first_calls(path)
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--reads", type=int, default=1_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(
+        f"{'books':>10} {'open ms':>9} {'first read us':>14}"
+        f" {'random read us':>15} {'csv reload s':>13}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        firsts = [
+            (size, bench_size(directory, size, args.reads, rng)) for size in args.sizes
+        ]
+
+    print(
+        f"\n{'books':>10} {'open':>6} {'add_book ms':>12} {'search_book ms':>15}"
+        f" {'search s':>9} {'stats s':>8}"
+    )
+    for size, runs in firsts:
+        for name, (add, lookup, search, stats) in zip(("first", "again"), runs):
+            print(
+                f"{size:>10} {name:>6} {add * 1e3:>12.3f} {lookup * 1e3:>15.2f}"
+                f" {search:>9.2f} {stats:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Measures BookStore.display_books printing line by line vs. paged writes.
+
+Both variants write the same bytes to the null device.
+Run with: python -m benchmarks.bench_book_display [--books 100000]
+"""
+
+import argparse
+import os
+import time
+from contextlib import redirect_stdout
+
+from white_box.book_store import Book, BookStore
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=1_000)
+    args = parser.parse_args()
+
+    store = BookStore()
+    store.books.extend(
+        Book(f"Title {i}", f"Author {i % 1000}", 9.99, i % 7) for i in range(args.books)
+    )
+
+    # Line buffered like a terminal, so each print reaches the device.
+    with open(os.devnull, "w", encoding="utf-8", buffering=1) as devnull:
+        start = time.perf_counter()
+        with redirect_stdout(devnull):
+            store.display_books()
+        printed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store.display_books(out=devnull, page_size=args.page_size)
+        paged = time.perf_counter() - start
+
+    print(f"print per line: {printed * 1e3:8.1f} ms")
+    print(f"paged writes:   {paged * 1e3:8.1f} ms ({printed / paged:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Measures BookStore.fuzzy_search latency for misspelled titles.
+
+Titles are made of words drawn from a large random vocabulary, so that the
+catalog holds as many distinct titles as books. Queries are split by whether
+they go through the trigram filter or, when too short for it, the BK-trees.
+
+Run with: python -m benchmarks.bench_book_fuzzy [--sizes 100000 1000000]
+"""
+
+import argparse
+import random
+import time
+
+from white_box.book_search import trigrams
+from white_box.book_store import Book, BookStore
+
+LETTERS = "etaoinshrdlcumwfgypbvkjxqz"
+WEIGHTS = (12, 9, 8, 8, 7, 7, 6, 6, 6, 4, 4, 3, 3, 2, 2, 2, 2, 2, 2, 2, 1, 1) + (
+    0.2,
+) * 4
+
+
+def vocabulary(rng, size=30_000):
+    """
+    Builds `size` random words with roughly English letter frequencies.
+    """
+    return [
+        "".join(rng.choices(LETTERS, WEIGHTS, k=rng.randint(3, 9))) for _ in range(size)
+    ]
+
+
+def random_book(rng, words):
+    """
+    Builds a book whose title is one to five random words.
+    """
+    count = 1 if rng.random() < 0.05 else rng.randint(2, 5)
+    title = " ".join(rng.choice(words) for _ in range(count))
+    return Book(title.title(), "Anonymous", 9.99, 1)
+
+
+def misspell(title, rng):
+    """
+    Applies one random substitution, insertion or deletion to `title`.
+    """
+    position = rng.randrange(len(title))
+    letter = rng.choice(LETTERS)
+    edit = rng.randrange(3)
+    if edit == 0:
+        return title[:position] + letter + title[position + 1 :]
+    if edit == 1:
+        return title[:position] + letter + title[position:]
+    return title[:position] + title[position + 1 :]
+
+
+def latencies(store, queries, max_distance, limit=10):
+    """
+    Returns the sorted per-query latencies in milliseconds.
+    """
+    times = []
+    for query in queries:
+        start = time.perf_counter()
+        store.fuzzy_search(query, max_distance, limit)
+        times.append((time.perf_counter() - start) * 1e3)
+    return sorted(times)
+
+
+def split_by_path(queries, max_distance):
+    """
+    Groups queries by the search strategy fuzzy_search uses for them.
+    """
+    paths = {"trigram": [], "bk-tree": []}
+    for query in queries:
+        long_enough = len(trigrams(query.lower())) > 3 * max_distance
+        paths["trigram" if long_enough else "bk-tree"].append(query)
+    return paths
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--max-distance", type=int, default=2)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = vocabulary(rng)
+    print(
+        f"{'books':>10} {'path':>8} {'queries':>8} {'mean ms':>8} {'p99 ms':>8}"
+        f" {'cached us':>10}"
+    )
+    for size in args.sizes:
+        store = BookStore()
+        store.add_books(random_book(rng, words) for _ in range(size))
+        store.fuzzy_search("")
+
+        queries = [
+            misspell(store.books[rng.randrange(size)].title, rng)
+            for _ in range(args.queries)
+        ]
+        # Short single-word titles are rare; add some so both paths show up.
+        queries += [misspell(rng.choice(words), rng) for _ in range(args.queries // 5)]
+        for path, path_queries in split_by_path(queries, args.max_distance).items():
+            if not path_queries:
+                continue
+            # Build the BK-trees first; a different limit misses the cache.
+            latencies(store, path_queries, args.max_distance, limit=1)
+            times = latencies(store, path_queries, args.max_distance)
+            cached = latencies(store, path_queries, args.max_distance)
+            mean = sum(times) / len(times)
+            p99 = times[int(len(times) * 0.99)]
+            cached_mean = sum(cached) / len(cached) * 1e3
+            print(
+                f"{size:>10} {path:>8} {len(times):>8} {mean:>8.2f} {p99:>8.2f}"
+                f" {cached_mean:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
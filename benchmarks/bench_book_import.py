@@ -0,0 +1,72 @@
+"""
+Measures BookStore.load_from against one add_book call per row.
+
+Run with: python -m benchmarks.bench_book_import [--rows 2000000]
+"""
+
+import argparse
+import contextlib
+import os
+import tempfile
+import time
+import tracemalloc
+
+from white_box.book_import import iter_books
+from white_box.book_store import Book, BookStore
+
+
+def write_catalog(path, rows):
+    """
+    Writes a CSV catalog with `rows` books.
+    """
+    with open(path, "w", encoding="utf-8", newline="") as catalog:
+        catalog.write("title,author,price,quantity\n")
+        for i in range(rows):
+            catalog.write(f"Title {i},Author {i % 5000},{i % 50 + 0.99},{i % 9}\n")
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.csv")
+        write_catalog(path, args.rows)
+
+        store = BookStore()
+        report = store.load_from(path, batch_size=args.batch_size)
+        print(
+            f"load_from: {report['rows']} rows in {report['seconds']:.1f}s"
+            f" ({report['rows_per_second']:,.0f} rows/s)"
+        )
+
+        # Parsing alone must stay flat in memory whatever the file size.
+        tracemalloc.start()
+        with open(path, encoding="utf-8", newline="") as lines:
+            for _ in iter_books(lines, Book):
+                pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"parser peak memory: {peak / 1024:.0f} KiB")
+
+        sample = min(args.rows, 200_000)
+        store = BookStore()
+        with open(path, encoding="utf-8", newline="") as lines, open(
+            os.devnull, "w", encoding="utf-8"
+        ) as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            for book in iter_books(lines, Book):
+                store.add_book(book)
+                if len(store.books) == sample:
+                    break
+            seconds = time.perf_counter() - start
+        print(
+            f"add_book:  {sample} rows in {seconds:.1f}s ({sample / seconds:,.0f} rows/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Measures catalog memory per book with tracemalloc.
+
+Compares the old dict-backed Book, the slotted Book and BookColumns.
+Run with: python -m benchmarks.bench_book_memory [--books 1000000]
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from white_box.book_columns import BookColumns
+from white_box.book_store import Book
+
+
+class DictBook:  # pylint: disable=too-few-public-methods
+    """
+    Book as it was before slots: every instance carries a __dict__.
+    """
+
+    def __init__(self, title, author, price, quantity):
+        """DictBook init."""
+        self.title = title
+        self.author = author
+        self.price = price
+        self.quantity = quantity
+
+
+def rows(count):
+    """
+    Yields catalog rows with fresh strings and floats, as a parser would.
+    """
+    for i in range(count):
+        yield f"Some Book Title {i}", f"Author {i % 20000}", i % 50 + 0.99, i % 9
+
+
+def measure(build, count):
+    """
+    Returns the bytes per book held by the catalog that `build` returns.
+    """
+    gc.collect()
+    tracemalloc.start()
+    catalog = build(count)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del catalog
+    return current / count
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    layouts = {
+        "list of dict Book": lambda n: [DictBook(*row) for row in rows(n)],
+        "list of slotted Book": lambda n: [Book(*row) for row in rows(n)],
+        "BookColumns": lambda n: BookColumns(Book(*row) for row in rows(n)),
+    }
+    baseline = None
+    for name, build in layouts.items():
+        per_book = measure(build, args.books)
+        baseline = baseline or per_book
+        print(f"{name:>22}: {per_book:7.1f} bytes/book ({per_book / baseline:.0%})")
+
+
+if __name__ == "__main__":
+    main()
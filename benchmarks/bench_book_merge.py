@@ -0,0 +1,63 @@
+"""
+Measures adding resent supplier feeds with and without merge mode.
+
+Each feed resends mostly known titles, so without merging the store keeps
+growing with duplicate rows.
+
+Run with: python -m benchmarks.bench_book_merge [--feeds 10 --feed-size 100000]
+"""
+
+import argparse
+import random
+import time
+
+from white_box.book_store import Book, BookStore
+
+
+def feed(rng, size, titles):
+    """
+    Builds a supplier feed of `size` books drawn from `titles` distinct ones.
+    """
+    books = []
+    for _ in range(size):
+        number = rng.randrange(titles)
+        books.append(Book(f"Title {number}", f"Author {number % 500}", 9.99, 1))
+    return books
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--feeds", type=int, default=10)
+    parser.add_argument("--feed-size", type=int, default=100_000)
+    parser.add_argument("--titles", type=int, default=150_000)
+    args = parser.parse_args()
+
+    print(
+        f"{'mode':>7} {'rows':>10} {'inserted':>10} {'merged':>10} {'add s':>7}"
+        f" {'display ms':>11}"
+    )
+    for merge in (False, True):
+        rng = random.Random(0)
+        store = BookStore(merge_duplicates=merge)
+        elapsed = 0.0
+        for _ in range(args.feeds):
+            books = feed(rng, args.feed_size, args.titles)
+            start = time.perf_counter()
+            store.add_books(books)
+            elapsed += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in store.iter_display():
+            pass
+        display = time.perf_counter() - start
+        counts = store.add_counts()
+        print(
+            f"{'merge' if merge else 'append':>7} {len(store.books):>10,}"
+            f" {counts['inserted']:>10,} {counts['merged']:>10,} {elapsed:>7.1f}"
+            f" {display * 1e3:>11.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Compares BookStore price queries against a full scan and sort.
+
+Measures "books between $10 and $25" style range queries, reading the first
+page of results, and "the 50 cheapest in-stock books".
+
+Run with: python -m benchmarks.bench_book_prices [--sizes 100000 1000000]
+"""
+
+import argparse
+import random
+import time
+from functools import partial
+from itertools import islice
+
+from white_box.book_store import Book, BookStore
+
+
+def build_store(size, rng):
+    """
+    Builds a store with `size` books at random prices, one in ten out of stock.
+    """
+    store = BookStore()
+    store.add_books(
+        Book(
+            f"Title {i}",
+            f"Author {i % 1000}",
+            round(rng.uniform(1, 100), 2),
+            0 if rng.random() < 0.1 else rng.randint(1, 20),
+        )
+        for i in range(size)
+    )
+    return store
+
+
+def scan_range(books, low, high, limit):
+    """
+    Filters and sorts every book, the way it had to be done before.
+    """
+    found = sorted(
+        (book for book in books if low <= book.price <= high),
+        key=lambda book: book.price,
+    )
+    return found[:limit]
+
+
+def scan_cheapest(books, limit):
+    """
+    Sorts every in-stock book by price and keeps the first ones.
+    """
+    in_stock = (book for book in books if book.quantity > 0)
+    return sorted(in_stock, key=lambda book: book.price)[:limit]
+
+
+def index_range(store, low, high, limit):
+    """
+    Reads the first `limit` books of a range query on the price index.
+    """
+    return list(islice(store.books_in_price_range(low, high), limit))
+
+
+def index_cheapest(store, limit):
+    """
+    Reads the `limit` cheapest in-stock books from the price index.
+    """
+    return list(store.cheapest_books(limit))
+
+
+def time_queries(query, count):
+    """
+    Returns the mean latency of `count` calls to `query`, in microseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(count):
+        query()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--limit", type=int, default=50, help="results per query")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(
+        f"{'books':>10} {'query':>9} {'sort ms':>8} {'scan us':>10}"
+        f" {'index us':>9} {'speedup':>8}"
+    )
+    for size in args.sizes:
+        store = build_store(size, rng)
+        store.find_books("")
+        # The first price query sorts the buffered entries in.
+        start = time.perf_counter()
+        index_cheapest(store, 1)
+        sort = (time.perf_counter() - start) * 1e3
+
+        low = rng.uniform(1, 90)
+        queries = {
+            "range": (
+                partial(index_range, store, low, low + 15, args.limit),
+                partial(scan_range, store.books, low, low + 15, args.limit),
+            ),
+            "cheapest": (
+                partial(index_cheapest, store, args.limit),
+                partial(scan_cheapest, store.books, args.limit),
+            ),
+        }
+        for name, (index_query, scan_query) in queries.items():
+            assert index_query() == scan_query()
+            scan = time_queries(scan_query, 3)
+            index = time_queries(index_query, args.queries)
+            print(
+                f"{size:>10} {name:>9} {sort:>8.0f} {scan:>10,.0f}"
+                f" {index:>9.1f} {scan / index:>7,.0f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Replays a generated command log through white_box.book_replay.
+
+The log is written to a temporary file and replayed in a single streaming
+pass, so memory stays flat apart from the books the log adds.
+
+Run with: python -m benchmarks.bench_book_replay [--commands 10000000]
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import tempfile
+
+from white_box.book_replay import format_report, replay
+from white_box.book_store import Book, BookStore
+
+
+def write_log(path, commands, add_ratio, rng):
+    """
+    Writes a JSONL log of `commands` searches and adds.
+    """
+    added = 0
+    with open(path, "w", encoding="utf-8") as log:
+        for _ in range(commands):
+            if rng.random() < add_ratio:
+                record = {
+                    "command": "add",
+                    "title": f"New title {added}",
+                    "author": "Replay",
+                    "price": 9.99,
+                    "quantity": 1,
+                }
+                added += 1
+            else:
+                record = {"command": "search", "title": f"Title {rng.randrange(10**5)}"}
+            log.write(json.dumps(record) + "\n")
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commands", type=int, default=1_000_000)
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--add-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    store = BookStore()
+    store.add_books(
+        Book(f"Title {i}", f"Author {i % 500}", 9.99, 1) for i in range(args.books)
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "commands.jsonl")
+        write_log(path, args.commands, args.add_ratio, random.Random(0))
+        size = os.path.getsize(path)
+
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        report = replay(store, path)
+        after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(format_report(report))
+    print(
+        f"{args.commands / report['seconds']:,.0f} commands/s,"
+        f" log {size / 2**20:.0f} MiB, peak RSS +{(after - before) / 1024:.0f} MiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
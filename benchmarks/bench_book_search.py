@@ -0,0 +1,70 @@
+"""
+Compares BookStore.search_book against the old linear scan.
+
+Run with: python -m benchmarks.bench_book_search [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import random
+import time
+
+from white_box.book_store import Book, BookStore
+
+
+def build_store(size):
+    """
+    Builds a store with `size` books without going through the printing path.
+    """
+    store = BookStore()
+    store.books.extend(
+        Book(f"Title {i}", f"Author {i % 1000}", 9.99, i % 7) for i in range(size)
+    )
+    return store
+
+
+def linear_scan(books, title):
+    """
+    The search the store used to do: lowercase and compare every book.
+    """
+    return [book for book in books if book.title.lower() == title.lower()]
+
+
+def time_queries(search, queries):
+    """
+    Returns the mean latency of `search` over `queries`, in microseconds.
+    """
+    start = time.perf_counter()
+    for query in queries:
+        search(query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'books':>10} {'scan us/query':>15} {'index us/query':>15} {'speedup':>10}")
+    for size in args.sizes:
+        store = build_store(size)
+        store.find_books("")  # build the index outside the timed section
+        queries = [f"TITLE {rng.randrange(size * 2)}" for _ in range(args.queries)]
+        scan_queries = queries[: max(1, args.queries // 20)]
+
+        for query in scan_queries:
+            assert store.find_books(query) == linear_scan(store.books, query)
+
+        scan = time_queries(
+            lambda q, books=store.books: linear_scan(books, q), scan_queries
+        )
+        index = time_queries(store.find_books, queries)
+        print(f"{size:>10} {scan:>15.1f} {index:>15.3f} {scan / index:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
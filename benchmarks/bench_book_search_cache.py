@@ -0,0 +1,69 @@
+"""
+Measures BookStore.search_book with and without its result cache.
+
+Queries follow a Zipf-like popularity curve, so a few titles get most of the
+traffic, with an add every `--add-every` queries invalidating its title.
+
+Run with: python -m benchmarks.bench_book_search_cache [--cache-sizes 0 1024]
+"""
+
+import argparse
+import random
+import time
+from itertools import accumulate
+
+from white_box.book_store import Book, BookStore
+from white_box.output_sinks import NullSink
+
+
+def make_book(number):
+    """
+    Builds the book with the given number; every tenth one is a duplicate
+    title so searches render several books.
+    """
+    return Book(
+        f"Title {number // 10 if number % 10 == 0 else number}",
+        f"Author {number % 500}",
+        9.99,
+        number % 7,
+    )
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200_000)
+    parser.add_argument("--titles", type=int, default=10_000, help="distinct queries")
+    parser.add_argument("--add-every", type=int, default=100)
+    parser.add_argument("--cache-sizes", type=int, nargs="+", default=[0, 256, 1024])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    weights = list(accumulate(1 / rank for rank in range(1, args.titles + 1)))
+    titles = [f"title {rng.randrange(args.books)}" for _ in range(args.titles)]
+    queries = rng.choices(titles, cum_weights=weights, k=args.queries)
+
+    print(f"{'cache':>7} {'us/query':>9} {'hit rate':>9} {'evictions':>10}")
+    for cache_size in args.cache_sizes:
+        store = BookStore(search_cache_size=cache_size)
+        store.add_books(make_book(number) for number in range(args.books))
+        out = NullSink()
+        added = args.books
+        start = time.perf_counter()
+        for number, query in enumerate(queries):
+            store.search_book(query, out=out)
+            if number % args.add_every == 0:
+                store.add_books([make_book(added)])
+                added += 1
+        elapsed = time.perf_counter() - start
+
+        info = store.search_cache_info()
+        print(
+            f"{cache_size:>7} {elapsed / len(queries) * 1e6:>9.2f}"
+            f" {info['hits'] / len(queries):>9.1%} {info['evictions']:>10,}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Load generator for the BookStore asyncio server.
+
+Starts the server in its own process, opens many concurrent client
+connections against it, each one sending a mix of searches and adds, and
+reports requests per second and latency percentiles.
+Run with: python -m benchmarks.bench_book_server [--clients 1000]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import random
+import resource
+import time
+
+from white_box.book_server import BookServer
+from white_box.book_store import Book, BookStore
+
+
+def serve(connection, books):
+    """
+    Server process: fills a store, reports the port and serves forever.
+    """
+
+    async def run_server():
+        store = BookStore()
+        store.add_books(
+            Book(f"Title {i}", f"Author {i % 500}", 9.99, i % 7) for i in range(books)
+        )
+        server = await BookServer(store).start()
+        connection.send(server.sockets[0].getsockname()[1])
+        await server.serve_forever()
+
+    asyncio.run(run_server())
+
+
+async def client(port, args, rng, latencies):
+    """
+    Sends `args.requests` requests over one connection, recording latencies.
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for number in range(args.requests):
+        if rng.random() < args.add_ratio:
+            line = f"add\tNew title {rng.random()}\tLoad Generator\t9.99\t1\n"
+        else:
+            line = f"search\ttitle {rng.randrange(args.books)}\n"
+        start = time.perf_counter()
+        writer.write(line.encode())
+        while await reader.readline() != b"\n":
+            pass
+        latencies.append(time.perf_counter() - start)
+        if number == args.requests - 1:
+            writer.write(b"exit\n")
+    await writer.drain()
+    writer.close()
+
+
+async def run(port, args):
+    """
+    Runs every client against the server, returns the latencies and wall time.
+    """
+    rng = random.Random(0)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(client(port, args, rng, latencies) for _ in range(args.clients))
+    )
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=1_000)
+    parser.add_argument("--requests", type=int, default=20, help="per client")
+    parser.add_argument("--add-ratio", type=float, default=0.1)
+    parser.add_argument("--books", type=int, default=100_000)
+    args = parser.parse_args()
+
+    # Both processes hold one socket per client.
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = args.clients + 64
+    if soft < wanted:
+        limit = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    server = multiprocessing.Process(target=serve, args=(sender, args.books))
+    server.start()
+    try:
+        latencies, elapsed = asyncio.run(run(receiver.recv(), args))
+    finally:
+        server.terminate()
+        server.join()
+
+    latencies.sort()
+    print(f"clients:  {args.clients}")
+    print(f"requests: {len(latencies)} in {elapsed:.2f}s")
+    print(f"rps:      {len(latencies) / elapsed:,.0f}")
+    for percentile in (50, 99):
+        latency = latencies[int(len(latencies) * percentile / 100)]
+        print(f"p{percentile}:      {latency * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
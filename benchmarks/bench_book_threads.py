@@ -0,0 +1,130 @@
+"""
+Measures read throughput as reader threads go from 1 to 32.
+
+Compares ConcurrentBookStore snapshot reads with a BookStore guarded by a
+single lock, while one writer thread keeps adding books. On a free-threaded
+CPython build (python3.13t and later) snapshot reads scale with the cores;
+with the GIL both stay flat but snapshot readers never wait for the writer.
+
+Run with: python -m benchmarks.bench_book_threads [--threads 1 2 4 8 16 32]
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from itertools import islice
+
+from white_box.book_concurrent import ConcurrentBookStore
+from white_box.book_store import Book, BookStore
+
+
+class LockedBookStore:
+    """
+    BookStore behind one lock, the simplest thread-safe alternative.
+    """
+
+    def __init__(self):
+        self.store = BookStore()
+        self.lock = threading.Lock()
+
+    def add_books(self, books):
+        """Adds books under the lock."""
+        with self.lock:
+            self.store.add_books(books)
+
+    def find_books(self, title):
+        """Looks a title up under the lock."""
+        with self.lock:
+            return self.store.find_books(title)
+
+    def search(self, query):
+        """Runs a substring search under the lock."""
+        with self.lock:
+            return list(islice(self.store.search(query), 10))
+
+
+def make_book(number):
+    """
+    Builds the book with the given number.
+    """
+    return Book(f"Title {number}", f"Author {number % 500}", 9.99, 1)
+
+
+def read(store, seed, size, stop, counts):
+    """
+    Reader thread: alternates title lookups and substring searches until
+    `stop` is set, then records how many it ran.
+    """
+    rng = random.Random(seed)
+    reads = 0
+    while not stop.is_set():
+        store.find_books(f"title {rng.randrange(size)}")
+        list(islice(store.search(f"{rng.randrange(1000)}"), 10))
+        reads += 2
+    counts.append(reads)
+
+
+def write(store, first, stop, args):
+    """
+    Writer thread: adds `args.writes` batches of new books per second until
+    `stop` is set, so that it takes the same share of CPU at any thread count.
+    """
+    number = first
+    interval = 1 / args.writes
+    deadline = time.perf_counter()
+    while not stop.is_set():
+        store.add_books([make_book(number + i) for i in range(args.batch_size)])
+        number += args.batch_size
+        deadline += interval
+        time.sleep(max(deadline - time.perf_counter(), 0))
+
+
+def measure(store, threads, args):
+    """
+    Returns the reads per second of `threads` readers over `args.seconds`.
+    """
+    stop = threading.Event()
+    counts = []
+    workers = [
+        threading.Thread(target=read, args=(store, seed, args.books, stop, counts))
+        for seed in range(threads)
+    ]
+    workers.append(threading.Thread(target=write, args=(store, args.books, stop, args)))
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / (time.perf_counter() - start)
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--writes", type=int, default=100, help="batches per second")
+    parser.add_argument("--batch-size", type=int, default=10, help="books per batch")
+    args = parser.parse_args()
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+    print(f"{'threads':>8} {'locked r/s':>12} {'snapshot r/s':>13} {'speedup':>8}")
+    for threads in args.threads:
+        rates = []
+        for store in (LockedBookStore(), ConcurrentBookStore()):
+            store.add_books([make_book(number) for number in range(args.books)])
+            rates.append(measure(store, threads, args))
+        print(
+            f"{threads:>8} {rates[0]:>12,.0f} {rates[1]:>13,.0f}"
+            f" {rates[1] / rates[0]:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
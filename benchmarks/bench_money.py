@@ -0,0 +1,105 @@
+"""
+Compares floats, Decimals and integer cents for summing amounts and for
+pricing them with a percentage fee.
+
+Amounts are random whole-cent values generated in chunks so that memory
+stays flat however many are measured. Cents must match Decimal exactly;
+the float columns show how far they drift from it.
+
+Run with: python -m benchmarks.bench_money [--values 10000000] [--chunk 1000000]
+"""
+
+import argparse
+import random
+import time
+from array import array
+from decimal import ROUND_HALF_EVEN, Decimal
+
+from white_box.money import RATE_SCALE, divide_half_even, rate_ppm
+
+RATE = "0.015"
+CENT = Decimal("0.01")
+
+
+def chunks(seed, values, chunk):
+    """
+    Yields lists of random amounts in cents, `chunk` at a time.
+    """
+    rng = random.Random(seed)
+    while values > 0:
+        size = min(chunk, values)
+        yield [rng.randrange(1, 1_000_000) for _ in range(size)]
+        values -= size
+
+
+def run_float(amounts):
+    """Sums and prices float amounts, each fee rounded with round()."""
+    values = [cents / 100 for cents in amounts]
+    rate = float(RATE)
+    start = time.perf_counter()
+    total = sum(values)
+    summed = time.perf_counter()
+    fees = sum(round(value * rate, 2) for value in values)
+    end = time.perf_counter()
+    return summed - start, end - summed, total, fees
+
+
+def run_decimal(amounts):
+    """Sums and prices Decimal amounts, each fee quantized half to even."""
+    values = [Decimal(cents) / 100 for cents in amounts]
+    rate = Decimal(RATE)
+    start = time.perf_counter()
+    total = sum(values)
+    summed = time.perf_counter()
+    fees = sum((value * rate).quantize(CENT, ROUND_HALF_EVEN) for value in values)
+    end = time.perf_counter()
+    return summed - start, end - summed, total, fees
+
+
+def run_cents(amounts):
+    """Sums and prices integer cents held in an array, fees in parts per million."""
+    values = array("q", amounts)
+    ppm = rate_ppm(Decimal(RATE))
+    start = time.perf_counter()
+    total = sum(values)
+    summed = time.perf_counter()
+    fees = sum(divide_half_even([cents * ppm for cents in values]))
+    end = time.perf_counter()
+    return summed - start, end - summed, Decimal(total) / 100, Decimal(fees) / 100
+
+
+RUNNERS = (("float", run_float), ("decimal", run_decimal), ("cents", run_cents))
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--values", type=int, default=10_000_000)
+    parser.add_argument("--chunk", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    # Per type: summing seconds, fee seconds, total, fees.
+    results = {name: [0.0, 0.0, 0, 0] for name, _ in RUNNERS}
+    for amounts in chunks(args.seed, args.values, args.chunk):
+        for name, runner in RUNNERS:
+            result = results[name]
+            for index, value in enumerate(runner(amounts)):
+                result[index] += value
+
+    exact = results["decimal"]
+    assert results["cents"][2:] == exact[2:], "cents differ from Decimal"
+    print(f"{args.values:,} values, fee rate {RATE}, ppm scale {RATE_SCALE:,}")
+    print(
+        f"{'type':>8}{'sums/s':>14}{'fees/s':>14}{'total drift':>16}{'fee drift':>12}"
+    )
+    for name, (summing, pricing, total, fees) in results.items():
+        print(
+            f"{name:>8}{args.values / summing:>14,.0f}"
+            f"{args.values / pricing:>14,.0f}"
+            f"{Decimal(total) - exact[2]:>16.2E}{Decimal(fees) - exact[3]:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Measures message-heavy workloads with each output sink.
+
+The stdout sink prints line by line, which is what every class did before
+sinks; the others write to the same file (os.devnull by default) in bulk,
+from a background thread, or not at all.
+
+Run with: python -m benchmarks.bench_output_sinks [--operations 200000]
+"""
+
+import argparse
+import contextlib
+import os
+import time
+
+from benchmarks.bench_banking_transfers import build_system
+from white_box.book_store import Book, BookStore
+from white_box.integration_exercises import BankingSystem, Product, ShoppingCart
+from white_box.output_sinks import BufferedSink, NullSink, QueueSink, StdoutSink
+
+# Each workload sets up its objects and returns the part to measure.
+
+
+def add_books(sink, operations):
+    """Adds books one by one, one message each."""
+    store = BookStore(sink=sink)
+    books = [Book(f"Title {number}", "Author", 9.99, 1) for number in range(operations)]
+    return lambda: [store.add_book(book) for book in books]
+
+
+def display_books(sink, operations):
+    """Displays a store holding `operations` books."""
+    store = BookStore(sink=sink)
+    store.add_books(Book(f"Title {n}", "Author", 9.99, 1) for n in range(operations))
+    return store.display_books
+
+
+def transfer_money(sink, operations):
+    """Makes transfers between a thousand users."""
+    system = build_system(1000, lambda: BankingSystem(sink=sink))
+    transfers = [
+        (f"user{number % 1000}", f"user{number % 7}", 1, "regular")
+        for number in range(operations)
+    ]
+    return lambda: [system.transfer_money(*transfer) for transfer in transfers]
+
+
+def checkout(sink, operations):
+    """Views and checks out a three-product cart."""
+    cart = ShoppingCart(sink)
+    for name, price in (("Laptop", 1000), ("Mouse", 20), ("Desk", 300)):
+        cart.add_product(Product(name, price))
+    return lambda: [(cart.view_cart(), cart.checkout()) for _ in range(operations)]
+
+
+WORKLOADS = (add_books, display_books, transfer_money, checkout)
+
+
+def make_sinks(stream):
+    """
+    Returns (name, sink factory) pairs, the factories writing to `stream`.
+    """
+    return (
+        ("stdout", StdoutSink),
+        ("buffered", lambda: BufferedSink(stream)),
+        ("queue", lambda: QueueSink(stream)),
+        ("null", NullSink),
+    )
+
+
+def timed(workload, sink, operations):
+    """
+    Sets a workload up, then runs it and waits for its output to be
+    written. Returns the elapsed seconds.
+    """
+    run = workload(sink, operations)
+    start = time.perf_counter()
+    run()
+    for finish in ("flush", "close"):
+        getattr(sink, finish, lambda: None)()
+    return time.perf_counter() - start
+
+
+def main():
+    """Benchmark entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--operations", type=int, default=200_000)
+    parser.add_argument("--output", default=os.devnull)
+    args = parser.parse_args()
+
+    with open(args.output, "w", encoding="utf-8") as stream:
+        sinks = make_sinks(stream)
+        print(f"{'workload':>15}" + "".join(f"{name:>12}" for name, _ in sinks))
+        for workload in WORKLOADS:
+            rates = []
+            for _, factory in sinks:
+                with contextlib.redirect_stdout(stream):
+                    elapsed = timed(workload, factory(), args.operations)
+                rates.append(args.operations / elapsed)
+            print(
+                f"{workload.__name__:>15}"
+                + "".join(f"{rate:>12,.0f}" for rate in rates)
+            )
+        print("(operations/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Streaming analytics over accepted transfers: per transaction type counts,
+amount and fee totals, and amount quantiles.
+
+Totals are running sums. Quantiles come from a KLL sketch, which keeps a
+few hundred of the amounts seen, each standing for a power of two of them:
+every level holds items of the same weight, and a full level is sorted and
+every other item, starting at a random one of the first two, moves up a
+level with twice the weight. Levels get smaller capacities going down, save
+the bottom one buffering new values, so the sketch holds at most about
+4 * k items whatever the number of transfers, and a quantile is off by
+about 1.7 / k in rank. Sketches merge level by level, so
+workers can each keep one and send them over to be combined.
+"""
+
+import math
+import random
+
+from white_box.money import Money
+
+# Ratio between the capacities of consecutive levels, from the top down.
+DECAY = 2 / 3
+
+
+class KLLSketch:
+    """
+    Quantile sketch over a stream of numbers.
+    """
+
+    def __init__(self, k=200, seed=None):
+        """
+        Starts an empty sketch whose top level holds `k` items. Compactions
+        draw from a random generator seeded with `seed`.
+        """
+        if k < 2:
+            raise ValueError(f"Invalid sketch size {k!r}")
+        self.k = k
+        self.count = 0
+        # Items of weight 2 ** level, per level, and how many each holds
+        # before it is compacted.
+        self.levels = []
+        self._capacities = []
+        self._grow()
+        self._random = random.Random(seed)
+        # Count the sorted items and cumulative weights were built at.
+        self._sorted = (0, None, None)
+
+    def __len__(self):
+        """
+        Number of values seen.
+        """
+        return self.count
+
+    def _grow(self):
+        """
+        Adds a level on top and shrinks the capacities of those below,
+        except the bottom one, which buffers `k` new values between
+        compactions.
+        """
+        self.levels.append([])
+        height = len(self.levels)
+        self._capacities = [
+            math.ceil(self.k * DECAY ** (height - level - 1)) + 1
+            for level in range(height)
+        ]
+        self._capacities[0] = self.k + 1
+
+    def update(self, value):
+        """
+        Adds a value.
+        """
+        bottom = self.levels[0]
+        bottom.append(value)
+        self.count += 1
+        if len(bottom) >= self._capacities[0]:
+            self._compress()
+
+    def _compress(self):
+        """
+        Compacts every full level from the bottom up.
+        """
+        levels, capacities = self.levels, self._capacities
+        for level, items in enumerate(levels):
+            if len(items) < capacities[level]:
+                continue
+            if level + 1 == len(levels):
+                self._grow()
+                capacities = self._capacities
+            items.sort()
+            # An odd item out stays behind, so the weight is kept exactly.
+            kept = [items.pop()] if len(items) % 2 else []
+            levels[level + 1].extend(items[self._random.getrandbits(1) :: 2])
+            levels[level] = kept
+
+    def merge(self, other):
+        """
+        Adds the values seen by another sketch of the same size.
+        """
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge sketches of sizes {self.k} and {other.k}")
+        while len(self.levels) < len(other.levels):
+            self._grow()
+        for items, more in zip(self.levels, other.levels):
+            items.extend(more)
+        self.count += other.count
+        self._compress()
+
+    def quantile(self, fraction):
+        """
+        Returns the value at rank `fraction` (0.5 for the median) of those
+        seen, None when there are none.
+        """
+        if not 0 <= fraction <= 1:
+            raise ValueError(f"Invalid quantile {fraction!r}")
+        if not self.count:
+            return None
+        count, values, cumulative = self._sorted
+        if count != self.count:
+            weighted = sorted(
+                (value, 1 << level)
+                for level, items in enumerate(self.levels)
+                for value in items
+            )
+            cumulative, total = [], 0
+            for _, weight in weighted:
+                total += weight
+                cumulative.append(total)
+            values = [value for value, _ in weighted]
+            self._sorted = (self.count, values, cumulative)
+        rank = fraction * cumulative[-1]
+        # First item reaching the rank, by bisection on the cumulative weights.
+        low, high = 0, len(values) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if cumulative[middle] < rank:
+                low = middle + 1
+            else:
+                high = middle
+        return values[low]
+
+
+class TransferAnalytics:
+    """
+    Transfer count, amount and fee totals and an amount sketch per
+    transaction type, fed by BankingSystem.transfer_batch for every
+    accepted transfer.
+    """
+
+    def __init__(self, k=200, seed=None):
+        """
+        Starts with no transfers. Amounts go into KLLSketch(k, seed)
+        sketches.
+        """
+        self.k = k
+        self.seed = seed
+        # Transaction type -> [transfers, amount cents, fee cents, sketch].
+        self.metrics = {}
+
+    def _metric(self, transaction_type):
+        """
+        Returns the metric of a transaction type, created on first use.
+        """
+        metric = self.metrics.get(transaction_type)
+        if metric is None:
+            metric = [0, 0, 0, KLLSketch(self.k, self.seed)]
+            self.metrics[transaction_type] = metric
+        return metric
+
+    def record(self, transaction_type, cents, fee):
+        """
+        Accounts for an accepted transfer of `cents` that cost `fee` cents.
+        """
+        metric = self.metrics.get(transaction_type) or self._metric(transaction_type)
+        metric[0] += 1
+        metric[1] += cents
+        metric[2] += fee
+        metric[3].update(cents)
+
+    def merge(self, other):
+        """
+        Adds the transfers accounted for by another TransferAnalytics, such as
+        one kept by a worker process.
+        """
+        for transaction_type, (transfers, cents, fees, sketch) in other.metrics.items():
+            metric = self._metric(transaction_type)
+            metric[0] += transfers
+            metric[1] += cents
+            metric[2] += fees
+            metric[3].merge(sketch)
+
+    def quantile(self, transaction_type, fraction):
+        """
+        Returns the amount at rank `fraction` of the accepted transfers of a
+        type as Money, None when there are none.
+        """
+        metric = self.metrics.get(transaction_type)
+        cents = metric[3].quantile(fraction) if metric is not None else None
+        return None if cents is None else Money(cents)
+
+    def snapshot(self):
+        """
+        Returns {transaction_type: {transfers, amount, fees, p50, p99}}, the
+        sums and quantiles as Money. Costs a sort of the sketch items of the
+        types that changed since the last snapshot, a few hundred per type.
+        """
+        return {
+            transaction_type: {
+                "transfers": transfers,
+                "amount": Money(cents),
+                "fees": Money(fees),
+                "p50": Money(sketch.quantile(0.5)),
+                "p99": Money(sketch.quantile(0.99)),
+            }
+            for transaction_type, (
+                transfers,
+                cents,
+                fees,
+                sketch,
+            ) in self.metrics.items()
+        }
@@ -0,0 +1,358 @@
+"""
+Credential store and session table for BankingSystem logins.
+
+A credential store is one file, written once from (username, password)
+pairs and then memory-mapped:
+
+- an 8-byte magic header, the password salt, the user count and the Bloom
+  filter parameters,
+- the Bloom filter bits, padded to a multiple of 8 bytes,
+- the sorted index: the file offset of every record plus the end of the
+  last one, as little-endian 64-bit integers,
+- the records, sorted by username: the UTF-8 username followed by a 16-byte
+  keyed BLAKE2b digest of the username and password.
+
+Unknown usernames are nearly always turned away by the Bloom filter without
+touching the index; known ones are found by binary search over it, narrowed
+first by every FENCE-th username kept in memory. Only the index is copied
+into memory, 8 bytes per user, along with those fences; the usernames and
+digests stay in the mapped file and the OS page cache.
+"""
+
+import csv
+import hmac
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from hashlib import blake2b
+
+MAGIC = b"BKCRED01"
+# Salt, users, Bloom filter bits and hashes.
+HEADER = struct.Struct("<16sQQB")
+DIGEST_SIZE = 16
+SALT_SIZE = 16
+# Every FENCE-th username is kept in memory to narrow the binary search.
+FENCE = 32
+
+
+def password_digest(salt, username, password):
+    """
+    Returns the digest stored for a username and password.
+    """
+    return blake2b(
+        f"{username}\0{password}".encode(), digest_size=DIGEST_SIZE, key=salt
+    ).digest()
+
+
+def iter_credentials(lines):
+    """
+    Yields (username, password) pairs from CSV lines with a header naming
+    the `username` and `password` columns.
+    """
+    for row in csv.DictReader(lines):
+        yield row["username"], row["password"]
+
+
+class BloomFilter:
+    """
+    Set of byte strings that can answer "maybe" for keys never added, but
+    never "no" for a key that was, in `bits` bits set by `hashes` hash
+    functions.
+    """
+
+    def __init__(self, bits, hashes, data=None):
+        """
+        Starts empty, or over the bits in `data` when given.
+        """
+        self.bits = bits
+        self.hashes = hashes
+        self.data = bytearray((bits + 7) // 8) if data is None else data
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate=0.01):
+        """
+        Returns an empty filter sized so that, holding `capacity` keys, it
+        answers "maybe" for about `error_rate` of the keys it does not hold.
+        """
+        capacity = max(capacity, 1)
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        return cls(bits, max(1, round(bits / capacity * math.log(2))))
+
+    def _hash(self, key):
+        """
+        Returns the first bit position of a key and the step between its
+        positions, from the two halves of one digest.
+        """
+        digest = blake2b(key, digest_size=16).digest()
+        return (
+            int.from_bytes(digest[:8], "little"),
+            int.from_bytes(digest[8:], "little") | 1,
+        )
+
+    def add(self, key):
+        """
+        Adds a byte string.
+        """
+        position, step = self._hash(key)
+        bits, data = self.bits, self.data
+        for _ in range(self.hashes):
+            bit = position % bits
+            data[bit >> 3] |= 1 << (bit & 7)
+            position += step
+
+    def __contains__(self, key):
+        """
+        Whether the byte string may have been added, giving up at the first
+        bit not set.
+        """
+        position, step = self._hash(key)
+        bits, data = self.bits, self.data
+        for _ in range(self.hashes):
+            bit = position % bits
+            if not data[bit >> 3] & (1 << (bit & 7)):
+                return False
+            position += step
+        return True
+
+
+def write_store(path, credentials, error_rate=0.01):
+    """
+    Writes a credential store from (username, password) pairs, the last
+    password winning for repeated usernames, replacing `path` atomically.
+    Returns the number of users.
+    """
+    salt = os.urandom(SALT_SIZE)
+    digests = {
+        username.encode(): password_digest(salt, username, password)
+        for username, password in credentials
+    }
+    names = sorted(digests)
+    bloom = BloomFilter.for_capacity(len(names), error_rate)
+    for name in names:
+        bloom.add(name)
+
+    start = len(MAGIC) + HEADER.size + len(bloom.data)
+    start += -start % 8
+    index = array("Q")
+    offset = start + 8 * (len(names) + 1)
+    for name in names:
+        index.append(offset)
+        offset += len(name) + DIGEST_SIZE
+    index.append(offset)
+    if sys.byteorder != "little":
+        index.byteswap()
+
+    temporary = f"{os.fspath(path)}.tmp"
+    with open(temporary, "wb") as stream:
+        stream.write(MAGIC)
+        stream.write(HEADER.pack(salt, len(names), bloom.bits, bloom.hashes))
+        stream.write(bloom.data)
+        stream.write(bytes(start - stream.tell()))
+        stream.write(index)
+        for name in names:
+            stream.write(name)
+            stream.write(digests[name])
+    os.replace(temporary, path)
+    return len(names)
+
+
+class CredentialStore:  # pylint: disable=too-many-instance-attributes
+    """
+    Read-only username -> password digest lookups over a store file written
+    by write_store. Counts lookups, the ones the Bloom filter turned away
+    and the ones it let through for unknown users.
+    """
+
+    def __init__(self, path):
+        """
+        Maps the store at `path` and reads its index.
+        """
+        with open(path, "rb") as stream:
+            if stream.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a credential store")
+            self._map = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        self.salt, self._count, bits, hashes = HEADER.unpack_from(self._map, len(MAGIC))
+        start = len(MAGIC) + HEADER.size
+        self._bloom = BloomFilter(
+            bits, hashes, memoryview(self._map)[start : start + (bits + 7) // 8]
+        )
+        start += len(self._bloom.data)
+        start += -start % 8
+        self._index = array("Q")
+        self._index.frombytes(self._map[start : start + 8 * (self._count + 1)])
+        if sys.byteorder != "little":
+            self._index.byteswap()
+        self._fences = [self._username(row) for row in range(0, self._count, FENCE)]
+        self.lookups = 0
+        self.bloom_rejections = 0
+        self.false_positives = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        """
+        Number of users.
+        """
+        return self._count
+
+    def __contains__(self, username):
+        """
+        Whether `username` is a known user.
+        """
+        return self._find(username.encode()) is not None
+
+    def check(self, username, password):
+        """
+        Whether `password` is the password of the known user `username`.
+        """
+        row = self._find(username.encode())
+        if row is None:
+            return False
+        end = self._index[row + 1]
+        return hmac.compare_digest(
+            self._map[end - DIGEST_SIZE : end],
+            password_digest(self.salt, username, password),
+        )
+
+    def info(self):
+        """
+        Returns the counters along with the number of users.
+        """
+        return {
+            "users": self._count,
+            "lookups": self.lookups,
+            "bloom_rejections": self.bloom_rejections,
+            "false_positives": self.false_positives,
+        }
+
+    def close(self):
+        """
+        Unmaps the store.
+        """
+        self._bloom.data.release()
+        self._map.close()
+
+    def _username(self, row):
+        """
+        Returns the UTF-8 username of a row.
+        """
+        return self._map[self._index[row] : self._index[row + 1] - DIGEST_SIZE]
+
+    def _find(self, name):
+        """
+        Returns the row of the UTF-8 username `name`, or None when unknown.
+        The in-memory fences give the block of FENCE rows it would be in,
+        then a binary search over the mapped rows of that block finds it.
+        """
+        self.lookups += 1
+        if name not in self._bloom:
+            self.bloom_rejections += 1
+            return None
+        low = (bisect_right(self._fences, name) - 1) * FENCE
+        if low >= 0:
+            index, data = self._index, self._map
+            high = min(low + FENCE, self._count)
+            while low < high:
+                middle = (low + high) // 2
+                if data[index[middle] : index[middle + 1] - DIGEST_SIZE] < name:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low < self._count and self._username(low) == name:
+                return low
+        self.false_positives += 1
+        return None
+
+
+class SessionTable:
+    """
+    Set of logged in usernames whose sessions end `ttl` seconds after login.
+
+    Sessions are kept in login order, which is also expiry order, so each
+    login first drops the expired ones from the oldest end; past `maxsize`
+    sessions the oldest one is ended. Memory stays bounded by the users
+    active within `ttl`, and by `maxsize`, instead of growing forever.
+    """
+
+    def __init__(self, ttl=1800.0, maxsize=1_000_000, clock=time.monotonic):
+        """
+        Starts empty. `clock` returns the current time in seconds.
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self.expirations = 0
+        self.evictions = 0
+        # Username -> session expiry time, oldest login first.
+        self.expiry = OrderedDict()
+
+    def __contains__(self, username):
+        """
+        Whether `username` has a session that has not expired.
+        """
+        now = self.clock()
+        return self.expiry.get(username, now) > now
+
+    def __len__(self):
+        """
+        Number of sessions held, expired ones included until dropped.
+        """
+        return len(self.expiry)
+
+    def __iter__(self):
+        """
+        Iterates over the usernames with a live session.
+        """
+        now = self.clock()
+        return iter(
+            [username for username, expiry in self.expiry.items() if expiry > now]
+        )
+
+    def add(self, username):
+        """
+        Starts a session for `username`, or restarts its current one.
+        """
+        now = self.clock()
+        self.purge(now)
+        expiry = self.expiry
+        expiry[username] = now + self.ttl
+        expiry.move_to_end(username)
+        if len(expiry) > self.maxsize:
+            expiry.popitem(last=False)
+            self.evictions += 1
+
+    def update(self, usernames):
+        """
+        Starts a session for each username.
+        """
+        for username in usernames:
+            self.add(username)
+
+    def discard(self, username):
+        """
+        Ends the session of `username`, if any.
+        """
+        self.expiry.pop(username, None)
+
+    def purge(self, now=None):
+        """
+        Drops expired sessions from the oldest end. Returns how many.
+        """
+        now = self.clock() if now is None else now
+        expiry = self.expiry
+        dropped = 0
+        while expiry and next(iter(expiry.values())) <= now:
+            expiry.popitem(last=False)
+            dropped += 1
+        self.expirations += dropped
+        return dropped
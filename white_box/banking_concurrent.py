@@ -0,0 +1,173 @@
+"""
+Banking system safe to share between threads.
+
+Balances are guarded by lock striping: each account maps to one of a fixed
+set of locks, and a transfer holds the locks of both its accounts, always
+taken in stripe order so two transfers can never wait on each other. Transfers
+whose accounts fall on different stripes never contend.
+"""
+
+import threading
+
+from white_box.integration_exercises import BankingSystem
+from white_box.money import apply_rate, to_cents
+
+
+class ConcurrentBankingSystem(  # pylint: disable=too-many-instance-attributes
+    BankingSystem
+):
+    """
+    BankingSystem whose transfers can run from many threads at once.
+
+    Collected fees are kept per stripe, under the stripe locks already held,
+    so transfers never share a counter. Velocity limits and analytics are
+    shared by every sender, so each has a lock of its own, taken inside the
+    stripe locks; the journal locks itself. Retries sharing an idempotency
+    key are serialized on one of `stripes` key locks, and the cache they
+    share is only touched under its own lock.
+    """
+
+    def __init__(
+        self,
+        fee_schedule=None,
+        stripes=64,
+        sink=None,
+        *,
+        journal=None,
+        velocity_limits=None,
+        analytics=None,
+        **options,
+    ):  # pylint: disable=too-many-arguments
+        """
+        Sets up `stripes` balance locks on top of the usual system, built
+        with the same options as BankingSystem.
+        """
+        self._locks = tuple(threading.Lock() for _ in range(stripes))
+        self._stripe_fees = [0] * stripes
+        self._session_lock = threading.Lock()
+        self._accounts_lock = threading.Lock()
+        self._velocity_lock = threading.Lock()
+        self._analytics_lock = threading.Lock()
+        self._key_locks = tuple(threading.Lock() for _ in range(stripes))
+        self._cache_lock = threading.Lock()
+        super().__init__(
+            fee_schedule,
+            journal=journal,
+            sink=sink,
+            velocity_limits=velocity_limits,
+            analytics=analytics,
+            **options,
+        )
+
+    @property
+    def fee_cents(self):
+        """
+        Total fees collected across the stripes, in cents.
+        """
+        return sum(self._stripe_fees)
+
+    @fee_cents.setter
+    def fee_cents(self, value):
+        self._stripe_fees = [value] + [0] * (len(self._locks) - 1)
+
+    def stripe(self, account_number):
+        """
+        Returns the index of the lock guarding an account.
+        """
+        return hash(account_number) % len(self._locks)
+
+    def authenticate(self, username, password):
+        """
+        User authentication function, serialized so a user logs in once.
+        """
+        with self._session_lock:
+            return super().authenticate(username, password)
+
+    def account(self, account_number):
+        """
+        Returns the account, opening it on first use. Only opening an account
+        takes a lock; known accounts are a plain dictionary read.
+        """
+        account = self.accounts.get(account_number)
+        if account is None:
+            with self._accounts_lock:
+                account = super().account(account_number)
+        return account
+
+    def _keyed_reason(self, transfer, key, cache_lock=None):
+        """
+        Same as BankingSystem._keyed_reason, atomic for a given key so two
+        concurrent retries cannot both run the transfer.
+        """
+        with self._key_locks[hash(key) % len(self._key_locks)]:
+            return super()._keyed_reason(transfer, key, self._cache_lock)
+
+    def transfer(self, sender, receiver, amount, transaction_type):
+        """
+        Applies one transfer atomically with respect to every other transfer,
+        with the same checks, journaling and analytics as
+        BankingSystem.transfer_batch. Returns None when accepted and the
+        REJECTIONS key otherwise.
+        """
+        if sender not in self.logged_in_users:
+            return "not_authenticated"
+        ppm = self.fee_schedule.rates_ppm.get(transaction_type)
+        if ppm is None:
+            return "invalid_type"
+        cents = to_cents(amount)
+        if not cents > 0:
+            return "invalid_amount"
+        source, target = self.account(sender), self.account(receiver)
+        fee = apply_rate(cents, ppm)
+
+        transfer = (source, target, cents, fee, transaction_type)
+        first, second = sorted((self.stripe(sender), self.stripe(receiver)))
+        locks = self._locks
+        with locks[first]:
+            if first == second:
+                return self._move(transfer, first)
+            with locks[second]:
+                return self._move(transfer, first)
+
+    def _move(self, transfer, stripe):
+        """
+        Checks the funds and velocity limits of a (source, target, cents,
+        fee, transaction_type) transfer, then journals it, moves the money
+        and records it, once the locks of both accounts are held.
+        """
+        source, target, cents, fee, transaction_type = transfer
+        if source.cents < cents + fee:
+            return "insufficient_funds"
+        sender, receiver = source.account_number, target.account_number
+        if self.velocity_limits is not None:
+            with self._velocity_lock:
+                admitted = self.velocity_limits.admit(sender, cents, transaction_type)
+            if not admitted:
+                return "velocity_limit"
+        if self.journal is not None:
+            self.journal.append_transfer(sender, receiver, cents, fee, transaction_type)
+        source.cents -= cents + fee
+        target.cents += cents
+        self._stripe_fees[stripe] += fee
+        if self.analytics is not None:
+            with self._analytics_lock:
+                self.analytics.record(transaction_type, cents, fee)
+        return None
+
+    def transfer_batch(self, transfers):
+        """
+        Same as BankingSystem.transfer_batch, with every transfer applied
+        under its account locks so batches from several threads interleave
+        safely.
+        """
+        report = {"accepted": [], "rejected": []}
+        transfer = self.transfer
+        for position, (sender, receiver, amount, transaction_type) in enumerate(
+            transfers
+        ):
+            reason = transfer(sender, receiver, amount, transaction_type)
+            if reason is None:
+                report["accepted"].append(position)
+            else:
+                report["rejected"].append((position, reason))
+        return report
@@ -0,0 +1,218 @@
+"""
+Append-only binary journal of logins and accepted transfers.
+
+Each record is a header (payload length, CRC32, kind) followed by its payload.
+Records are appended through a buffered file and made durable by group
+commit: one fsync covers every record appended since the previous one, and
+happens once `max_records` records are pending or the oldest pending record
+is `max_delay` seconds old, a background thread committing groups that stop
+growing. A transfer is reported accepted as soon as its record is appended,
+before it is durable, so a crash can lose the transfers accepted within the
+last `max_delay` seconds (plus the time an fsync takes); call commit() to
+wait for durability. Recovery replays every intact record and drops a torn
+tail.
+"""
+
+import os
+import struct
+import threading
+import time
+import zlib
+
+LOGIN = 1
+TRANSFER = 2
+
+HEADER = struct.Struct("<IIB")
+# Transfer amount and fee, in cents.
+AMOUNTS = struct.Struct("<qq")
+SEPARATOR = "\0"
+
+fsync = getattr(os, "fdatasync", os.fsync)
+
+
+def encode_record(kind, payload):
+    """
+    Returns the bytes of a record.
+    """
+    return HEADER.pack(len(payload), zlib.crc32(payload, kind), kind) + payload
+
+
+def iter_records(stream):
+    """
+    Yields (end offset, kind, fields) for each intact record of a binary
+    stream, stopping at the first torn or corrupt one. Logins have fields
+    (username,), transfers (sender, receiver, amount, fee, transaction_type)
+    with the amount and fee in cents.
+    """
+    offset = stream.tell()
+    while True:
+        header = stream.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return
+        length, crc, kind = HEADER.unpack(header)
+        payload = stream.read(length)
+        if len(payload) < length or zlib.crc32(payload, kind) != crc:
+            return
+        offset += HEADER.size + length
+        if kind == LOGIN:
+            yield offset, kind, (payload.decode(),)
+        elif kind == TRANSFER:
+            amount, fee = AMOUNTS.unpack_from(payload)
+            sender, receiver, transaction_type = (
+                payload[AMOUNTS.size :].decode().split(SEPARATOR)
+            )
+            yield offset, kind, (sender, receiver, amount, fee, transaction_type)
+        else:
+            return
+
+
+class TransferJournal:  # pylint: disable=too-many-instance-attributes
+    """
+    Group-committed journal file, opened for appending. Safe to append to
+    from several threads.
+    """
+
+    def __init__(self, path, max_records=256, max_delay=0.005):
+        """
+        Opens (or creates) the journal at `path`. A transfer is durable once
+        `max_records` records are pending or `max_delay` seconds have passed
+        since the oldest pending one, whichever comes first, whether or not
+        more records arrive; commit and close flush the rest.
+        """
+        self.max_records = max_records
+        self.max_delay = max_delay
+        self._file = open(path, "ab")  # pylint: disable=consider-using-with
+        self._pending = 0
+        self._oldest = 0.0
+        self.records = 0
+        self.commits = 0
+        # Guards the file and counters; notified when a new group starts.
+        self._lock = threading.Condition()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="journal-flusher", daemon=True
+        )
+        self._flusher.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def append_login(self, username):
+        """
+        Appends a login record.
+        """
+        self._append(encode_record(LOGIN, username.encode()))
+
+    def append_transfer(
+        self, sender, receiver, amount, fee, transaction_type
+    ):  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        """
+        Appends an accepted transfer record, amount and fee in cents.
+        """
+        payload = (
+            AMOUNTS.pack(amount, fee)
+            + SEPARATOR.join((sender, receiver, transaction_type)).encode()
+        )
+        self._append(encode_record(TRANSFER, payload))
+
+    def _append(self, record):
+        """
+        Writes a record and commits when the group is full or old enough.
+        """
+        with self._lock:
+            self._file.write(record)
+            self.records += 1
+            if not self._pending:
+                self._oldest = time.monotonic()
+                self._lock.notify()
+            self._pending += 1
+            if (
+                self._pending >= self.max_records
+                or time.monotonic() - self._oldest >= self.max_delay
+            ):
+                self._commit()
+
+    def _flush_loop(self):
+        """
+        Background thread: commits each group once its oldest record is
+        `max_delay` seconds old, until the journal is closed.
+        """
+        with self._lock:
+            while not self._file.closed:
+                if not self._pending:
+                    self._lock.wait()
+                    continue
+                remaining = self._oldest + self.max_delay - time.monotonic()
+                if remaining > 0:
+                    self._lock.wait(remaining)
+                else:
+                    self._commit()
+
+    def _commit(self):
+        """
+        Flushes and fsyncs every pending record, the lock held.
+        """
+        if self._pending:
+            self._file.flush()
+            fsync(self._file.fileno())
+            self._pending = 0
+            self.commits += 1
+
+    def commit(self):
+        """
+        Flushes and fsyncs every pending record.
+        """
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        """
+        Commits pending records, closes the file and stops the flusher.
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._commit()
+                self._file.close()
+                self._lock.notify()
+        self._flusher.join()
+
+    def stats(self):
+        """
+        Returns the number of records, fsyncs and records not yet durable.
+        """
+        with self._lock:
+            return {
+                "records": self.records,
+                "commits": self.commits,
+                "pending": self._pending,
+            }
+
+
+def recover(system, path, truncate=True):
+    """
+    Rebuilds the logins and the account ledger of a fresh BankingSystem from
+    the journal at `path`. With `truncate`, a torn tail left by a crash is cut
+    off so the journal can be appended to again. Returns the number of logins
+    and transfers replayed and of bytes dropped.
+    """
+    report = {"logins": 0, "transfers": 0, "truncated_bytes": 0}
+    if not os.path.exists(path):
+        return report
+    end = 0
+    with open(path, "rb") as stream:
+        for end, kind, fields in iter_records(stream):
+            if kind == LOGIN:
+                system.logged_in_users.add(fields[0])
+                report["logins"] += 1
+            else:
+                sender, receiver, amount, fee, _ = fields
+                system.account(sender).cents -= amount + fee
+                system.account(receiver).cents += amount
+                system.fee_cents += fee
+                report["transfers"] += 1
+    report["truncated_bytes"] = os.path.getsize(path) - end
+    if truncate and report["truncated_bytes"]:
+        os.truncate(path, end)
+    return report
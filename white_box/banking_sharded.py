@@ -0,0 +1,349 @@
+"""
+Banking system hash-partitioned across worker processes.
+
+Each shard is a process owning a plain BankingSystem with its share of the
+users and accounts, driven over a multiprocessing pipe. A batch costs two
+round trips whatever its size, sent to every shard before any reply is
+read so the shards work in parallel:
+
+1. Prepare. Each shard applies the transfers whose sender it owns. A
+   transfer to an account on the same shard completes right away; one to
+   another shard debits the amount plus its fee from the sender and credits
+   the amount to the shard's escrow account, which is the sender's vote.
+2. Commit. For every reserved transfer the receiver's shard credits the
+   amount and the sender's shard releases it from escrow.
+
+Money waiting between the phases stays in escrow, so balances, escrow and
+fees always add up to what the accounts opened with. Each shard also keeps
+TransferAnalytics of the transfers its senders made, merged on request.
+"""
+
+import multiprocessing
+import zlib
+
+from white_box.banking_analytics import TransferAnalytics
+from white_box.fee_schedule import FeeSchedule
+from white_box.integration_exercises import (
+    MOCK_USERS,
+    OPENING_BALANCE,
+    BankingSystem,
+    transfer_message,
+)
+from white_box.money import Money, to_cents
+from white_box.output_sinks import NullSink, output
+
+# Account each shard holds cross-shard transfers in between the two phases.
+ESCROW = ("escrow",)
+
+
+def shard_of(account_number, shards):
+    """
+    Returns the shard owning an account, the same in every process and run.
+    """
+    return zlib.crc32(account_number.encode()) % shards
+
+
+class Shard:
+    """
+    One partition of the accounts, served from a worker process.
+    """
+
+    def __init__(self, rates):
+        """
+        Builds a BankingSystem without users pricing transfers with `rates`.
+        """
+        self.system = BankingSystem(
+            FeeSchedule(rates), sink=NullSink(), analytics=TransferAnalytics()
+        )
+        self.system.users.clear()
+
+    def add_users(self, users):
+        """
+        Registers username -> password pairs.
+        """
+        self.system.users.update(users)
+
+    def authenticate(self, username, password):
+        """
+        Logs a user in. Returns whether it worked and whether the password
+        was right, so a refusal can tell a user already logged in apart.
+        """
+        system = self.system
+        return (
+            system.authenticate(username, password),
+            system.users.get(username) == password,
+        )
+
+    def prepare(self, transfers):
+        """
+        Applies transfers from senders of this shard, cross-shard ones having
+        ESCROW as their receiver. Returns the transfer_batch report.
+        """
+        return self.system.transfer_batch(transfers)
+
+    def commit(self, deposits, released):
+        """
+        Credits (receiver, cents) deposits sent from other shards and releases
+        `released` cents of this shard's own reserved transfers from escrow.
+        """
+        account = self.system.account
+        for receiver, cents in deposits:
+            account(receiver).cents += cents
+        account(ESCROW).cents -= released
+
+    def balance(self, account_number):
+        """
+        Returns the balance of an account, in cents.
+        """
+        return self.system.account(account_number).cents
+
+    def totals(self):
+        """
+        Returns the cents opened, held by accounts, in escrow and collected
+        as fees on this shard. Users without an account yet still hold their
+        opening balance.
+        """
+        system = self.system
+        escrow = system.account(ESCROW).cents
+        unopened = len(system.users.keys() - system.accounts.keys())
+        return {
+            "opened": OPENING_BALANCE * 100 * len(system.users),
+            "held": sum(account.cents for account in system.accounts.values())
+            - escrow
+            + OPENING_BALANCE * 100 * unopened,
+            "escrow": escrow,
+            "fees": system.fee_cents,
+        }
+
+    def analytics(self):
+        """
+        Returns the TransferAnalytics of the transfers from this shard.
+        """
+        return self.system.analytics
+
+
+def serve(connection, rates):
+    """
+    Worker loop: runs (method name, arguments) requests against a Shard and
+    sends back the result, or the exception raised, until it gets None.
+    """
+    shard = Shard(rates)
+    while (request := connection.recv()) is not None:
+        name, args = request
+        try:
+            connection.send(getattr(shard, name)(*args))
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            connection.send(error)
+    connection.close()
+
+
+class ShardedBankingSystem:
+    """
+    BankingSystem spread over `shards` worker processes.
+
+    Transfers keep their order within a shard. A cross-shard credit lands in
+    the commit phase, after every debit of its batch, so money received from
+    another shard can only be spent from the next batch on.
+    """
+
+    def __init__(self, shards=4, fee_schedule=None, sink=None, context=None):
+        """
+        Starts the workers, with the `multiprocessing` start method context
+        `context` when given. Fees follow `fee_schedule`, the default
+        FeeSchedule when not given. Messages go to `sink`, the global sink
+        when None.
+        """
+        self.sink = sink
+        self.fee_schedule = FeeSchedule() if fee_schedule is None else fee_schedule
+        context = context or multiprocessing.get_context()
+        self._connections = []
+        self._workers = []
+        for _ in range(shards):
+            connection, remote = context.Pipe()
+            worker = context.Process(
+                target=serve, args=(remote, self.fee_schedule.rates), daemon=True
+            )
+            worker.start()
+            remote.close()
+            self._connections.append(connection)
+            self._workers.append(worker)
+        self._shards = {}
+        self.add_users(MOCK_USERS)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Stops the workers.
+        """
+        for connection, worker in zip(self._connections, self._workers):
+            if not connection.closed:
+                connection.send(None)
+                connection.close()
+            worker.join()
+
+    def shard(self, account_number):
+        """
+        Returns the index of the shard owning an account.
+        """
+        index = self._shards.get(account_number)
+        if index is None:
+            index = shard_of(account_number, len(self._connections))
+            self._shards[account_number] = index
+        return index
+
+    def _call(self, requests):
+        """
+        Sends {shard: (method name, arguments)} requests to their shards,
+        then collects the results once every shard has its request.
+        """
+        connections = self._connections
+        for index, request in requests.items():
+            connections[index].send(request)
+        results = {index: connections[index].recv() for index in requests}
+        for result in results.values():
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    def add_users(self, users):
+        """
+        Registers username -> password pairs on the shards owning them.
+        """
+        groups = {}
+        for username, password in users.items():
+            groups.setdefault(self.shard(username), {})[username] = password
+        self._call({index: ("add_users", (group,)) for index, group in groups.items()})
+
+    def authenticate(self, username, password):
+        """
+        User authentication function, run on the user's shard.
+        """
+        index = self.shard(username)
+        logged_in, known = self._call({index: ("authenticate", (username, password))})[
+            index
+        ]
+        if logged_in:
+            output(self.sink).write(f"User {username} authenticated successfully.\n")
+        elif known:
+            output(self.sink).write("User already logged in.\n")
+        else:
+            output(self.sink).write("Authentication failed.\n")
+        return logged_in
+
+    def balance(self, account_number):
+        """
+        Returns the balance of an account as Money.
+        """
+        index = self.shard(account_number)
+        return Money(self._call({index: ("balance", (account_number,))})[index])
+
+    def totals(self):
+        """
+        Returns the cents opened, held, in escrow and collected as fees,
+        summed over the shards.
+        """
+        results = self._call(
+            {index: ("totals", ()) for index in range(len(self._connections))}
+        )
+        return {
+            key: sum(totals[key] for totals in results.values())
+            for key in ("opened", "held", "escrow", "fees")
+        }
+
+    @property
+    def fees_collected(self):
+        """Fees collected so far on every shard, as Money."""
+        return Money(self.totals()["fees"])
+
+    def analytics(self):
+        """
+        Returns TransferAnalytics of the transfers accepted on every shard,
+        merged from the sketches each worker keeps.
+        """
+        results = self._call(
+            {index: ("analytics", ()) for index in range(len(self._connections))}
+        )
+        merged = TransferAnalytics()
+        for analytics in results.values():
+            merged.merge(analytics)
+        return merged
+
+    def transfer_money(self, sender, receiver, amount, transaction_type):
+        """
+        Function to perform a money transfer.
+        """
+        transfer = (sender, receiver, amount, transaction_type)
+        rejected = self.transfer_batch((transfer,))["rejected"]
+        reason = rejected[0][1] if rejected else None
+        output(self.sink).write(transfer_message(transfer, reason))
+        return reason is None
+
+    def _route(self, transfers):
+        """
+        Groups transfers by sender shard. Returns {shard: (transfers, batch
+        positions, {shard position: (receiver shard, receiver)})}, the last
+        for cross-shard transfers, whose receiver is replaced by ESCROW.
+        """
+        shards, shard = self._shards, self.shard
+        groups = [([], [], {}) for _ in self._connections]
+        for position, transfer in enumerate(transfers):
+            sender, receiver = transfer[0], transfer[1]
+            index = shards.get(sender)
+            if index is None:
+                index = shard(sender)
+            target = shards.get(receiver)
+            if target is None:
+                target = shard(receiver)
+            batch, positions, remote = groups[index]
+            if target != index:
+                remote[len(batch)] = (target, receiver)
+                transfer = (sender, ESCROW, transfer[2], transfer[3])
+            batch.append(transfer)
+            positions.append(position)
+        return {index: group for index, group in enumerate(groups) if group[0]}
+
+    def transfer_batch(self, transfers):  # pylint: disable=too-many-locals
+        """
+        Applies (sender, receiver, amount, transaction_type) transfers with
+        the two-phase protocol and returns the same report as
+        BankingSystem.transfer_batch: the positions of the accepted
+        transfers, then (position, REJECTIONS key) pairs for the rejected
+        ones.
+        """
+        groups = self._route(transfers)
+        reports = self._call(
+            {index: ("prepare", (group[0],)) for index, group in groups.items()}
+        )
+
+        report = {"accepted": [], "rejected": []}
+        deposits = {}
+        released = dict.fromkeys(groups, 0)
+        for index, (group, positions, remote) in groups.items():
+            prepared = reports[index]
+            report["accepted"].extend(
+                positions[local] for local in prepared["accepted"]
+            )
+            report["rejected"].extend(
+                (positions[local], reason) for local, reason in prepared["rejected"]
+            )
+            for local in prepared["accepted"]:
+                if local in remote:
+                    target, receiver = remote[local]
+                    cents = to_cents(group[local][2])
+                    deposits.setdefault(target, []).append((receiver, cents))
+                    released[index] += cents
+
+        commits = {
+            index: ("commit", ([], cents)) for index, cents in released.items() if cents
+        }
+        for index, pairs in deposits.items():
+            commits[index] = ("commit", (pairs, released.get(index, 0)))
+        self._call(commits)
+        report["accepted"].sort()
+        report["rejected"].sort()
+        return report
@@ -0,0 +1,220 @@
+"""
+Per-sender velocity limits: at most so many transfers, or so much money, per
+sender within a rolling window, configured per transaction type.
+
+Each sender's recent transfers are summed into a few time buckets per window
+instead of being kept one by one, so admitting a transfer only drops the
+buckets that left the window and bumps the newest one: amortized O(1) time
+and at most `buckets` + 1 buckets of memory per sender. A bucket leaves the
+window once all of it is older than the window, so the totals can include up
+to one bucket width of older transfers but never miss a recent one; limits
+err on the strict side.
+
+Senders are kept in order of their last admitted transfer. Each new sender
+first drops the senders whose whole window has passed from the oldest end.
+Past `maxsize` senders per transaction type, the least recently active one
+is evicted with its window still live, and its buckets are added to a
+count-min sketch per bucket: a few rows of counters, each indexed by a hash
+of the sender, whose minimum over the rows is never below the sender's true
+total. Senders are held to their table totals plus that estimate, so an
+evicted sender is never let through early, while others sharing its
+counters may be turned away a little early. Memory stays bounded whatever
+the number of distinct senders, and the sketch is only consulted once the
+table has overflowed within the window.
+"""
+
+import time
+from array import array
+from collections import OrderedDict
+from operator import itemgetter
+
+from white_box.money import to_cents
+
+# Rows and counters per row of the overflow sketches. With e.g. a million
+# evicted transfers in a window, a sender's count is over by at most
+# 1e6 * e / SKETCH_WIDTH (about 166) with probability 1 - exp(-SKETCH_DEPTH).
+SKETCH_DEPTH = 4
+SKETCH_WIDTH = 1 << 14
+
+
+def sketch_positions(sender):
+    """
+    Returns the counter of `sender` in each row of an overflow sketch.
+    """
+    return [
+        row * SKETCH_WIDTH + hash((row, sender)) % SKETCH_WIDTH
+        for row in range(SKETCH_DEPTH)
+    ]
+
+
+class VelocityLimits:
+    """
+    Velocity limits per transaction type, with the counters of the senders
+    seen recently.
+
+    Counts the transfers turned away, and the senders dropped because their
+    window passed (expirations) or moved to the overflow sketches because
+    the table was full (evictions).
+    """
+
+    def __init__(self, limits=None, maxsize=100_000, buckets=10, clock=time.monotonic):
+        """
+        Starts with the {transaction_type: (window seconds, max transfers,
+        max amount)} `limits`, None meaning no limit on that count or
+        amount. `clock` returns the current time in seconds.
+        """
+        self.maxsize = maxsize
+        self.buckets = buckets
+        self.clock = clock
+        self.rejections = 0
+        self.expirations = 0
+        self.evictions = 0
+        # Transaction type -> (bucket width, max transfers, max cents,
+        # sender -> [transfers, cents, bucket, transfers, cents, ...],
+        # bucket -> (transfer, cents) sketches of the evicted senders).
+        self._limits = {}
+        for transaction_type, limit in (limits or {}).items():
+            self.set_limit(transaction_type, *limit)
+
+    def set_limit(self, transaction_type, window, count=None, amount=None):
+        """
+        Limits senders to `count` transfers and `amount` currency units of
+        `transaction_type` transfers within `window` seconds, either None for
+        no limit. Forgets the senders seen so far for that type.
+        """
+        if window <= 0:
+            raise ValueError(f"Invalid velocity window {window!r}")
+        self._limits[transaction_type] = (
+            window / self.buckets,
+            count,
+            None if amount is None else to_cents(amount),
+            OrderedDict(),
+            {},
+        )
+
+    def remove_limit(self, transaction_type):
+        """
+        Stops limiting `transaction_type` transfers.
+        """
+        self._limits.pop(transaction_type, None)
+
+    def __len__(self):
+        """
+        Number of senders tracked across transaction types.
+        """
+        return sum(len(limit[3]) for limit in self._limits.values())
+
+    def admit(self, sender, cents, transaction_type, now=None):
+        """
+        Records a transfer of `cents` from `sender` and returns True when it
+        keeps the sender within the limits of its type, returns False and
+        records nothing otherwise.
+        """
+        limit = self._limits.get(transaction_type)
+        if limit is None:
+            return True
+        senders = limit[3]
+        if now is None:
+            now = self.clock()
+        bucket = now // limit[0]
+        # Oldest bucket still overlapping the window.
+        first = bucket - self.buckets
+
+        state = senders.get(sender)
+        known = state is not None
+        if not known:
+            state = [0, 0]
+        elif state[2] < first:
+            while len(state) > 2 and state[2] < first:
+                state[0] -= state[3]
+                state[1] -= state[4]
+                del state[2:5]
+        if self._over_limit(limit, sender, state, cents, first):
+            self.rejections += 1
+            if known and len(state) == 2:
+                del senders[sender]
+            return False
+
+        state[0] += 1
+        state[1] += cents
+        if len(state) > 2 and state[-3] == bucket:
+            state[-2] += 1
+            state[-1] += cents
+        else:
+            state += (bucket, 1, cents)
+        if known:
+            senders.move_to_end(sender)
+            return True
+
+        # Only new senders grow the table, so they make room for themselves.
+        while senders and next(iter(senders.values()))[-3] < first:
+            senders.popitem(last=False)
+            self.expirations += 1
+        senders[sender] = state
+        if len(senders) > self.maxsize:
+            self._evict(limit[4], *senders.popitem(last=False))
+            self.evictions += 1
+        return True
+
+    def _over_limit(
+        self, limit, sender, state, cents, first
+    ):  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        """
+        Whether `cents` more would take the sender past the limits, counting
+        the estimate of its transfers from `first` on kept in the overflow
+        sketches.
+        """
+        _, max_count, max_cents, _, overflow = limit
+        count, total = state[0], state[1]
+        if overflow:
+            evicted_count, evicted_cents = self._estimate(overflow, sender, first)
+            count += evicted_count
+            total += evicted_cents
+        return (max_count is not None and count >= max_count) or (
+            max_cents is not None and total + cents > max_cents
+        )
+
+    @staticmethod
+    def _evict(overflow, sender, state):
+        """
+        Adds the buckets of an evicted sender to the overflow sketches.
+        """
+        positions = sketch_positions(sender)
+        for index in range(2, len(state), 3):
+            bucket, count, cents = state[index : index + 3]
+            sketch = overflow.get(bucket)
+            if sketch is None:
+                size = SKETCH_DEPTH * SKETCH_WIDTH
+                sketch = overflow[bucket] = (
+                    array("q", [0]) * size,
+                    array("q", [0]) * size,
+                )
+            for position in positions:
+                sketch[0][position] += count
+                sketch[1][position] += cents
+
+    @staticmethod
+    def _estimate(overflow, sender, first):
+        """
+        Returns upper bounds on the transfers and cents of an evicted sender
+        in the buckets from `first` on, dropping the older sketches.
+        """
+        for bucket in [bucket for bucket in overflow if bucket < first]:
+            del overflow[bucket]
+        counters = itemgetter(*sketch_positions(sender))
+        count = cents = 0
+        for counts, amounts in overflow.values():
+            count += min(counters(counts))
+            cents += min(counters(amounts))
+        return count, cents
+
+    def info(self):
+        """
+        Returns the counters along with the number of senders tracked.
+        """
+        return {
+            "senders": len(self),
+            "rejections": self.rejections,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+        }
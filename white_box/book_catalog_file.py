@@ -0,0 +1,449 @@
+"""
+Memory-mapped on-disk book catalog.
+
+A catalog is made of two files, and a third once titles are looked up:
+
+- `<path>`: an 8-byte magic header followed by fixed-width records.
+- `<path>.heap`: the UTF-8 bytes of every title and author, back to back.
+- `<path>.titles`: the rows by lowercased title hash, see TitleIndex.
+
+Each record holds the heap offset and length of its title and author, the
+price and the quantity. Both files are only ever appended to, strings before
+the record that points at them, so readers mapping the files never see a
+record whose strings are missing. Any number of processes can map the same
+catalog and share the OS page cache, with a single one appending.
+"""
+
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+from operator import itemgetter
+from zlib import crc32
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - depends on the platform
+    fcntl = None
+
+MAGIC = b"BKCAT001"
+RECORD = struct.Struct("<QIQIdq")
+
+TITLES_MAGIC = b"BKTTL001"
+# Magic and number of sorted entries, then (title hash, row) entries.
+TITLES_HEADER = struct.Struct("<8sQ")
+ENTRY = struct.Struct("<QQ")
+# Entries appended since the last sort are merged in once there are more
+# than this many and more than a quarter of the sorted ones.
+COMPACT_MIN = 4096
+
+
+def title_hash(key):
+    """
+    Returns the hash of a lowercased title, the same in every process: its
+    CRC-32 and UTF-8 length. Collisions only cost a title decode, as every
+    row found is checked against the title.
+    """
+    data = key.encode()
+    return crc32(data) | len(data) << 32
+
+
+class CatalogFile:  # pylint: disable=too-many-instance-attributes
+    """
+    Sequence of books read lazily from a memory-mapped catalog.
+
+    Opening costs the same whatever the catalog size: nothing is read until
+    a row is asked for. Rows are decoded into fresh `book_class` objects on
+    every access, so changing those objects does not change the file.
+    """
+
+    def __init__(self, path, book_class):
+        """
+        Opens the catalog at `path`, creating it when missing.
+        """
+        path = os.fspath(path)
+        self.book_class = book_class
+        self._records = open(path, "a+b")  # pylint: disable=consider-using-with
+        self._heap = open(f"{path}.heap", "a+b")  # pylint: disable=consider-using-with
+        self._record_map = None
+        self._heap_map = None
+        self._titles = TitleIndex(f"{path}.titles")
+
+        size = os.fstat(self._records.fileno()).st_size
+        if size == 0:
+            self._records.write(MAGIC)
+            self._records.flush()
+            size = len(MAGIC)
+        else:
+            self._records.seek(0)
+            if self._records.read(len(MAGIC)) != MAGIC:
+                self.close()
+                raise ValueError(f"{path} is not a book catalog")
+
+        # A torn trailing record from a crashed writer is ignored.
+        self._count = (size - len(MAGIC)) // RECORD.size
+        self._heap_size = os.fstat(self._heap.fileno()).st_size
+
+    def __len__(self):
+        """
+        Number of books in the catalog.
+        """
+        return self._count
+
+    def __getitem__(self, row):
+        """
+        Reads and decodes the book at `row`.
+        """
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(self._count))]
+        if row < 0:
+            row += self._count
+        if not 0 <= row < self._count:
+            raise IndexError("book index out of range")
+
+        record_map, heap_map = self._maps()
+        title_offset, title_size, author_offset, author_size, price, quantity = (
+            RECORD.unpack_from(record_map, len(MAGIC) + row * RECORD.size)
+        )
+        return self.book_class(
+            heap_map[title_offset : title_offset + title_size].decode(),
+            heap_map[author_offset : author_offset + author_size].decode(),
+            price,
+            quantity,
+        )
+
+    def __iter__(self):
+        """
+        Iterates over every book, decoding one row at a time.
+        """
+        for row in range(self._count):
+            yield self[row]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def append(self, book):
+        """
+        Appends a book to the catalog.
+        """
+        self.extend((book,))
+
+    def extend(self, books):
+        """
+        Appends several books with one flush per file.
+        """
+        # Appending after a torn record would shift every later row.
+        self.refresh()
+        self._records.truncate(len(MAGIC) + self._count * RECORD.size)
+
+        records = bytearray()
+        strings = bytearray()
+        heap_size = self._heap_size
+        for book in books:
+            title = book.title.encode()
+            author = book.author.encode()
+            title_offset = heap_size + len(strings)
+            strings += title
+            author_offset = heap_size + len(strings)
+            strings += author
+            records += RECORD.pack(
+                title_offset,
+                len(title),
+                author_offset,
+                len(author),
+                book.price,
+                book.quantity,
+            )
+
+        self._heap.write(strings)
+        self._heap.flush()
+        self._records.write(records)
+        self._records.flush()
+        self._heap_size += len(strings)
+        self._count += len(records) // RECORD.size
+
+    def title(self, row):
+        """
+        Decodes only the title of the book at `row`.
+        """
+        record_map, heap_map = self._maps()
+        offset, size = RECORD.unpack_from(record_map, len(MAGIC) + row * RECORD.size)[
+            :2
+        ]
+        return heap_map[offset : offset + size].decode()
+
+    def iter_titles(self, start=0):
+        """
+        Yields the titles of the rows from `start` on, decoding nothing else.
+        """
+        record_map, heap_map = self._maps()
+        records = record_map[
+            len(MAGIC) + start * RECORD.size : len(MAGIC) + self._count * RECORD.size
+        ]
+        for offset, size, *_ in RECORD.iter_unpack(records):
+            yield heap_map[offset : offset + size].decode()
+
+    def index_titles(self):
+        """
+        Brings `<path>.titles` up to date with the catalog, creating it on
+        first use, and returns how many rows it covers: every row but those
+        appended by another process since. Only rows the index is missing
+        have their titles decoded.
+        """
+        with self._locked():
+            self.refresh()
+            return self._titles.sync(self)
+
+    def title_rows(self, key, stop):
+        """
+        Returns the rows below `stop` whose lowercased title is `key`, in row
+        order, through the title index, which index_titles must have covered
+        them with.
+        """
+        return [
+            row
+            for row in self._titles.lookup(title_hash(key), stop)
+            if self.title(row).lower() == key
+        ]
+
+    @contextmanager
+    def _locked(self):
+        """
+        Holds an exclusive lock on the catalog, where the platform has them,
+        so that processes update the title index one at a time.
+        """
+        if fcntl is None:  # pragma: no cover - depends on the platform
+            yield
+            return
+        fcntl.flock(self._records.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._records.fileno(), fcntl.LOCK_UN)
+
+    def refresh(self):
+        """
+        Picks up books appended by another process since the last call.
+        """
+        size = os.fstat(self._records.fileno()).st_size
+        self._count = (size - len(MAGIC)) // RECORD.size
+        self._heap_size = os.fstat(self._heap.fileno()).st_size
+
+    def close(self):
+        """
+        Unmaps and closes both files.
+        """
+        for mapping in (self._record_map, self._heap_map):
+            if mapping is not None:
+                mapping.close()
+        self._record_map = self._heap_map = None
+        self._titles.close()
+        self._records.close()
+        self._heap.close()
+
+    def _maps(self):
+        """
+        Returns the record and heap mappings, remapped if rows were appended
+        since they were made.
+        """
+        needed = len(MAGIC) + self._count * RECORD.size
+        if self._record_map is None or len(self._record_map) < needed:
+            if self._record_map is not None:
+                self._record_map.close()
+            self._record_map = mmap.mmap(
+                self._records.fileno(), 0, access=mmap.ACCESS_READ
+            )
+
+        if self._heap_size and (
+            self._heap_map is None or len(self._heap_map) < self._heap_size
+        ):
+            if self._heap_map is not None:
+                self._heap_map.close()
+            self._heap_map = mmap.mmap(self._heap.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return self._record_map, self._heap_map or b""
+
+
+class TitleIndex:
+    """
+    Rows of a catalog by the hash of their lowercased title, kept on disk.
+
+    The file holds a header, entries sorted by (hash, row), then the entries
+    of the rows appended since, in row order. Lookups bisect the sorted
+    entries through a memory map, so opening the index only reads the
+    appended entries and a lookup costs O(log n) whatever the catalog size.
+    Once the appended entries outgrow the sorted ones, they are merged into
+    a new file that replaces the old one.
+    """
+
+    def __init__(self, path):
+        """
+        Describes the index at `path`, opened on the first sync.
+        """
+        self.path = path
+        self._file = None
+        self._map = None
+        self._sorted = 0
+        # Title hash -> rows of the appended entries read so far.
+        self._appended = {}
+        self._end = 0
+        self.rows = 0
+
+    def sync(self, catalog):
+        """
+        Reads the entries other handles appended, adds those `catalog` is
+        missing and returns how many rows are covered. Called with the
+        catalog locked.
+        """
+        if not self._is_current():
+            self._open(catalog)
+        self._read_appended()
+        if self.rows > len(catalog):
+            # Left over from another catalog at the same path.
+            self._rewrite(catalog, [])
+        if self.rows < len(catalog):
+            self._file.truncate(self._end)
+            self._file.seek(self._end)
+            self._file.write(
+                b"".join(
+                    ENTRY.pack(title_hash(title.lower()), row)
+                    for row, title in enumerate(
+                        catalog.iter_titles(self.rows), self.rows
+                    )
+                )
+            )
+            self._file.flush()
+            self._read_appended()
+        if self.rows - self._sorted > max(COMPACT_MIN, self._sorted // 4):
+            self._rewrite(catalog, self._entries())
+        return self.rows
+
+    def lookup(self, key_hash, stop):
+        """
+        Returns the rows below `stop` indexed under `key_hash`, in row order.
+        """
+        mapping = self._map
+        low, high = 0, self._sorted
+        while low < high:
+            middle = (low + high) // 2
+            if (
+                ENTRY.unpack_from(mapping, TITLES_HEADER.size + middle * ENTRY.size)[0]
+                < key_hash
+            ):
+                low = middle + 1
+            else:
+                high = middle
+        rows = []
+        while low < self._sorted:
+            entry_hash, row = ENTRY.unpack_from(
+                mapping, TITLES_HEADER.size + low * ENTRY.size
+            )
+            if entry_hash != key_hash or row >= stop:
+                break
+            rows.append(row)
+            low += 1
+        rows += [row for row in self._appended.get(key_hash, ()) if row < stop]
+        return rows
+
+    def close(self):
+        """
+        Unmaps and closes the index file.
+        """
+        if self._map is not None:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+        self._map = self._file = None
+
+    def _is_current(self):
+        """
+        Whether the open file is still the one at self.path, which another
+        process may have replaced.
+        """
+        try:
+            return self._file is not None and os.stat(self.path).st_ino == (
+                os.fstat(self._file.fileno()).st_ino
+            )
+        except FileNotFoundError:
+            return False
+
+    def _open(self, catalog):
+        """
+        Opens the index file, first writing it from the catalog when it is
+        missing or not an index.
+        """
+        self.close()
+        try:
+            self._file = open(self.path, "r+b")  # pylint: disable=consider-using-with
+            magic, self._sorted = TITLES_HEADER.unpack(
+                self._file.read(TITLES_HEADER.size)
+            )
+            if magic != TITLES_MAGIC:
+                raise ValueError(f"{self.path} is not a title index")
+        except (FileNotFoundError, ValueError, struct.error):
+            self._rewrite(catalog, [])
+            return
+        self._map_sorted()
+
+    def _map_sorted(self):
+        """
+        Maps the header and sorted entries and resets the appended ones.
+        """
+        self._end = TITLES_HEADER.size + self._sorted * ENTRY.size
+        self._map = mmap.mmap(self._file.fileno(), self._end, access=mmap.ACCESS_READ)
+        self._appended = {}
+        self.rows = self._sorted
+
+    def _read_appended(self):
+        """
+        Reads the whole entries appended past what was read so far.
+        """
+        size = os.fstat(self._file.fileno()).st_size
+        count = (size - self._end) // ENTRY.size
+        if count <= 0:
+            return
+        self._file.seek(self._end)
+        data = self._file.read(count * ENTRY.size)
+        appended = self._appended
+        for entry_hash, row in ENTRY.iter_unpack(data):
+            appended.setdefault(entry_hash, []).append(row)
+        self._end += count * ENTRY.size
+        self.rows += count
+
+    def _entries(self):
+        """
+        Returns every (hash, row) entry read so far.
+        """
+        entries = list(ENTRY.iter_unpack(self._map[TITLES_HEADER.size :]))
+        entries += (
+            (entry_hash, row)
+            for entry_hash, rows in self._appended.items()
+            for row in rows
+        )
+        return entries
+
+    def _rewrite(self, catalog, entries):
+        """
+        Writes a new index holding `entries` sorted, plus the rows of the
+        catalog they do not cover, and swaps it in for the old one.
+        """
+        start = len(entries)
+        entries += (
+            (title_hash(title.lower()), row)
+            for row, title in enumerate(catalog.iter_titles(start), start)
+        )
+        # Rows are in order within each hash, sorted entries first, so a
+        # stable sort on the hash alone is enough.
+        entries.sort(key=itemgetter(0))
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "wb") as stream:
+            stream.write(TITLES_HEADER.pack(TITLES_MAGIC, len(entries)))
+            stream.write(b"".join(ENTRY.pack(*entry) for entry in entries))
+        os.replace(temporary, self.path)
+        self.close()
+        self._file = open(self.path, "r+b")  # pylint: disable=consider-using-with
+        self._sorted = len(entries)
+        self._map_sorted()
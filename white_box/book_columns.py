@@ -0,0 +1,197 @@
+"""
+Compact column store for very large book catalogs.
+"""
+
+from array import array
+
+from white_box.book_render import display
+
+
+class StringTable:
+    """
+    Append-only table of strings packed as UTF-8 in a single buffer.
+
+    With `intern` set, equal strings share one entry, which pays off for
+    repetitive columns such as authors. Mostly unique columns such as titles
+    are cheaper without the lookup dict.
+    """
+
+    def __init__(self, intern=False):
+        """
+        Starts with an empty table.
+        """
+        self.heap = bytearray()
+        self.offsets = array("q", (0,))
+        self.ids = {} if intern else None
+
+    def __len__(self):
+        """
+        Number of stored strings.
+        """
+        return len(self.offsets) - 1
+
+    def __getitem__(self, string_id):
+        """
+        Returns the string stored under `string_id`.
+        """
+        offsets = self.offsets
+        return self.heap[offsets[string_id] : offsets[string_id + 1]].decode()
+
+    def add(self, string):
+        """
+        Stores `string` and returns its id.
+        """
+        if self.ids is not None:
+            string_id = self.ids.get(string)
+            if string_id is not None:
+                return string_id
+            self.ids[string] = len(self)
+
+        self.heap += string.encode()
+        self.offsets.append(len(self.heap))
+        return len(self) - 1
+
+
+class BookView:
+    """
+    Book-like view over one row of a BookColumns store.
+    Reads and writes go straight to the columns.
+    """
+
+    __slots__ = ("columns", "row")
+
+    def __init__(self, columns, row):
+        """
+        Points the view at `row`.
+        """
+        self.columns = columns
+        self.row = row
+
+    def __eq__(self, other):
+        """
+        Views are equal when they point at the same row of the same store.
+        """
+        if not isinstance(other, BookView):
+            return NotImplemented
+        return self.columns is other.columns and self.row == other.row
+
+    def __hash__(self):
+        """
+        Hashes the row coordinates.
+        """
+        return hash((id(self.columns), self.row))
+
+    @property
+    def title(self):
+        """Book title."""
+        return self.columns.titles[self.columns.title_ids[self.row]]
+
+    @title.setter
+    def title(self, value):
+        self.columns.title_ids[self.row] = self.columns.titles.add(value)
+        if self.columns.store is not None:
+            self.columns.store.on_book_renamed(self)
+
+    @property
+    def author(self):
+        """Book author."""
+        return self.columns.authors[self.columns.author_ids[self.row]]
+
+    @author.setter
+    def author(self, value):
+        self.columns.author_ids[self.row] = self.columns.authors.add(value)
+        if self.columns.store is not None:
+            self.columns.store.on_book_renamed(self)
+
+    @property
+    def price(self):
+        """Book price."""
+        return self.columns.prices[self.row]
+
+    @price.setter
+    def price(self, value):
+        old_price = self.price
+        self.columns.prices[self.row] = value
+        if self.columns.store is not None:
+            self.columns.store.on_book_changed(self, old_price, self.quantity)
+
+    @property
+    def quantity(self):
+        """Units in stock."""
+        return self.columns.quantities[self.row]
+
+    @quantity.setter
+    def quantity(self, value):
+        old_quantity = self.quantity
+        self.columns.quantities[self.row] = value
+        if self.columns.store is not None:
+            self.columns.store.on_book_changed(self, self.price, old_quantity)
+
+    def display(self, out=None):
+        """Displays the book information, to the `out` sink when given."""
+        display(self, out)
+
+
+class BookColumns:
+    """
+    List-like book catalog stored column by column.
+
+    Titles and authors live in string tables, prices in an array('d') and
+    quantities in an array('q'). Indexing returns BookView objects built on
+    demand, so no per-book Python object is kept around. Price and quantity
+    changes made through views are reported to `store` when it is set.
+    """
+
+    def __init__(self, books=(), store=None):
+        """
+        Creates the columns, optionally filled with `books`.
+        """
+        self.store = store
+        self.titles = StringTable()
+        self.authors = StringTable(intern=True)
+        self.title_ids = array("q")
+        self.author_ids = array("q")
+        self.prices = array("d")
+        self.quantities = array("q")
+        self.extend(books)
+
+    def __len__(self):
+        """
+        Number of books.
+        """
+        return len(self.prices)
+
+    def __getitem__(self, row):
+        """
+        Returns a view of the book at `row`, or a list of views for a slice.
+        """
+        if isinstance(row, slice):
+            return [BookView(self, i) for i in range(*row.indices(len(self)))]
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("book index out of range")
+        return BookView(self, row)
+
+    def __iter__(self):
+        """
+        Iterates over views of every book.
+        """
+        for row in range(len(self)):
+            yield BookView(self, row)
+
+    def append(self, book):
+        """
+        Copies the fields of any Book-like object into a new row.
+        """
+        self.title_ids.append(self.titles.add(book.title))
+        self.author_ids.append(self.authors.add(book.author))
+        self.prices.append(book.price)
+        self.quantities.append(book.quantity)
+
+    def extend(self, books):
+        """
+        Appends every book of the iterable.
+        """
+        for book in books:
+            self.append(book)
@@ -0,0 +1,252 @@
+"""
+Book store safe to share between threads.
+
+Writers are serialized by a lock and publish a new immutable snapshot after
+every change. Readers grab the current snapshot with a single attribute read
+and never block nor see a half-applied write.
+"""
+
+import threading
+from itertools import chain, islice
+
+from white_box.book_render import iter_pages, render_page
+from white_box.book_search import TrigramIndex, iter_matches
+from white_box.output_sinks import output
+
+FIELDS = ("title", "author")
+
+
+class Segment:
+    """
+    Frozen indexes over the books in rows [start, stop).
+
+    Segments are built by the writer and never changed once published, so
+    readers can use them without locking.
+    """
+
+    __slots__ = ("start", "stop", "titles", "search_indexes")
+
+    def __init__(self, start, stop, titles, search_indexes):
+        """
+        Wraps already built indexes.
+        """
+        self.start = start
+        self.stop = stop
+        self.titles = titles
+        self.search_indexes = search_indexes
+
+    def __len__(self):
+        """
+        Number of books covered.
+        """
+        return self.stop - self.start
+
+    @classmethod
+    def build(cls, books, start, stop):
+        """
+        Indexes the books in rows [start, stop).
+        """
+        titles = {}
+        search_indexes = {field: TrigramIndex() for field in FIELDS}
+        for row in range(start, stop):
+            book = books[row]
+            titles.setdefault(book.title.lower(), []).append(row)
+            for field in FIELDS:
+                search_indexes[field].add(row, getattr(book, field))
+        return cls(start, stop, titles, search_indexes)
+
+    def merge(self, other):
+        """
+        Returns a new segment covering this one followed by `other`.
+        """
+        titles = {key: list(rows) for key, rows in self.titles.items()}
+        for key, rows in other.titles.items():
+            titles.setdefault(key, []).extend(rows)
+
+        search_indexes = {}
+        for field in FIELDS:
+            merged = TrigramIndex()
+            merged.postings = dict(self.search_indexes[field].postings)
+            for gram, posting in other.search_indexes[field].postings.items():
+                if gram in merged.postings:
+                    merged.postings[gram] = merged.postings[gram] + posting
+                else:
+                    merged.postings[gram] = posting
+            merged.size = other.stop
+            search_indexes[field] = merged
+        return Segment(self.start, other.stop, titles, search_indexes)
+
+
+class Snapshot:
+    """
+    Read-only view of a ConcurrentBookStore at one version.
+
+    `books` is the store's append-only list; only its first `count` rows
+    belong to this snapshot.
+    """
+
+    __slots__ = ("version", "books", "count", "segments")
+
+    def __init__(self, version, books, count, segments):
+        """
+        Wraps the state published by a writer.
+        """
+        self.version = version
+        self.books = books
+        self.count = count
+        self.segments = segments
+
+    def __len__(self):
+        """
+        Number of books in the snapshot.
+        """
+        return self.count
+
+    def __iter__(self):
+        """
+        Iterates over the books in insertion order.
+        """
+        return islice(self.books, self.count)
+
+    def find_books(self, title):
+        """
+        Returns the books whose title matches, ignoring case.
+        """
+        books = self.books
+        key = title.lower()
+        return [
+            books[row]
+            for segment in self.segments
+            for row in segment.titles.get(key, ())
+        ]
+
+    def search(self, query, fields=FIELDS):
+        """
+        Returns a lazy iterator over the books whose title or author contains
+        `query`, ignoring case. `fields` narrows the search to some of them.
+        """
+        if not query:
+            return iter(self)
+        return chain.from_iterable(
+            iter_matches(
+                self.books,
+                {field: segment.search_indexes[field] for field in fields},
+                query,
+            )
+            for segment in self.segments
+        )
+
+    def iter_display(self, page_size=1000):
+        """
+        Yields the BookStore.display_books text in pages of `page_size` books.
+        """
+        if not self.count:
+            return iter_pages("No books in the store.", (), page_size)
+        return iter_pages("Books available in the store:", self, page_size)
+
+    def render_search(self, title):
+        """
+        Returns the BookStore.search_book text for `title`.
+        """
+        found_books = self.find_books(title)
+        if found_books:
+            header = f"Found {len(found_books)} book(s) with title '{title}':"
+        else:
+            header = f"No book found with title '{title}'."
+        return render_page(header, found_books)
+
+
+class ConcurrentBookStore:
+    """
+    Thread-safe book store with snapshot reads.
+
+    Each write indexes the new books into a fresh segment and publishes a
+    new Snapshot holding it. Segments are merged when the newest one grows
+    as large as the one before, copying into new objects instead of changing
+    published ones, which keeps O(log n) segments per snapshot. Readers work
+    on whatever snapshot was current when they started, so a concurrent
+    write never blocks them nor shows up halfway.
+
+    Books must not be changed once added.
+    """
+
+    def __init__(self, sink=None):
+        """
+        Starts with an empty store. Messages go to `sink`, the global sink
+        when None.
+        """
+        self.sink = sink
+        self.books = []
+        self._write_lock = threading.Lock()
+        self._snapshot = Snapshot(0, self.books, 0, ())
+
+    def snapshot(self):
+        """
+        Returns the latest published snapshot.
+        """
+        return self._snapshot
+
+    def add_book(self, book):
+        """
+        Adds a book to the store.
+        """
+        self.add_books((book,))
+        output(self.sink).write(f"Book '{book.title}' added to the store.\n")
+
+    def add_books(self, books):
+        """
+        Adds several books without printing, publishing them at once.
+        """
+        with self._write_lock:
+            current = self._snapshot
+            start = len(self.books)
+            self.books.extend(books)
+            stop = len(self.books)
+            if stop == start:
+                return
+
+            segments = [*current.segments, Segment.build(self.books, start, stop)]
+            while len(segments) > 1 and len(segments[-2]) <= len(segments[-1]):
+                last = segments.pop()
+                segments[-1] = segments[-1].merge(last)
+            self._snapshot = Snapshot(
+                current.version + 1, self.books, stop, tuple(segments)
+            )
+
+    def find_books(self, title):
+        """
+        Returns the books whose title matches, ignoring case.
+        """
+        return self._snapshot.find_books(title)
+
+    def search(self, query, fields=FIELDS):
+        """
+        Returns a lazy iterator over the books whose title or author contains
+        `query`, ignoring case, as of the call.
+        """
+        return self._snapshot.search(query, fields)
+
+    def iter_display(self, page_size=1000):
+        """
+        Yields the display_books text in pages of `page_size` books.
+        """
+        return self._snapshot.iter_display(page_size)
+
+    def display_books(self, out=None, page_size=1000):
+        """
+        Displays all books available in the store, one write per page to the
+        `out` sink, the store's sink by default, so output from other threads
+        never lands inside a book.
+        """
+        out = output(self.sink if out is None else out)
+        for page in self.iter_display(page_size):
+            out.write(page)
+
+    def search_book(self, title, out=None):
+        """
+        Searches a books in the store, writing the results in a single call to
+        the `out` sink, the store's sink by default.
+        """
+        output(self.sink if out is None else out).write(
+            self._snapshot.render_search(title)
+        )
@@ -0,0 +1,218 @@
+"""
+Typo-tolerant title search.
+"""
+
+import heapq
+from array import array
+from collections import Counter
+from itertools import chain
+
+from white_box.book_search import trigrams
+from white_box.lru_cache import LRUCache
+
+# The trigram filter reads the postings of the 3k + SHARED_TRIGRAMS rarest
+# query trigrams and only checks the titles holding SHARED_TRIGRAMS of them.
+# Reading a few more postings than the 3k + 1 strictly needed is cheap and
+# cuts the titles to check by orders of magnitude.
+SHARED_TRIGRAMS = 3
+
+
+def pattern_masks(pattern):
+    """
+    Returns, for each character of `pattern`, the bitmask of its positions.
+    """
+    masks = {}
+    for position, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | 1 << position
+    return masks
+
+
+def edit_distance(pattern, text, masks=None):
+    """
+    Levenshtein distance between `pattern` and `text`.
+
+    Uses Myers' bit-parallel algorithm, one pass over `text` with the
+    pattern's columns packed in an integer. `masks` can be given to reuse
+    pattern_masks(pattern) across calls.
+    """
+    size = len(pattern)
+    if not size:
+        return len(text)
+    if masks is None:
+        masks = pattern_masks(pattern)
+
+    full = (1 << size) - 1
+    last = 1 << (size - 1)
+    positive, negative, score = full, 0, size
+    for char in text:
+        equal = masks.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        horizontal_positive = negative | ~(horizontal | positive)
+        horizontal_negative = positive & horizontal
+        if horizontal_positive & last:
+            score += 1
+        elif horizontal_negative & last:
+            score -= 1
+        horizontal_positive = (horizontal_positive << 1) | 1
+        horizontal_negative <<= 1
+        positive = (horizontal_negative | ~(vertical | horizontal_positive)) & full
+        negative = horizontal_positive & vertical & full
+    return score
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree of words under edit distance.
+
+    Each node keeps its word, the rows holding that word and its children
+    keyed by their distance to it. The triangle inequality lets a search
+    skip every child whose key is further than the search radius from the
+    distance between the query and the node.
+    """
+
+    def __init__(self):
+        """
+        Starts with an empty tree.
+        """
+        self.root = None
+        self.size = 0
+        self.rows = 0
+
+    def add(self, word, row):
+        """
+        Records that `row` holds `word`.
+        """
+        self.rows += 1
+        if self.root is None:
+            self.root = (word, [row], {})
+            self.size += 1
+            return
+
+        masks = pattern_masks(word)
+        node = self.root
+        while True:
+            distance = edit_distance(word, node[0], masks)
+            if distance == 0:
+                node[1].append(row)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (word, [row], {})
+                self.size += 1
+                return
+            node = child
+
+    def search(self, word, max_distance):
+        """
+        Yields (distance, row) for every row holding a word within
+        `max_distance` edits of `word`, in no particular order.
+        """
+        if self.root is None:
+            return
+
+        masks = pattern_masks(word)
+        stack = [self.root]
+        while stack:
+            node_word, rows, children = stack.pop()
+            distance = edit_distance(word, node_word, masks)
+            if distance <= max_distance:
+                for row in rows:
+                    yield distance, row
+            low = distance - max_distance
+            high = distance + max_distance
+            stack.extend(child for key, child in children.items() if low <= key <= high)
+
+
+class FuzzyTitleIndex:
+    """
+    Edit-distance search over lowercased titles with a cache of recent
+    query results.
+
+    An edit touches at most three trigrams, so a title within `k` edits of a
+    query holding `n` distinct trigrams shares at least n - 3k of them. For
+    queries long enough for that bound to be selective, candidates are the
+    titles of the store's trigram index that reach it, each then checked
+    with edit_distance. Shorter queries search BK-trees of the titles whose
+    length is within `k` of the query's, built lazily per length.
+    """
+
+    def __init__(self, title_trigrams, cache_size=1024):
+        """
+        Searches the titles indexed by the `title_trigrams` TrigramIndex.
+        """
+        self.title_trigrams = title_trigrams
+        self.lengths = array("I")
+        self.rows_by_length = {}
+        self.trees = {}
+        self.indexed = 0
+        self.cache = LRUCache(cache_size)
+
+    def sync(self, books):
+        """
+        Accounts for the books appended since the last call. Any new book may
+        change any result, so this clears the cache.
+        """
+        if self.indexed == len(books):
+            return
+        rows_by_length = self.rows_by_length
+        for row in range(self.indexed, len(books)):
+            size = len(books[row].title.lower())
+            self.lengths.append(size)
+            if size not in rows_by_length:
+                rows_by_length[size] = array("I")
+            rows_by_length[size].append(row)
+        self.indexed = len(books)
+        self.cache.clear()
+
+    def search(self, books, title, max_distance, limit):
+        """
+        Returns the rows of the `limit` books whose titles are closest to
+        `title`, within `max_distance` edits, closest first and in insertion
+        order on ties.
+        """
+        self.sync(books)
+        needle = title.lower()
+        key = (needle, max_distance, limit)
+        rows = self.cache.get(key)
+        if rows is None:
+            if len(trigrams(needle)) > 3 * max_distance:
+                matches = self._search_trigrams(books, needle, max_distance)
+            else:
+                matches = self._search_trees(books, needle, max_distance)
+            rows = tuple(row for _, row in heapq.nsmallest(limit, matches))
+            self.cache.put(key, rows)
+        return rows
+
+    def _search_trigrams(self, books, needle, max_distance):
+        """
+        Yields (distance, row) for every book within `max_distance` edits,
+        using the trigram count filter.
+        """
+        postings = self.title_trigrams.postings
+        rarest = sorted((postings.get(gram, ()) for gram in trigrams(needle)), key=len)
+        needed = min(len(rarest) - 3 * max_distance, SHARED_TRIGRAMS)
+        counts = Counter(chain.from_iterable(rarest[: 3 * max_distance + needed]))
+        masks = pattern_masks(needle)
+        lengths = self.lengths
+        low, high = len(needle) - max_distance, len(needle) + max_distance
+        for row, count in counts.items():
+            if count >= needed and low <= lengths[row] <= high:
+                distance = edit_distance(needle, books[row].title.lower(), masks)
+                if distance <= max_distance:
+                    yield distance, row
+
+    def _search_trees(self, books, needle, max_distance):
+        """
+        Yields (distance, row) for every book within `max_distance` edits,
+        searching the BK-trees of the titles of a close enough length.
+        """
+        size = len(needle)
+        for length in range(size - max_distance, size + max_distance + 1):
+            rows = self.rows_by_length.get(length)
+            if rows is None:
+                continue
+            tree = self.trees.setdefault(length, BKTree())
+            for row in rows[tree.rows :]:
+                tree.add(books[row].title.lower(), row)
+            yield from tree.search(needle, max_distance)
@@ -0,0 +1,76 @@
+"""
+Streaming catalog parsing for bulk book imports.
+"""
+
+import csv
+import json
+from itertools import chain, islice
+
+
+def detect_format(lines):
+    """
+    Guesses the format from the first non-blank line.
+    Returns the format name and an iterator that still yields every line.
+    """
+    lines = iter(lines)
+    skipped = []
+    for line in lines:
+        skipped.append(line)
+        if line.strip():
+            fmt = "jsonl" if line.lstrip().startswith("{") else "csv"
+            return fmt, chain(skipped, lines)
+    return "csv", iter(skipped)
+
+
+def iter_records(lines, fmt):
+    """
+    Yields one dict per catalog row, read lazily from `lines`.
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(lines)
+    elif fmt == "jsonl":
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Unknown catalog format '{fmt}'")
+
+
+def text_field(record, name):
+    """
+    Returns the `name` field of a record. Raises TypeError unless it is a
+    string.
+    """
+    value = record[name]
+    if not isinstance(value, str):
+        raise TypeError(f"Field '{name}' must be a string, not {value!r}")
+    return value
+
+
+def iter_books(lines, book_class, fmt=None):
+    """
+    Yields a `book_class` instance per catalog row.
+    The format is detected when not given.
+    """
+    if fmt is None:
+        fmt, lines = detect_format(lines)
+
+    for number, record in enumerate(iter_records(lines, fmt), start=1):
+        try:
+            yield book_class(
+                text_field(record, "title"),
+                text_field(record, "author"),
+                float(record["price"]),
+                int(record["quantity"]),
+            )
+        except (KeyError, TypeError, ValueError) as error:
+            raise ValueError(f"Invalid book on row {number}: {error!r}") from error
+
+
+def batched(iterable, size):
+    """
+    Yields lists of at most `size` items.
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
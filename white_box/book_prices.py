@@ -0,0 +1,108 @@
+"""
+Sorted price index for range and cheapest-first queries.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+
+# Up to this many pending entries are inserted one by one, each insert being
+# a memmove of the arrays. Past it, sorting them and merging the arrays in a
+# single pass is cheaper.
+INSORT_LIMIT = 256
+
+
+class PriceIndex:
+    """
+    Rows sorted by (price, row), kept as two parallel arrays.
+
+    New entries are buffered and only sorted in when a query needs them, so
+    bulk loads pay for one sort and merge instead of an insert per row.
+    Queries bisect the prices and then copy out the matching rows, O(log n
+    + k) for k results, so the index can change while they are iterated.
+    """
+
+    def __init__(self):
+        """
+        Starts with an empty index.
+        """
+        self.prices = array("d")
+        self.rows = array("q")
+        self._pending = []
+
+    def __len__(self):
+        """
+        Number of indexed rows.
+        """
+        return len(self.prices) + len(self._pending)
+
+    def add(self, row, price):
+        """
+        Indexes `row` under `price`.
+        """
+        self._pending.append((price, row))
+
+    def remove(self, row, price):
+        """
+        Drops the entry of `row` indexed under `price`, if any.
+        """
+        self._flush()
+        position = self._position(price, row)
+        if position < len(self.rows) and self.rows[position] == row:
+            if self.prices[position] == price:
+                del self.prices[position]
+                del self.rows[position]
+
+    def range(self, low, high):
+        """
+        Returns an iterator over the rows priced between `low` and `high`
+        inclusive, cheapest first, as indexed when called.
+        """
+        self._flush()
+        prices = self.prices
+        start = bisect_left(prices, low)
+        stop = bisect_right(prices, high, start)
+        return iter(self.rows[start:stop])
+
+    def cheapest(self, limit=None):
+        """
+        Returns an iterator over the `limit` cheapest rows, or all of them,
+        cheapest first, as indexed when called.
+        """
+        self._flush()
+        return iter(self.rows[:limit])
+
+    def _position(self, price, row):
+        """
+        Returns where (price, row) is or would go in the arrays.
+        """
+        prices = self.prices
+        start = bisect_left(prices, price)
+        stop = bisect_right(prices, price, start)
+        return bisect_left(self.rows, row, start, stop)
+
+    def _flush(self):
+        """
+        Moves the pending entries into the sorted arrays.
+        """
+        pending = self._pending
+        if not pending:
+            return
+        if len(pending) <= INSORT_LIMIT:
+            for price, row in pending:
+                position = self._position(price, row)
+                self.prices.insert(position, price)
+                self.rows.insert(position, row)
+        else:
+            entries = list(zip(self.prices, self.rows))
+            pending.sort(key=itemgetter(1))
+            entries += pending
+            if not self.rows or pending[0][1] > max(self.rows):
+                # Rows are in order within each price, so a stable sort on the
+                # price alone, much faster than comparing tuples, is enough.
+                entries.sort(key=itemgetter(0))
+            else:
+                entries.sort()
+            self.prices = array("d", [price for price, _ in entries])
+            self.rows = array("q", [row for _, row in entries])
+        pending.clear()
@@ -0,0 +1,50 @@
+"""
+Text rendering shared by every book representation.
+"""
+
+from white_box.output_sinks import output
+
+
+def render_book(book):
+    """
+    Returns the text Book.display prints, line terminators included.
+    """
+    return (
+        f"Title: {book.title}\n"
+        f"Author: {book.author}\n"
+        f"Price: ${book.price}\n"
+        f"Quantity: {book.quantity}\n"
+    )
+
+
+def render_page(header, books):
+    """
+    Returns a header line followed by the rendered books as a single string.
+    """
+    return "".join([f"{header}\n", *map(render_book, books)])
+
+
+def iter_pages(header, books, page_size):
+    """
+    Yields the header line followed by the rendered books, `page_size` books
+    per string. The first page always holds the header.
+    """
+    page = [f"{header}\n"]
+    count = 0
+    for book in books:
+        page.append(render_book(book))
+        count += 1
+        if count == page_size:
+            yield "".join(page)
+            page = []
+            count = 0
+    if page:
+        yield "".join(page)
+
+
+def display(book, out=None):
+    """
+    Shows a book as a single write to the `out` sink, the global sink by
+    default.
+    """
+    output(out).write(render_book(book))
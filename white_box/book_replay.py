@@ -0,0 +1,230 @@
+"""
+Non-interactive replay of book store commands.
+
+A script holds one command per line, either in the tab-separated form read
+by the BookServer:
+
+    search<TAB>Dune
+    add<TAB>Dune<TAB>Frank Herbert<TAB>9.99<TAB>5
+
+or as a JSONL command log:
+
+    {"command": "search", "title": "Dune"}
+    {"command": "add", "title": "Dune", "author": "Frank Herbert",
+     "price": 9.99, "quantity": 5}
+
+Commands run against a BookStore with printing turned off, one line at a
+time, and the time each one takes is recorded in per-command histograms.
+
+Run with: python -m white_box.book_replay [script]  (stdin when omitted)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import nullcontext
+
+from white_box.book_import import detect_format, text_field
+from white_box.book_server import ARITY, COMMANDS, parse_command
+from white_box.book_store import Book, BookStore
+from white_box.output_sinks import NullSink
+
+
+def bucket_of(nanoseconds):
+    """
+    Returns the histogram bucket of a duration. Each power of two is split
+    into four buckets, so a bucket is at most 25% wider than its lower bound.
+    """
+    if nanoseconds < 4:
+        return nanoseconds
+    shift = nanoseconds.bit_length() - 3
+    return shift * 4 + (nanoseconds >> shift)
+
+
+def bucket_limit(bucket):
+    """
+    Returns the largest duration falling in `bucket`.
+    """
+    if bucket < 4:
+        return bucket
+    shift = bucket // 4 - 1
+    return ((bucket % 4 + 5) << shift) - 1
+
+
+class Histogram:
+    """
+    Latency histogram with logarithmic nanosecond buckets.
+
+    Recording costs the same whatever the number of samples, so it suits
+    replays of millions of commands.
+    """
+
+    def __init__(self):
+        """
+        Starts with no samples.
+        """
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.buckets = [0] * bucket_of(2**64)
+
+    def add(self, nanoseconds):
+        """
+        Records one sample.
+        """
+        self.count += 1
+        self.total += nanoseconds
+        self.max = max(self.max, nanoseconds)
+        self.buckets[bucket_of(nanoseconds)] += 1
+
+    def percentile(self, fraction):
+        """
+        Returns the upper bound, in nanoseconds, of the bucket holding the
+        `fraction` percentile.
+        """
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return min(bucket_limit(bucket), self.max)
+        return self.max
+
+    def summary(self):
+        """
+        Returns the count, the mean, percentiles and maximum in microseconds
+        and the sample count per bucket, keyed by its upper bound in
+        nanoseconds.
+        """
+        return {
+            "count": self.count,
+            "mean_us": self.total / self.count / 1e3 if self.count else 0.0,
+            "p50_us": self.percentile(0.5) / 1e3,
+            "p99_us": self.percentile(0.99) / 1e3,
+            "max_us": self.max / 1e3,
+            "buckets_ns": {
+                bucket_limit(bucket): count
+                for bucket, count in enumerate(self.buckets)
+                if count
+            },
+        }
+
+
+def parse_record(line):
+    """
+    Reads one JSONL command into the command name and its argument, like
+    parse_command. Raises ValueError when the record is not a valid command.
+    """
+    try:
+        record = json.loads(line)
+        command = COMMANDS[str(record["command"]).strip().lower()]
+        if command == "add":
+            return command, Book(
+                text_field(record, "title"),
+                text_field(record, "author"),
+                float(record["price"]),
+                int(record["quantity"]),
+            )
+        if command == "search":
+            return command, text_field(record, "title")
+        return command, None
+    except (KeyError, TypeError, ValueError) as error:
+        raise ValueError(f"Invalid command {line!r}") from error
+
+
+def iter_commands(lines):
+    """
+    Yields (command, argument) for each non-blank line, or (None, line) for
+    lines that are not valid commands.
+    """
+    fmt, lines = detect_format(lines)
+    # Anything not starting like JSON is read as a tab-separated script.
+    parse = parse_record if fmt == "jsonl" else parse_command
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield parse(line)
+        except ValueError:
+            yield None, line
+
+
+def replay(store, path_or_stream):
+    """
+    Runs every command of a script against `store` without printing, until
+    the end of the script or an exit command.
+
+    Lines are read and run one at a time, so the script is never held in
+    memory. Returns the number of invalid lines, the elapsed seconds and a
+    histogram summary per command.
+    """
+    histograms = {command: Histogram() for command in ARITY}
+    out = NullSink()
+    invalid = 0
+    clock = time.perf_counter_ns
+    start = time.perf_counter()
+    if isinstance(path_or_stream, (str, os.PathLike)):
+        stream = open(path_or_stream, encoding="utf-8")
+    else:
+        stream = nullcontext(path_or_stream)
+
+    with stream as lines:
+        for command, arg in iter_commands(lines):
+            if command is None:
+                invalid += 1
+                continue
+            began = clock()
+            if command == "display":
+                store.display_books(out=out)
+            elif command == "search":
+                store.search_book(arg, out=out)
+            elif command == "add":
+                store.add_books((arg,))
+            histograms[command].add(clock() - began)
+            if command == "exit":
+                break
+
+    return {
+        "invalid": invalid,
+        "seconds": time.perf_counter() - start,
+        "commands": {
+            command: histogram.summary()
+            for command, histogram in histograms.items()
+            if histogram.count
+        },
+    }
+
+
+def format_report(report):
+    """
+    Renders a replay report as a table with one row per command.
+    """
+    lines = [
+        f"{'command':<8} {'count':>10} {'mean us':>9} {'p50 us':>9}"
+        f" {'p99 us':>9} {'max us':>10}"
+    ]
+    for command, summary in report["commands"].items():
+        lines.append(
+            f"{command:<8} {summary['count']:>10} {summary['mean_us']:>9.1f}"
+            f" {summary['p50_us']:>9.1f} {summary['p99_us']:>9.1f}"
+            f" {summary['max_us']:>10.1f}"
+        )
+    lines.append(
+        f"{report['invalid']} invalid line(s), {report['seconds']:.2f} s in total"
+    )
+    return "\n".join(lines)
+
+
+def main():
+    """Replay entrypoint."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("script", nargs="?", help="command script, stdin if omitted")
+    args = parser.parse_args()
+    report = replay(BookStore(), args.script or sys.stdin)
+    print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Substring search over book fields.
+"""
+
+from array import array
+from heapq import merge
+
+# Texts are padded so that every text, even a one-letter one, has at least one
+# trigram and every substring of it lives inside some trigram.
+PAD = "\x00"
+
+
+def trigrams(text):
+    """
+    Returns the set of trigrams of the padded, already lowercased text.
+    """
+    padded = f"{PAD}{text}{PAD}"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Inverted index from trigrams to the rows whose text contains them.
+
+    Rows must be added in increasing order, which keeps every posting list
+    sorted and lets callers merge candidate streams lazily.
+    """
+
+    def __init__(self):
+        """
+        Starts with an empty index.
+        """
+        self.postings = {}
+        self.size = 0
+
+    def add(self, row, text):
+        """
+        Indexes the text stored at `row`.
+        """
+        postings = self.postings
+        for gram in trigrams(text.lower()):
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = array("I", (row,))
+            else:
+                posting.append(row)
+        self.size = row + 1
+
+    def candidates(self, needle):
+        """
+        Yields, in increasing order, the rows that may contain the lowercased
+        `needle`. Callers still have to check each row against the real text.
+        """
+        if not needle:
+            yield from range(self.size)
+        elif len(needle) < 3:
+            # Too short to have a trigram of its own: any text containing it
+            # has a trigram containing it.
+            last = -1
+            for row in merge(
+                *(posting for gram, posting in self.postings.items() if needle in gram)
+            ):
+                if row != last:
+                    last = row
+                    yield row
+        else:
+            shortest = None
+            for i in range(len(needle) - 2):
+                posting = self.postings.get(needle[i : i + 3])
+                if posting is None:
+                    return
+                if shortest is None or len(posting) < len(shortest):
+                    shortest = posting
+            yield from shortest
+
+
+def iter_matches(books, indexes, query):
+    """
+    Lazily yields, in insertion order, the books whose indexed fields contain
+    `query`, ignoring case. `indexes` maps field names to their TrigramIndex.
+    """
+    needle = query.lower()
+    fields = tuple(indexes)
+    last = -1
+    for row in merge(*(index.candidates(needle) for index in indexes.values())):
+        if row == last:
+            continue
+        last = row
+        book = books[row]
+        if any(needle in getattr(book, field).lower() for field in fields):
+            yield book
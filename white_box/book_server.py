@@ -0,0 +1,171 @@
+"""
+Asyncio line-protocol front end for a BookStore.
+
+Each request is one line of tab-separated fields, the command first:
+
+    display
+    search<TAB>title
+    add<TAB>title<TAB>author<TAB>price<TAB>quantity
+    exit
+
+The menu numbers 1 to 4 work as command names too. Each response is the
+text the interactive menu would print, followed by an empty line.
+"""
+
+import asyncio
+from io import StringIO
+
+from white_box.book_store import Book, BookStore
+
+COMMANDS = {
+    "1": "display",
+    "2": "search",
+    "3": "add",
+    "4": "exit",
+    "display": "display",
+    "search": "search",
+    "add": "add",
+    "exit": "exit",
+}
+ARITY = {"display": 0, "search": 1, "add": 4, "exit": 0}
+
+
+def parse_command(line):
+    """
+    Splits a request line into the command name and its arguments.
+    Add arguments are converted into a Book. Raises ValueError when the line
+    is not a valid request.
+    """
+    name, *args = line.rstrip("\r\n").split("\t")
+    command = COMMANDS.get(name.strip().lower())
+    if command is None or len(args) != ARITY[command]:
+        raise ValueError(f"Invalid request {line!r}")
+    if command == "add":
+        title, author, price, quantity = args
+        return command, Book(title, author, float(price), int(quantity))
+    return command, args[0] if args else None
+
+
+class BookServer:
+    """
+    Serves a BookStore to many concurrent clients.
+
+    Reads run as soon as they arrive and never wait on writers. Adds are
+    queued and applied by a single writer task, which drains whatever has
+    queued up into one batch.
+    """
+
+    def __init__(self, store, batch_size=1000):
+        """
+        Wraps `store`, applying at most `batch_size` adds per batch.
+        """
+        self.store = store
+        self.batch_size = batch_size
+        self._adds = None
+        self._writer = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        """
+        Starts listening and returns the asyncio server.
+        """
+        self._adds = asyncio.Queue()
+        self._writer = asyncio.create_task(self._apply_adds())
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def stop(self):
+        """
+        Stops the writer task once the queued adds are applied.
+        """
+        await self._adds.join()
+        self._writer.cancel()
+
+    async def handle(self, reader, writer):
+        """
+        Answers the requests of one client until it exits or disconnects.
+        """
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    request = line.decode()
+                except ValueError:
+                    # Not UTF-8 (UnicodeDecodeError) or longer than the
+                    # reader's limit, which readline drops: an invalid request.
+                    request = ""
+                response, done = await self.respond(request)
+                writer.write(f"{response}\n".encode())
+                await writer.drain()
+                if done:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, line):
+        """
+        Returns the response text for a request line and whether the client
+        asked to exit.
+        """
+        try:
+            command, arg = parse_command(line)
+        except ValueError:
+            return "Invalid choice. Please try again.\n", False
+
+        if command == "exit":
+            return "Exiting...\n", True
+
+        out = StringIO()
+        if command == "display":
+            self.store.display_books(out=out)
+        elif command == "search":
+            self.store.search_book(arg, out=out)
+        else:
+            added = asyncio.get_running_loop().create_future()
+            self._adds.put_nowait((arg, added))
+            await added
+            out.write(f"Book '{arg.title}' added to the store.\n")
+        return out.getvalue(), False
+
+    async def _apply_adds(self):
+        """
+        Applies queued adds to the store, one batch at a time.
+        """
+        while True:
+            batch = [await self._adds.get()]
+            while len(batch) < self.batch_size and not self._adds.empty():
+                batch.append(self._adds.get_nowait())
+
+            try:
+                self.store.add_books([book for book, _ in batch])
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                for _, added in batch:
+                    if not added.done():
+                        added.set_exception(error)
+            else:
+                for _, added in batch:
+                    # Cancelled when the requesting client went away.
+                    if not added.done():
+                        added.set_result(None)
+            for _ in batch:
+                self._adds.task_done()
+
+
+async def serve(store, host="127.0.0.1", port=8765):
+    """
+    Serves `store` until cancelled.
+    """
+    server = await BookServer(store).start(host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    """Server entrypoint."""
+    asyncio.run(serve(BookStore()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Incrementally maintained inventory aggregates.
+"""
+
+from types import MappingProxyType
+
+
+class InventoryStats:
+    """
+    Running totals over a catalog, updated book by book so that reading them
+    never needs a pass over the books.
+    """
+
+    def __init__(self):
+        """
+        Starts from an empty catalog.
+        """
+        self.books = 0
+        self.total_value = 0.0
+        self.out_of_stock = 0
+        self.units_by_author = {}
+
+    def add(self, book):
+        """
+        Accounts for a new book.
+        """
+        self.books += 1
+        self.total_value += book.price * book.quantity
+        self.out_of_stock += book.quantity <= 0
+        self.units_by_author[book.author] = (
+            self.units_by_author.get(book.author, 0) + book.quantity
+        )
+
+    def update(self, book, old_price, old_quantity):
+        """
+        Accounts for a book whose price or quantity changed from the old ones.
+        """
+        self.total_value += book.price * book.quantity - old_price * old_quantity
+        self.out_of_stock += (book.quantity <= 0) - (old_quantity <= 0)
+        self.units_by_author[book.author] = (
+            self.units_by_author.get(book.author, 0) + book.quantity - old_quantity
+        )
+
+    def snapshot(self):
+        """
+        Returns the current aggregates. Units per author are a read-only live
+        view, so taking a snapshot costs the same whatever the catalog size.
+        """
+        return {
+            "books": self.books,
+            "total_value": self.total_value,
+            "out_of_stock": self.out_of_stock,
+            "units_by_author": MappingProxyType(self.units_by_author),
+        }
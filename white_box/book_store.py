@@ -4,61 +4,579 @@
 Book store example.
 """
 
+import os
+import time
+from contextlib import nullcontext
+
+from white_box.book_catalog_file import CatalogFile
+from white_box.book_columns import BookColumns, BookView
+from white_box.book_fuzzy import FuzzyTitleIndex
+from white_box.book_import import batched, iter_books
+from white_box.book_prices import PriceIndex
+from white_box.book_render import display, iter_pages, render_book
+from white_box.book_search import TrigramIndex, iter_matches
+from white_box.book_stats import InventoryStats
+from white_box.lru_cache import LRUCache
+from white_box.output_sinks import output
+
+
+def merge_key(book):
+    """
+    Returns the key under which merge mode considers two books the same: the
+    title and author, lowercased and with whitespace runs collapsed.
+    """
+    return (" ".join(book.title.lower().split()), " ".join(book.author.lower().split()))
+
 
 class Book:  # pylint: disable=too-few-public-methods
     """
     Book class.
+
+    A book reports changes to every store holding it, kept in `stores`.
     """
 
+    __slots__ = ("_title", "_author", "_price", "_quantity", "stores")
+
     def __init__(self, title, author, price, quantity):
         """Book init."""
-        self.title = title
-        self.author = author
-        self.price = price
-        self.quantity = quantity
+        self.stores = ()
+        self._title = title
+        self._author = author
+        self._price = price
+        self._quantity = quantity
+
+    @property
+    def title(self):
+        """Book title, changes make the stores holding the book reindex it."""
+        return self._title
+
+    @title.setter
+    def title(self, value):
+        self._title = value
+        for store in self.stores:
+            store.on_book_renamed(self)
+
+    @property
+    def author(self):
+        """Book author, changes make the stores holding the book reindex it."""
+        return self._author
+
+    @author.setter
+    def author(self, value):
+        self._author = value
+        for store in self.stores:
+            store.on_book_renamed(self)
+
+    @property
+    def price(self):
+        """Book price, changes are reported to the stores holding the book."""
+        return self._price
+
+    @price.setter
+    def price(self, value):
+        old_price = self._price
+        self._price = value
+        for store in self.stores:
+            store.on_book_changed(self, old_price, self._quantity)
+
+    @property
+    def quantity(self):
+        """Units in stock, changes are reported to the stores holding the book."""
+        return self._quantity
+
+    @quantity.setter
+    def quantity(self, value):
+        old_quantity = self._quantity
+        self._quantity = value
+        for store in self.stores:
+            store.on_book_changed(self, self._price, old_quantity)
+
+    def display(self, out=None):
+        """
+        Displays the book information.
+        With `out`, the text is written to that sink instead of the global one.
+        """
+        display(self, out)
 
-    def display(self):
-        """Displays the book information."""
-        print(f"Title: {self.title}")
-        print(f"Author: {self.author}")
-        print(f"Price: ${self.price}")
-        print(f"Quantity: {self.quantity}")
 
+class BookList(list):
+    """
+    List of the books of a BookStore. Appended books are indexed
+    incrementally; replacing, removing, inserting or reordering books marks
+    the list as changed, and the store reindexes every book on its next
+    lookup.
 
-class BookStore:
+    A plain list assigned to BookStore.books is used as is, and only
+    appending to it, shrinking it or assigning another list is noticed:
+    books replaced or reordered in place need a BookList to be reindexed.
+    """
+
+    changed = False
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self.changed = True
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self.changed = True
+
+    def __imul__(self, count):
+        self.changed = True
+        return super().__imul__(count)
+
+    def insert(self, index, book):
+        """Inserts a book before `index`."""
+        super().insert(index, book)
+        self.changed = True
+
+    def pop(self, index=-1):
+        """Removes and returns the book at `index`, the last by default."""
+        self.changed = True
+        return super().pop(index)
+
+    def remove(self, book):
+        """Removes the first occurrence of a book."""
+        super().remove(book)
+        self.changed = True
+
+    def clear(self):
+        """Removes every book."""
+        super().clear()
+        self.changed = True
+
+    def sort(self, *, key=None, reverse=False):
+        """Sorts the books in place."""
+        super().sort(key=key, reverse=reverse)
+        self.changed = True
+
+    def reverse(self):
+        """Reverses the books in place."""
+        super().reverse()
+        self.changed = True
+
+
+class BookStore:  # pylint: disable=too-many-instance-attributes
     """
     Book store class.
     """
 
-    def __init__(self):
-        """Book class init."""
-        self.books = []
+    def __init__(
+        self, compact=False, search_cache_size=1024, merge_duplicates=False, sink=None
+    ):
+        """
+        Book class init.
+        With `compact` set, books are kept in a BookColumns store and handed
+        out as views instead of being kept as Book objects.
+        `search_cache_size` bounds the number of search_book results kept.
+        With `merge_duplicates` set, adding a book whose title and author are
+        already in the store adds its quantity to the existing row instead.
+        Messages go to `sink`, the global sink when None.
+        """
+        self.sink = sink
+        self.books = BookColumns(store=self) if compact else BookList()
+        self._merge_duplicates = merge_duplicates
+        self._add_counts = {"inserted": 0, "merged": 0}
+        # Lowercased title -> (found books, their rendered text).
+        self._search_cache = LRUCache(search_cache_size)
+        self._owners = (self,)
+        self._reset_indexes()
+
+    @classmethod
+    def open(cls, path):
+        """
+        Returns a store backed by the memory-mapped catalog at `path`.
+        Opening and adding books do not read the catalog: books are decoded
+        when accessed and new ones appended to the file. Titles are looked up
+        through the index the catalog keeps next to it, so lookups by title
+        only decode the rows it does not cover yet, every row the first time
+        a catalog is looked up. The substring, price and stats indexes are
+        not persisted: each is built over the whole catalog on the first
+        query needing it.
+        """
+        store = cls()
+        store.books = CatalogFile(path, Book)
+        return store
 
     def add_book(self, book):
         """Adds a book to the store."""
-        self.books.append(book)
-        print(f"Book '{book.title}' added to the store.")
+        if self._merge_duplicates:
+            if self._merge_books((book,))["merged"]:
+                output(self.sink).write(
+                    f"Book '{book.title}' already in the store, quantity updated.\n"
+                )
+                return
+        else:
+            self.books.append(book)
+            self._attach(book)
+            self._add_counts["inserted"] += 1
+        output(self.sink).write(f"Book '{book.title}' added to the store.\n")
 
-    def display_books(self):
-        """Displays all books available in the store."""
-        if not self.books:
-            print("No books in the store.")
+    def add_books(self, books):
+        """
+        Adds several books without printing. The indexes catch up on the
+        next query needing them. Returns how many were inserted as new rows
+        and how many were merged into existing ones.
+        """
+        if self._merge_duplicates:
+            return self._merge_books(books)
+        before = len(self.books)
+        books = list(books)
+        self.books.extend(books)
+        for book in books:
+            self._attach(book)
+        counts = {"inserted": len(self.books) - before, "merged": 0}
+        self._add_counts["inserted"] += counts["inserted"]
+        return counts
+
+    def _merge_books(self, books):
+        """
+        Adds books in merge mode: each one found by its merge_key adds its
+        quantity to the existing row, keeping that row's price, and the rest
+        are appended.
+        """
+        self._sync_indexes()
+        rows_by_key = self._rows_by_key
+        store_books = self.books
+        inserted = merged = 0
+        for book in books:
+            key = merge_key(book)
+            row = rows_by_key.get(key)
+            if row is None:
+                rows_by_key[key] = len(store_books)
+                store_books.append(book)
+                inserted += 1
+                continue
+            if row >= self._indexed:
+                # Appended earlier in this batch: index it first so the
+                # quantity change is accounted for like any other.
+                self._sync_indexes()
+            store_books[row].quantity += book.quantity
+            merged += 1
+        self._sync_indexes()
+
+        self._add_counts["inserted"] += inserted
+        self._add_counts["merged"] += merged
+        return {"inserted": inserted, "merged": merged}
+
+    def add_counts(self):
+        """
+        Returns how many added books were inserted as new rows and how many
+        were merged into existing ones since the store was created.
+        """
+        return dict(self._add_counts)
+
+    def load_from(self, path_or_stream, fmt=None, batch_size=10_000):
+        """
+        Bulk loads a CSV or JSONL catalog without printing anything.
+
+        Rows are parsed lazily and added in batches of `batch_size`, with the
+        indexes updated once per batch, so only one batch is held at a time.
+        Returns a report with the number of rows, how many of them were
+        inserted and merged, the elapsed seconds and the rows per second.
+        """
+        start = time.perf_counter()
+        rows = inserted = 0
+        if isinstance(path_or_stream, (str, os.PathLike)):
+            stream = open(path_or_stream, encoding="utf-8", newline="")
         else:
-            print("Books available in the store:")
-            for book in self.books:
-                book.display()
-
-    def search_book(self, title):
-        """Searches a books in the store."""
-        found_books = [
-            book for book in self.books if book.title.lower() == title.lower()
+            stream = nullcontext(path_or_stream)
+
+        with stream as lines:
+            for batch in batched(iter_books(lines, Book, fmt), batch_size):
+                inserted += self.add_books(batch)["inserted"]
+                rows += len(batch)
+
+        seconds = time.perf_counter() - start
+        return {
+            "rows": rows,
+            "inserted": inserted,
+            "merged": rows - inserted,
+            "seconds": seconds,
+            "rows_per_second": rows / seconds if seconds else 0.0,
+        }
+
+    def _reset_indexes(self):  # pylint: disable=attribute-defined-outside-init
+        """
+        Drops every index, they get rebuilt from self.books on the next sync.
+        """
+        # Lowercased title -> rows in self.books, in insertion order.
+        self._title_index = {}
+        self._search_indexes = {"title": TrigramIndex(), "author": TrigramIndex()}
+        self._stats = InventoryStats()
+        self._fuzzy = FuzzyTitleIndex(self._search_indexes["title"])
+        # Keyed by in-stock only: False indexes every book, True the ones with
+        # units left.
+        self._price_indexes = {False: PriceIndex(), True: PriceIndex()}
+        self._search_cache.clear()
+        # merge_key -> first row holding it, only kept in merge mode.
+        self._rows_by_key = {}
+        if isinstance(self.books, BookList):
+            self.books.changed = False
+        self._indexed_books = self.books
+        # Rows covered by the title index, then by each index built on first
+        # use of the queries needing it.
+        self._indexed = 0
+        # Leading rows whose titles are looked up in the catalog file's own
+        # index instead.
+        self._catalog_rows = 0
+        self._synced = {"search": 0, "stats": 0, "prices": 0}
+
+    def _indexes_current(self):
+        """
+        Whether the indexes still describe the first rows of self.books, only
+        missing the books appended since.
+        """
+        books = self.books
+        return (
+            books is self._indexed_books
+            and len(books) >= self._indexed
+            and not getattr(books, "changed", False)
+        )
+
+    def _sync_indexes(self):
+        """
+        Indexes the titles of the books appended to self.books since the
+        last call.
+        """
+        books = self.books
+        if not self._indexes_current():
+            # Books were replaced, removed, reordered or renamed: start over.
+            self._reset_indexes()
+            if isinstance(books, CatalogFile) and not self._merge_duplicates:
+                self._indexed = self._catalog_rows = books.index_titles()
+
+        title_index = self._title_index
+        search_cache = self._search_cache
+        for row in range(self._indexed, len(books)):
+            book = books[row]
+            self._attach(book)
+            key = book.title.lower()
+            title_index.setdefault(key, []).append(row)
+            search_cache.discard(key)
+            if self._merge_duplicates:
+                self._rows_by_key.setdefault(merge_key(book), row)
+        self._indexed = len(books)
+
+    def _attach(self, book):
+        """
+        Makes `book` notify this store of its changes.
+        """
+        if isinstance(book, Book):
+            if not book.stores:
+                # Shared by the books held by this store alone.
+                book.stores = self._owners
+            elif self not in book.stores:
+                book.stores += self._owners
+
+    def _new_rows(self, index):
+        """
+        Syncs the title index, then returns the rows the `index` secondary
+        index is missing and marks them covered. Syncing may reset every
+        index, so callers look their index up only after this returns.
+        """
+        self._sync_indexes()
+        rows = range(self._synced[index], self._indexed)
+        self._synced[index] = self._indexed
+        return rows
+
+    def _sync_search(self):
+        """
+        Brings the title and author trigram indexes up to date.
+        """
+        rows = self._new_rows("search")
+        books = self.books
+        title_search = self._search_indexes["title"]
+        author_search = self._search_indexes["author"]
+        for row in rows:
+            book = books[row]
+            title_search.add(row, book.title)
+            author_search.add(row, book.author)
+
+    def _sync_stats(self):
+        """
+        Brings the inventory aggregates up to date.
+        """
+        rows = self._new_rows("stats")
+        books = self.books
+        add = self._stats.add
+        for row in rows:
+            add(books[row])
+
+    def _sync_prices(self):
+        """
+        Brings the price indexes up to date.
+        """
+        rows = self._new_rows("prices")
+        books = self.books
+        prices, in_stock_prices = self._price_indexes[False], self._price_indexes[True]
+        for row in rows:
+            book = books[row]
+            prices.add(row, book.price)
+            if book.quantity > 0:
+                in_stock_prices.add(row, book.price)
+
+    def on_book_renamed(self, book):  # pylint: disable=unused-argument
+        """
+        Called by the books of this store when their title or author changes.
+        Every book is reindexed on the next lookup.
+        """
+        self._indexed_books = None
+
+    def on_book_changed(self, book, old_price, old_quantity):
+        """
+        Called by the books of this store when their price or quantity
+        changes. A book added several times is accounted for once per row.
+        """
+        if not self._indexes_current():
+            # The indexes are rebuilt from the current values anyway.
+            return
+        rows = self._rows_of(book)
+        if not rows:
+            return
+        self._search_cache.discard(book.title.lower())
+        was_in_stock = old_quantity > 0
+        in_stock = book.quantity > 0
+        reprice = book.price != old_price or in_stock != was_in_stock
+        prices, in_stock_prices = self._price_indexes[False], self._price_indexes[True]
+        synced = self._synced
+        for row in rows:
+            # Rows an index does not cover yet are read when it catches up.
+            if row < synced["stats"]:
+                self._stats.update(book, old_price, old_quantity)
+            if not reprice or row >= synced["prices"]:
+                continue
+            prices.remove(row, old_price)
+            prices.add(row, book.price)
+            if was_in_stock:
+                in_stock_prices.remove(row, old_price)
+            if in_stock:
+                in_stock_prices.add(row, book.price)
+
+    def _rows_of(self, book):
+        """
+        Returns the rows holding `book`, found through the title index.
+        """
+        if isinstance(book, BookView):
+            return (book.row,)
+        books = self.books
+        return [
+            row for row in self._title_rows(book.title.lower()) if books[row] is book
         ]
-        if not found_books:
-            print(f"No book found with title '{title}'.")
+
+    def _title_rows(self, key):
+        """
+        Returns the rows whose lowercased title is `key`, in row order.
+        """
+        rows = self._title_index.get(key, [])
+        if self._catalog_rows:
+            rows = self.books.title_rows(key, self._catalog_rows) + rows
+        return rows
+
+    def stats(self):
+        """
+        Returns the inventory aggregates: number of books, total stock value
+        (price times quantity), number of out-of-stock books and units per
+        author. They are kept up to date as books are added or changed, so
+        this costs O(1) apart from indexing books appended since the last call.
+        """
+        self._sync_stats()
+        return self._stats.snapshot()
+
+    def display_books(self, out=None, page_size=1000):
+        """
+        Displays all books available in the store, written to the `out` sink,
+        the store's sink by default, once per page of `page_size` books.
+        """
+        out = output(self.sink if out is None else out)
+        for page in self.iter_display(page_size):
+            out.write(page)
+
+    def iter_display(self, page_size=1000):
+        """
+        Yields the display_books text in pages of `page_size` books.
+        """
+        if not self.books:
+            return iter_pages("No books in the store.", (), page_size)
+        return iter_pages("Books available in the store:", self.books, page_size)
+
+    def find_books(self, title):
+        """Returns the books whose title matches, ignoring case."""
+        self._sync_indexes()
+        books = self.books
+        return [books[row] for row in self._title_rows(title.lower())]
+
+    def search(self, query, fields=("title", "author")):
+        """
+        Returns a lazy iterator over the books whose title or author contains
+        `query`, ignoring case. `fields` narrows the search to some of them.
+        """
+        self._sync_search()
+        indexes = {field: self._search_indexes[field] for field in fields}
+        return iter_matches(self.books, indexes, query)
+
+    def fuzzy_search(self, title, max_distance=2, limit=10):
+        """
+        Returns up to `limit` books whose title is within `max_distance` edits
+        of `title`, ignoring case, closest first. Recent results are cached.
+        """
+        self._sync_search()
+        books = self.books
+        rows = self._fuzzy.search(books, title, max_distance, limit)
+        return [books[row] for row in rows]
+
+    def books_in_price_range(self, low, high, in_stock=False):
+        """
+        Returns a lazy iterator over the books priced between `low` and `high`
+        inclusive, cheapest first. With `in_stock`, books with no units left
+        are skipped. The matching rows are taken when called, so the books can
+        be changed while iterating.
+        """
+        self._sync_prices()
+        index = self._price_indexes[bool(in_stock)]
+        books = self.books
+        return (books[row] for row in index.range(low, high))
+
+    def cheapest_books(self, limit=None, in_stock=True):
+        """
+        Returns a lazy iterator over the `limit` cheapest books, or all of
+        them, cheapest first. By default only books in stock are included.
+        The rows are taken when called, so the books can be changed while
+        iterating.
+        """
+        self._sync_prices()
+        index = self._price_indexes[bool(in_stock)]
+        books = self.books
+        return (books[row] for row in index.cheapest(limit))
+
+    def search_cache_info(self):
+        """
+        Returns the search_book cache hits, misses, evictions and sizes.
+        """
+        return self._search_cache.info()
+
+    def search_book(self, title, out=None):
+        """
+        Searches a books in the store.
+        The results are written in a single call to the `out` sink, the
+        store's sink by default.
+        Results are cached per lowercased title until a book with that title
+        is added or changed.
+        """
+        self._sync_indexes()
+        key = title.lower()
+        cached = self._search_cache.get(key)
+        if cached is None:
+            found_books = self.find_books(title)
+            cached = (found_books, "".join(map(render_book, found_books)))
+            self._search_cache.put(key, cached)
+        found_books, text = cached
+
+        if found_books:
+            header = f"Found {len(found_books)} book(s) with title '{title}':"
         else:
-            print(f"Found {len(found_books)} book(s) with title '{title}':")
-            for book in found_books:
-                book.display()
+            header = f"No book found with title '{title}'."
+        output(self.sink if out is None else out).write(f"{header}\n{text}")
 
 
 def main():
@@ -5,6 +5,8 @@ White-box code examples.
 """
 import re
 
+from white_box.money import Money, apply_rate, to_cents
+
 
 def is_even(num):
     """
@@ -104,22 +106,25 @@ def calculate_order_total(items):
     Processes user orders in an e-commerce system.
     The function calculates the total price of the items in the order,
     applying different discounts based on the quantity of each item.
+    The total is Money, each discounted line rounded half to even to the cent.
+    Money only multiplies by whole numbers and has no round(): use
+    total.times(rate) to apply a rate in cents, or float(total) for a float.
     """
-    total_price = 0
+    total_cents = 0
 
     for item in items:
         quantity = item["quantity"]
-        price_per_item = item["price"]
+        line_cents = to_cents(item["price"]) * quantity
 
         # Apply discounts based on quantity
         if 1 <= quantity <= 5:
-            total_price += quantity * price_per_item
+            total_cents += line_cents
         elif 6 <= quantity <= 10:
-            total_price += 0.95 * quantity * price_per_item  # 5% discount
+            total_cents += apply_rate(line_cents, 950_000)  # 5% discount
         else:
-            total_price += 0.9 * quantity * price_per_item  # 10% discount
+            total_cents += apply_rate(line_cents, 900_000)  # 10% discount
 
-    return total_price
+    return Money(total_cents)
 
 
 # 5
@@ -0,0 +1,136 @@
+"""
+Transfer fee schedule.
+
+Fees are computed in whole cents with fixed-point rates, rounded half to
+even. NumPy is optional: with it, batch pricing runs as a few vectorized
+array operations; without it, a plain Python loop gives the same results.
+"""
+
+from array import array
+
+from white_box.money import (
+    RATE_SCALE,
+    Money,
+    apply_rate,
+    divide_half_even,
+    rate_ppm,
+    to_cents,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+# Fee rate charged on top of the amount, per transaction type.
+DEFAULT_RATES = {"regular": 0.02, "express": 0.05, "scheduled": 0.01}
+
+
+class FeeSchedule:
+    """
+    Table of fee rates by transaction type.
+
+    Each type also gets a small integer code, in the order types were added,
+    so that batches can carry types as an integer array. Codes never change
+    once given, so encoded batches stay valid when rates are updated.
+    """
+
+    def __init__(self, rates=None):
+        """
+        Builds the schedule from a transaction type -> rate mapping,
+        DEFAULT_RATES when not given.
+        """
+        self.rates = {}
+        # Transaction type -> rate in parts per million.
+        self.rates_ppm = {}
+        self.types = []
+        self._codes = {}
+        self._table = array("q")
+        self._vector = None
+        for transaction_type, rate in (
+            DEFAULT_RATES if rates is None else rates
+        ).items():
+            self.set_rate(transaction_type, rate)
+
+    def set_rate(self, transaction_type, rate):
+        """
+        Sets the rate of a transaction type, adding the type when new.
+        """
+        ppm = rate_ppm(rate)
+        code = self._codes.get(transaction_type)
+        if code is None:
+            self._codes[transaction_type] = len(self.types)
+            self.types.append(transaction_type)
+            self._table.append(ppm)
+        else:
+            self._table[code] = ppm
+        self.rates[transaction_type] = rate
+        self.rates_ppm[transaction_type] = ppm
+        self._vector = None
+
+    def code(self, transaction_type):
+        """
+        Returns the code of a transaction type. Raises ValueError for
+        unknown types.
+        """
+        try:
+            return self._codes[transaction_type]
+        except KeyError:
+            raise ValueError(f"Unknown transaction type {transaction_type!r}") from None
+
+    def encode(self, transaction_types):
+        """
+        Returns the codes of a sequence of transaction types, as a NumPy
+        array when NumPy is available and an array("b") otherwise.
+        """
+        codes = array("b", map(self.code, transaction_types))
+        return np.frombuffer(codes, dtype=np.int8) if np is not None else codes
+
+    def fee(self, amount, transaction_type):
+        """
+        Returns the fee for one transfer as Money. Raises ValueError for
+        unknown types.
+        """
+        ppm = self._table[self.code(transaction_type)]
+        return Money(apply_rate(to_cents(amount), ppm))
+
+    def batch_fees(self, cents, codes):
+        """
+        Returns the fees and the totals (amount plus fee), in cents, of a
+        batch given as parallel amount-in-cents and type-code sequences.
+
+        NumPy arrays in give int64 NumPy arrays out in one vectorized pass.
+        Without NumPy, any sequences work and array("q") results are
+        returned. Raises ValueError for unknown codes or mismatched lengths.
+        """
+        if np is not None:
+            return self._batch_fees_numpy(cents, codes)
+
+        if len(cents) != len(codes):
+            raise ValueError("amounts and codes differ in length")
+        if codes and not 0 <= min(codes) <= max(codes) < len(self._table):
+            raise ValueError("Unknown transaction type code")
+        rates = tuple(self._table)
+        fees = divide_half_even(
+            [rates[code] * amount for amount, code in zip(cents, codes)]
+        )
+        totals = [amount + fee for amount, fee in zip(cents, fees)]
+        return array("q", fees), array("q", totals)
+
+    def _batch_fees_numpy(self, cents, codes):
+        """
+        NumPy version of batch_fees.
+        """
+        if self._vector is None:
+            self._vector = np.array(self._table, dtype=np.int64)
+        cents = np.asarray(cents, dtype=np.int64)
+        codes = np.asarray(codes)
+        if cents.shape != codes.shape:
+            raise ValueError("amounts and codes differ in length")
+        if codes.size and (codes.min() < 0 or codes.max() >= len(self._vector)):
+            raise ValueError("Unknown transaction type code")
+        products = self._vector[codes] * cents
+        half = RATE_SCALE // 2
+        fees = (products + half) // RATE_SCALE
+        fees -= (products % RATE_SCALE == half) & (fees % 2 == 1)
+        return fees, cents + fees
@@ -2,6 +2,63 @@
 Integration test homework exercises to test.
 """
 
+from contextlib import nullcontext
+
+from white_box.banking_auth import CredentialStore, SessionTable
+from white_box.fee_schedule import FeeSchedule
+from white_box.lru_cache import TTLCache
+from white_box.money import Money, apply_rate, to_cents
+from white_box.output_sinks import output
+
+# Simplified user database every system starts with.
+MOCK_USERS = {"user123": "pass123"}
+
+# Balance every registered user's account opens with.
+OPENING_BALANCE = 1000
+
+# How many transfer outcomes are remembered for retries, and for how long:
+# 15 minutes covers client retries on timeout, and keeping every key that
+# long at 2 million keys per hour takes 500k entries. Faster than that, the
+# least recently used keys are evicted before they expire, so a retry is
+# only recognized within IDEMPOTENCY_KEYS / rate; the cache counts those
+# early evictions apart from expirations.
+IDEMPOTENCY_KEYS = 500_000
+IDEMPOTENCY_TTL = 15 * 60
+
+# How long a login lasts, and how many sessions are kept at most.
+SESSION_TTL = 30 * 60
+SESSION_LIMIT = 1_000_000
+
+# Why a transfer can be rejected, with the message transfer_money prints.
+REJECTIONS = {
+    "not_authenticated": "Sender not authenticated.",
+    "invalid_type": "Invalid transaction type.",
+    "invalid_amount": "Invalid amount.",
+    "insufficient_funds": "Insufficient funds.",
+    "velocity_limit": "Transfer limit reached, try again later.",
+    "idempotency_conflict": "Idempotency key already used for another transfer.",
+}
+
+# Rejections a retry would get again whatever happens in between. Other
+# rejections (no login yet, not enough money, velocity limit) may clear, so
+# a retry with the same idempotency key runs the transfer again.
+FINAL_REJECTIONS = frozenset({"invalid_type", "invalid_amount"})
+
+
+def transfer_message(transfer, reason):
+    """
+    Returns the message transfer_money shows for a (sender, receiver, amount,
+    transaction_type) transfer, accepted when `reason` is None and rejected
+    for that REJECTIONS key otherwise.
+    """
+    if reason is not None:
+        return f"{REJECTIONS[reason]}\n"
+    sender, receiver, amount, transaction_type = transfer
+    return (
+        f"Money transfer of ${amount} ({transaction_type} transfer)"
+        f" from {sender} to {receiver} processed successfully.\n"
+    )
+
 
 # 27
 class BankAccount:  # pylint: disable=too-few-public-methods
@@ -9,77 +66,225 @@ class BankAccount:  # pylint: disable=too-few-public-methods
     Bank account class.
     """
 
-    def __init__(self, account_number, balance):
+    __slots__ = ("account_number", "cents", "sink")
+
+    def __init__(self, account_number, balance, sink=None):
         """
-        Set the bank account details.
+        Set the bank account details. Details are shown on `sink`, the
+        global sink when None.
         """
         self.account_number = account_number
-        self.balance = balance
+        self.cents = to_cents(balance)
+        self.sink = sink
+
+    @property
+    def balance(self):
+        """Account balance as Money, kept as whole cents."""
+        return Money(self.cents)
+
+    @balance.setter
+    def balance(self, value):
+        self.cents = to_cents(value)
 
     def view_account(self):
         """
         Function to display the account details.
         """
-        print(f"The account {self.account_number} has a balance of {self.balance}")
+        output(self.sink).write(
+            f"The account {self.account_number} has a balance of {self.balance}\n"
+        )
 
 
-class BankingSystem:
+class BankingSystem:  # pylint: disable=too-many-instance-attributes
     """
     Banking system class.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        fee_schedule=None,
+        journal=None,
+        idempotency_cache=None,
+        sink=None,
+        credentials=None,
+        sessions=None,
+        velocity_limits=None,
+        analytics=None,
+    ):  # pylint: disable=too-many-arguments,too-many-positional-arguments
         """
-        Mock users.
+        Mock users, or the users of `credentials`, a CredentialStore, when
+        given. Logged in users are kept in `sessions`, a SessionTable, so
+        logins expire. Senders are held to `velocity_limits`, a
+        VelocityLimits, when given. Accepted transfers feed `analytics`, a
+        TransferAnalytics, when given. Fees follow `fee_schedule`, the
+        default FeeSchedule when not given. Logins and accepted transfers
+        are recorded in `journal`, a TransferJournal, when given. Outcomes of
+        transfers made with an idempotency key are kept in
+        `idempotency_cache`, a TTLCache. Messages go to `sink`, the global
+        sink when None.
         """
-        self.users = {"user123": "pass123"}  # Simplified user database
-        self.logged_in_users = set()
+        self.sink = sink
+        self.fee_schedule = FeeSchedule() if fee_schedule is None else fee_schedule
+        self.journal = journal
+        if idempotency_cache is None:
+            idempotency_cache = TTLCache(IDEMPOTENCY_KEYS, IDEMPOTENCY_TTL)
+        self.idempotency_cache = idempotency_cache
+        self.users = dict(MOCK_USERS) if credentials is None else credentials
+        if sessions is None:
+            sessions = SessionTable(SESSION_TTL, SESSION_LIMIT)
+        self.logged_in_users = sessions
+        self.velocity_limits = velocity_limits
+        self.analytics = analytics
+        # Account number -> BankAccount, opened on first use.
+        self.accounts = {}
+        self.fee_cents = 0
+
+    @property
+    def fees_collected(self):
+        """Fees collected so far, as Money."""
+        return Money(self.fee_cents)
 
     def authenticate(self, username, password):
         """
         User authentication function.
         """
-        if username in self.users and self.users[username] == password:
+        users = self.users
+        if isinstance(users, CredentialStore):
+            known = users.check(username, password)
+        else:
+            known = username in users and users[username] == password
+        if known:
             if username not in self.logged_in_users:
+                if self.journal is not None:
+                    self.journal.append_login(username)
                 self.logged_in_users.add(username)
-                print(f"User {username} authenticated successfully.")
+                output(self.sink).write(
+                    f"User {username} authenticated successfully.\n"
+                )
                 return True
 
-            print("User already logged in.")
+            output(self.sink).write("User already logged in.\n")
         else:
-            print("Authentication failed.")
+            output(self.sink).write("Authentication failed.\n")
 
         return False
 
-    def transfer_money(self, sender, receiver, amount, transaction_type):
+    def account(self, account_number):
+        """
+        Returns the account, opening it on first use. Registered users start
+        with OPENING_BALANCE, anyone else with nothing.
+        """
+        account = self.accounts.get(account_number)
+        if account is None:
+            balance = OPENING_BALANCE if account_number in self.users else 0
+            account = BankAccount(account_number, balance, self.sink)
+            self.accounts[account_number] = account
+        return account
+
+    def transfer_money(
+        self, sender, receiver, amount, transaction_type, idempotency_key=None
+    ):  # pylint: disable=too-many-arguments,too-many-positional-arguments
         """
         Function to perform a money transfer.
+
+        A retry carrying the `idempotency_key` of an earlier transfer from the
+        same sender gets the original outcome back without running again,
+        when that outcome was an acceptance or one of FINAL_REJECTIONS; a
+        different transfer reusing the key is rejected.
         """
-        if sender not in self.logged_in_users:
-            print("Sender not authenticated.")
-            return False
-
-        # Simulate transaction processing logic
-        if transaction_type == "regular":
-            fee = 0.02 * amount
-        elif transaction_type == "express":
-            fee = 0.05 * amount
-        elif transaction_type == "scheduled":
-            fee = 0.01 * amount
+        transfer = (sender, receiver, amount, transaction_type)
+        if idempotency_key is None:
+            reason = self._transfer_reason(transfer)
         else:
-            print("Invalid transaction type.")
-            return False
+            reason = self._keyed_reason(transfer, (sender, idempotency_key))
+        output(self.sink).write(transfer_message(transfer, reason))
+        return reason is None
 
-        # Simulate checking for sufficient funds
-        if BankAccount(sender, 1000).balance < (amount + fee):
-            print("Insufficient funds.")
-            return False
+    def _keyed_reason(self, transfer, key, cache_lock=nullcontext()):
+        """
+        Returns the outcome cached under `key` for the transfer, or runs it
+        and caches the outcome when it is final. The cache is only touched
+        under `cache_lock`, for subclasses sharing it between threads.
+        """
+        with cache_lock:
+            outcome = self.idempotency_cache.get(key)
+        if outcome is not None:
+            return outcome[1] if outcome[0] == transfer else "idempotency_conflict"
+        reason = self._transfer_reason(transfer)
+        if reason is None or reason in FINAL_REJECTIONS:
+            with cache_lock:
+                self.idempotency_cache.put(key, (transfer, reason))
+        return reason
 
-        print(
-            f"Money transfer of ${amount} ({transaction_type} transfer)"
-            f" from {sender} to {receiver} processed successfully."
-        )
-        return True
+    def _transfer_reason(self, transfer):
+        """
+        Runs one transfer and returns None when accepted and the REJECTIONS
+        key otherwise.
+        """
+        rejected = self.transfer_batch((transfer,))["rejected"]
+        return rejected[0][1] if rejected else None
+
+    def transfer_batch(self, transfers):  # pylint: disable=too-many-locals
+        """
+        Applies (sender, receiver, amount, transaction_type) transfers in
+        order, in a single pass and without printing. A valid transfer debits
+        the amount plus its fee from the sender and credits the amount to the
+        receiver, so each transfer sees the balances left by the ones before.
+        Amounts are converted to whole cents and fees rounded half to even.
+        Returns the positions of the accepted transfers and (position,
+        REJECTIONS key) pairs for the rejected ones.
+        """
+        # Sessions and velocity windows are checked as of the batch start.
+        sessions = self.logged_in_users.expiry
+        now = self.logged_in_users.clock()
+        limits = self.velocity_limits
+        admit = limits.admit if limits is not None else None
+        limits_now = limits.clock() if limits is not None else None
+        accounts = self.accounts
+        rates = self.fee_schedule.rates_ppm
+        log = self.journal.append_transfer if self.journal is not None else None
+        record = self.analytics.record if self.analytics is not None else None
+        report = {"accepted": [], "rejected": []}
+        accept, reject = report["accepted"].append, report["rejected"].append
+        fees = 0
+        try:
+            for position, (sender, receiver, amount, transaction_type) in enumerate(
+                transfers
+            ):
+                if not sessions.get(sender, now) > now:
+                    reject((position, "not_authenticated"))
+                    continue
+                ppm = rates.get(transaction_type)
+                if ppm is None:
+                    reject((position, "invalid_type"))
+                    continue
+                cents = to_cents(amount)
+                if not cents > 0:
+                    reject((position, "invalid_amount"))
+                    continue
+
+                fee = apply_rate(cents, ppm)
+                source = accounts.get(sender) or self.account(sender)
+                if source.cents < cents + fee:
+                    reject((position, "insufficient_funds"))
+                    continue
+                if admit is not None and not admit(
+                    sender, cents, transaction_type, limits_now
+                ):
+                    reject((position, "velocity_limit"))
+                    continue
+                target = accounts.get(receiver) or self.account(receiver)
+                if log is not None:
+                    log(sender, receiver, cents, fee, transaction_type)
+                source.cents -= cents + fee
+                target.cents += cents
+                fees += fee
+                if record is not None:
+                    record(transaction_type, cents, fee)
+                accept(position)
+        finally:
+            self.fee_cents += fees
+        return report
 
 
 # 28
@@ -88,19 +293,21 @@ class Product:  # pylint: disable=too-few-public-methods
     Product class.
     """
 
-    def __init__(self, name, price):
+    def __init__(self, name, price, sink=None):
         """
-        Set the product details.
+        Set the product details. Details are shown on `sink`, the global sink
+        when None.
         """
         self.name = name
         self.price = price
+        self.sink = sink
 
     def view_product(self):
         """
         Function to display the product details.
         """
         msg = f"The product {self.name} has a price of {self.price}"
-        print(msg)
+        output(self.sink).write(f"{msg}\n")
         return msg
 
 
@@ -109,10 +316,12 @@ class ShoppingCart:
     Shopping cart class.
     """
 
-    def __init__(self):
+    def __init__(self, sink=None):
         """
-        Initialize the shopping cart.
+        Initialize the shopping cart. Its content and totals are shown on
+        `sink`, the global sink when None.
         """
+        self.sink = sink
         self.items = []
 
     def add_product(self, product, quantity=1):
@@ -142,16 +351,24 @@ class ShoppingCart:
         """
         Function to display the shopping cart content.
         """
-        for item in self.items:
-            print(
+        output(self.sink).write(
+            "".join(
                 f"{item['quantity']} x {item['product'].name}"
-                f" - ${item['product'].price * item['quantity']}"
+                f" - ${Money.of(item['product'].price) * item['quantity']}\n"
+                for item in self.items
             )
+        )
 
     def checkout(self):
         """
         Function to checkout the items from the shopping cart.
         """
-        total = sum(item["product"].price * item["quantity"] for item in self.items)
-        print(f"Total: ${total}")
-        print("Checkout completed. Thank you for shopping!")
+        total = Money(
+            sum(
+                to_cents(item["product"].price) * item["quantity"]
+                for item in self.items
+            )
+        )
+        output(self.sink).write(
+            f"Total: ${total}\nCheckout completed. Thank you for shopping!\n"
+        )
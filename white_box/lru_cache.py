@@ -0,0 +1,151 @@
+"""
+Small bounded least-recently-used caches.
+"""
+
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Mapping that keeps at most `maxsize` entries, dropping the least
+    recently used one when full. Counts hits, misses and evictions to help
+    sizing it.
+    """
+
+    def __init__(self, maxsize=1024):
+        """
+        Starts empty.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        """
+        Number of cached entries.
+        """
+        return len(self._entries)
+
+    def __contains__(self, key):
+        """
+        Whether `key` is cached, without counting as a use.
+        """
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """
+        Returns the value cached under `key` and marks it as recently used.
+        """
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return self._entries[key]
+
+    def put(self, key, value):
+        """
+        Caches `value` under `key`, evicting the oldest entry when full.
+        """
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, key):
+        """
+        Drops the entry cached under `key`, if any.
+        """
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Drops every entry, keeping the counters.
+        """
+        self._entries.clear()
+
+    def info(self):
+        """
+        Returns the counters along with the current and maximum sizes.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+class TTLCache(LRUCache):
+    """
+    LRUCache whose entries also expire `ttl` seconds after being put.
+
+    Expired entries count as misses and are dropped when looked up or when
+    they reach the least recently used end, so memory stays bounded by
+    `maxsize` whatever the key rate. Past `maxsize` live entries, the least
+    recently used one is evicted before its `ttl`: `evictions` counts those,
+    `expirations` the entries that lived their full `ttl`.
+    """
+
+    def __init__(self, maxsize=1024, ttl=3600.0, clock=time.monotonic):
+        """
+        Starts empty. `clock` returns the current time in seconds.
+        """
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self.expirations = 0
+        self._clock = clock
+
+    def __contains__(self, key):
+        """
+        Whether `key` is cached and not expired, without counting as a use.
+        """
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > self._clock()
+
+    def get(self, key, default=None):
+        """
+        Returns the value cached under `key` and marks it as recently used,
+        unless it expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        if entry[0] <= self._clock():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, value):
+        """
+        Caches `value` under `key` for `ttl` seconds, first dropping expired
+        entries from the least recently used end, then evicting the oldest
+        live entry when still full.
+        """
+        now = self._clock()
+        entries = self._entries
+        while entries:
+            oldest = next(iter(entries.values()))
+            if oldest[0] > now:
+                break
+            entries.popitem(last=False)
+            self.expirations += 1
+        super().put(key, (now + self.ttl, value))
+
+    def info(self):
+        """
+        Returns the counters, expirations included, along with the current
+        and maximum sizes.
+        """
+        return {**super().info(), "expirations": self.expirations}
@@ -0,0 +1,228 @@
+"""
+Fixed-point money as a whole number of cents.
+
+Amounts are kept as Python ints, so adding and comparing them is exact and
+as fast as int arithmetic. Multiplying by a fractional rate goes through
+apply_rate, which works on integer parts per million and rounds explicitly.
+"""
+
+from array import array
+from decimal import ROUND_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_UP
+from functools import total_ordering
+
+# Rates are fixed-point integers with six decimals: 0.02 is 20_000.
+RATE_SCALE = 1_000_000
+HALF_SCALE = RATE_SCALE // 2
+
+ROUNDINGS = (ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_DOWN, ROUND_UP)
+
+
+def to_cents(amount):
+    """
+    Returns a Money, int, float or Decimal amount of currency units as whole
+    cents, rounding floats and Decimals to the nearest cent.
+    """
+    if isinstance(amount, int):
+        return amount * 100
+    if isinstance(amount, Money):
+        return amount.cents
+    return round(amount * 100)
+
+
+def rate_ppm(rate):
+    """
+    Returns a fractional rate (0.02, Decimal("0.95")...) in parts per million.
+    """
+    return round(rate * RATE_SCALE)
+
+
+def apply_rate(cents, ppm, rounding=ROUND_HALF_EVEN):
+    """
+    Returns `cents` times `ppm` parts per million, rounded to whole cents with
+    one of the decimal module rounding modes in ROUNDINGS: ROUND_HALF_EVEN
+    (ties to even), ROUND_HALF_UP (ties away from zero), ROUND_DOWN (toward
+    zero) or ROUND_UP (away from zero).
+    """
+    product = cents * ppm
+    if rounding == ROUND_HALF_EVEN:
+        # Adding half rounds ties up, so ties that came out odd step back.
+        quotient = (product + HALF_SCALE) // RATE_SCALE
+        if quotient & 1 and product % RATE_SCALE == HALF_SCALE:
+            quotient -= 1
+        return quotient
+    if rounding not in ROUNDINGS:
+        raise ValueError(f"Unsupported rounding {rounding!r}")
+    quotient, remainder = divmod(abs(product), RATE_SCALE)
+    if rounding == ROUND_HALF_UP:
+        quotient += 2 * remainder >= RATE_SCALE
+    elif rounding == ROUND_UP:
+        quotient += remainder > 0
+    return -quotient if product < 0 else quotient
+
+
+def divide_half_even(products):
+    """
+    Returns products of cents and parts-per-million rates as whole cents,
+    rounded like apply_rate with ROUND_HALF_EVEN but without a call per
+    amount.
+    """
+    scale, half = RATE_SCALE, HALF_SCALE
+    return [
+        (product + half) // scale
+        - (product % scale == half and (product + half) // scale & 1)
+        for product in products
+    ]
+
+
+@total_ordering
+class Money:
+    """
+    Amount of money held as whole cents.
+
+    Money compares equal to plain numbers holding the same amount of units,
+    so Money.of(479.9) == 479.9, and prints like one: "745", "479.90".
+    Adding or subtracting plain numbers converts them with to_cents first;
+    multiplying takes whole numbers only, fractional rates go through
+    times() so the rounding is chosen explicitly.
+    """
+
+    __slots__ = ("cents",)
+
+    def __init__(self, cents=0):
+        """
+        Wraps a whole number of cents.
+        """
+        self.cents = cents
+
+    @classmethod
+    def of(cls, amount):
+        """
+        Returns the Money for an amount of currency units.
+        """
+        return cls(to_cents(amount))
+
+    def times(self, rate, rounding=ROUND_HALF_EVEN):
+        """
+        Returns this amount times a fractional rate, rounded to whole cents.
+        """
+        return Money(apply_rate(self.cents, rate_ppm(rate), rounding))
+
+    def __float__(self):
+        return self.cents / 100
+
+    def __str__(self):
+        units, cents = divmod(abs(self.cents), 100)
+        sign = "-" if self.cents < 0 else ""
+        return f"{sign}{units}.{cents:02d}" if cents else f"{sign}{units}"
+
+    def __repr__(self):
+        return f"Money('{self}')"
+
+    def __bool__(self):
+        return bool(self.cents)
+
+    def __hash__(self):
+        return hash(self.cents / 100)
+
+    def __eq__(self, other):
+        if isinstance(other, Money):
+            return self.cents == other.cents
+        if isinstance(other, int):
+            return self.cents == other * 100
+        if isinstance(other, float):
+            return self.cents / 100 == other
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, Money):
+            return self.cents < other.cents
+        if isinstance(other, int):
+            return self.cents < other * 100
+        if isinstance(other, float):
+            return self.cents / 100 < other
+        return NotImplemented
+
+    def __neg__(self):
+        return Money(-self.cents)
+
+    def __abs__(self):
+        return Money(abs(self.cents))
+
+    def __add__(self, other):
+        try:
+            return Money(self.cents + to_cents(other))
+        except TypeError:
+            return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        try:
+            return Money(self.cents - to_cents(other))
+        except TypeError:
+            return NotImplemented
+
+    def __rsub__(self, other):
+        try:
+            return Money(to_cents(other) - self.cents)
+        except TypeError:
+            return NotImplemented
+
+    def __mul__(self, other):
+        if isinstance(other, int) and not isinstance(other, bool):
+            return Money(self.cents * other)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+
+class MoneyArray:
+    """
+    Batch of amounts stored as cents in an array("q"), 8 bytes each.
+    """
+
+    __slots__ = ("cents",)
+
+    def __init__(self, cents=()):
+        """
+        Wraps an iterable of whole cents.
+        """
+        self.cents = array("q", cents)
+
+    @classmethod
+    def of(cls, amounts):
+        """
+        Returns the MoneyArray for amounts of currency units.
+        """
+        return cls(map(to_cents, amounts))
+
+    def __len__(self):
+        return len(self.cents)
+
+    def __getitem__(self, index):
+        return Money(self.cents[index])
+
+    def __iter__(self):
+        return map(Money, self.cents)
+
+    def append(self, amount):
+        """
+        Appends an amount of currency units.
+        """
+        self.cents.append(to_cents(amount))
+
+    def total(self):
+        """
+        Returns the exact sum of the amounts.
+        """
+        return Money(sum(self.cents))
+
+    def times(self, rate, rounding=ROUND_HALF_EVEN):
+        """
+        Returns a new MoneyArray with every amount times a fractional rate,
+        each rounded to whole cents.
+        """
+        ppm = rate_ppm(rate)
+        if rounding == ROUND_HALF_EVEN:
+            return MoneyArray(divide_half_even([cents * ppm for cents in self.cents]))
+        return MoneyArray([apply_rate(cents, ppm, rounding) for cents in self.cents])
@@ -0,0 +1,188 @@
+"""
+Output sinks for the messages the exercise classes show.
+
+A sink is anything with a text stream's `write(text)` method, so open files,
+StringIO objects and sys.stdout work as sinks too. Classes take a `sink`
+argument and fall back to the global sink, StdoutSink unless set_sink
+changed it, when it is None.
+"""
+
+import queue
+import sys
+import threading
+
+# Queued to make the QueueSink writer thread stop.
+_STOP = object()
+
+
+class StdoutSink:  # pylint: disable=too-few-public-methods
+    """
+    Prints each line of the text, the way the classes always have.
+    """
+
+    def __init__(self):
+        """
+        Lines of one write are printed under a lock so they stay together.
+        """
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        """
+        Prints every line of `text`, one print call per line.
+        """
+        lines = text.split("\n")
+        if not lines[-1]:
+            lines.pop()
+        with self._lock:
+            for line in lines:
+                print(line)
+        return len(text)
+
+
+class NullSink:  # pylint: disable=too-few-public-methods
+    """
+    Drops everything written to it.
+    """
+
+    def write(self, text):
+        """
+        Discards `text`.
+        """
+        return len(text)
+
+
+class BufferedSink:
+    """
+    Collects the text in memory and writes it to `stream`, sys.stdout when
+    not given, in one call once `limit` characters are pending and on flush.
+    """
+
+    def __init__(self, stream=None, limit=1 << 16):
+        """
+        Starts with an empty buffer.
+        """
+        self.stream = stream
+        self.limit = limit
+        self._parts = []
+        self._size = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+    def write(self, text):
+        """
+        Buffers `text`, flushing when the buffer is full.
+        """
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.limit:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        """
+        Writes the pending text.
+        """
+        if self._parts:
+            stream = sys.stdout if self.stream is None else self.stream
+            stream.write("".join(self._parts))
+            self._parts = []
+            self._size = 0
+
+
+class QueueSink:
+    """
+    Hands the text to a background thread that writes it to `stream`,
+    sys.stdout when not given, so callers never wait on the stream. The
+    thread writes whatever piled up since its last write in one call.
+    """
+
+    def __init__(self, stream=None):
+        """
+        Starts the writer thread.
+        """
+        self.stream = sys.stdout if stream is None else stream
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, text):
+        """
+        Queues `text` for the writer thread.
+        """
+        self._queue.put(text)
+        return len(text)
+
+    def flush(self):
+        """
+        Waits until everything queued so far has been written.
+        """
+        if self._thread.is_alive():
+            written = threading.Event()
+            self._queue.put(written)
+            written.wait()
+
+    def close(self):
+        """
+        Writes everything queued and stops the writer thread.
+        """
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _run(self):
+        """
+        Writer thread loop.
+        """
+        get, get_nowait = self._queue.get, self._queue.get_nowait
+        while True:
+            parts, item = [], get()
+            while isinstance(item, str):
+                parts.append(item)
+                try:
+                    item = get_nowait()
+                except queue.Empty:
+                    item = None
+            if parts:
+                self.stream.write("".join(parts))
+            if item is _STOP:
+                return
+            if item is not None:
+                item.set()
+
+
+_sink = StdoutSink()
+
+
+def get_sink():
+    """
+    Returns the global sink.
+    """
+    return _sink
+
+
+def set_sink(sink):
+    """
+    Makes `sink` the global sink, StdoutSink when None. Returns the previous
+    one so it can be restored.
+    """
+    global _sink  # pylint: disable=global-statement
+    previous = _sink
+    _sink = StdoutSink() if sink is None else sink
+    return previous
+
+
+def output(sink):
+    """
+    Returns `sink`, or the global sink when None.
+    """
+    return _sink if sink is None else sink
@@ -0,0 +1,140 @@
+"""
+Tests for the streaming transfer analytics.
+"""
+
+import pickle
+import random
+import unittest
+from unittest.mock import patch
+
+from white_box.banking_analytics import KLLSketch, TransferAnalytics
+from white_box.integration_exercises import BankingSystem
+
+
+def rank_error(values, fraction, estimate):
+    """
+    Returns how far the rank of `estimate` among the sorted `values` is from
+    `fraction`, as a fraction of their number.
+    """
+    below = sum(value < estimate for value in values)
+    not_above = sum(value <= estimate for value in values)
+    rank = fraction * len(values)
+    if below <= rank <= not_above:
+        return 0
+    return min(abs(below - rank), abs(not_above - rank)) / len(values)
+
+
+class TestKLLSketch(unittest.TestCase):
+    """Tests for the KLLSketch class."""
+
+    def test_quantiles_are_close_in_rank(self):
+        """Checks quantiles of a large stream with a bounded number of items."""
+        rng = random.Random(2)
+        values = [round(rng.lognormvariate(8, 1.5)) for _ in range(50_000)]
+        sketch = KLLSketch(seed=1)
+        for value in values:
+            sketch.update(value)
+        self.assertEqual(len(sketch), 50_000)
+        self.assertLess(sum(map(len, sketch.levels)), 4 * sketch.k)
+        for fraction in (0, 0.01, 0.25, 0.5, 0.9, 0.99, 1):
+            error = rank_error(values, fraction, sketch.quantile(fraction))
+            self.assertLess(error, 0.02, fraction)
+
+    def test_merge(self):
+        """Checks merged sketches answer for every stream they saw."""
+        rng = random.Random(4)
+        streams = [[rng.gauss(mean, 10) for _ in range(5000)] for mean in (0, 50, 100)]
+        merged = KLLSketch(seed=0)
+        for number, stream in enumerate(streams):
+            sketch = KLLSketch(seed=number)
+            for value in stream:
+                sketch.update(value)
+            merged.merge(pickle.loads(pickle.dumps(sketch)))
+        values = [value for stream in streams for value in stream]
+        self.assertEqual(len(merged), 15_000)
+        self.assertLess(sum(map(len, merged.levels)), 4 * merged.k)
+        for fraction in (0.1, 0.5, 0.99):
+            error = rank_error(values, fraction, merged.quantile(fraction))
+            self.assertLess(error, 0.02, fraction)
+
+    def test_edge_cases(self):
+        """Checks empty sketches, small streams and invalid arguments."""
+        sketch = KLLSketch(k=8)
+        self.assertIsNone(sketch.quantile(0.5))
+        for value in (5, 1, 3):
+            sketch.update(value)
+        self.assertEqual([sketch.quantile(f) for f in (0, 0.5, 1)], [1, 3, 5])
+        with self.assertRaises(ValueError):
+            sketch.quantile(1.5)
+        with self.assertRaises(ValueError):
+            sketch.merge(KLLSketch(k=16))
+        with self.assertRaises(ValueError):
+            KLLSketch(k=1)
+
+
+class TestTransferAnalytics(unittest.TestCase):
+    """Tests for the TransferAnalytics class."""
+
+    def test_snapshot_and_merge(self):
+        """Checks totals and quantiles per type, alone and merged."""
+        analytics = TransferAnalytics()
+        for cents in range(1, 101):
+            analytics.record("regular", cents * 100, cents * 2)
+        analytics.record("express", 5000, 250)
+        snapshot = analytics.snapshot()
+        self.assertEqual(
+            snapshot["regular"],
+            {"transfers": 100, "amount": 5050, "fees": 101, "p50": 50, "p99": 99},
+        )
+        self.assertEqual(snapshot["express"]["p99"], 50)
+        self.assertEqual(analytics.quantile("regular", 0.25), 25)
+        self.assertIsNone(analytics.quantile("scheduled", 0.5))
+
+        other = TransferAnalytics()
+        other.record("express", 7000, 350)
+        other.record("scheduled", 100, 0)
+        analytics.merge(other)
+        snapshot = analytics.snapshot()
+        self.assertEqual(
+            snapshot["express"],
+            {"transfers": 2, "amount": 120, "fees": 6, "p50": 50, "p99": 70},
+        )
+        self.assertEqual(snapshot["scheduled"]["transfers"], 1)
+
+    @patch("builtins.print")
+    def test_banking_system_feeds_accepted_transfers(self, mock_print):
+        """Checks only accepted transfers count, and retries count once."""
+        system = BankingSystem(analytics=TransferAnalytics())
+        system.authenticate("user123", "pass123")
+        self.assertTrue(system.transfer_money("user123", "ian", 100, "regular", "k1"))
+        self.assertTrue(system.transfer_money("user123", "ian", 100, "regular", "k1"))
+        self.assertFalse(system.transfer_money("user123", "ian", 5000, "regular"))
+        self.assertFalse(system.transfer_money("ian", "user123", 10, "regular"))
+        mock_print.assert_called_with("Sender not authenticated.")
+        system.transfer_batch(
+            [("user123", "ian", 20, "express"), ("user123", "ian", 0, "express")]
+        )
+        self.assertEqual(
+            system.analytics.snapshot(),
+            {
+                "regular": {
+                    "transfers": 1,
+                    "amount": 100,
+                    "fees": 2,
+                    "p50": 100,
+                    "p99": 100,
+                },
+                "express": {
+                    "transfers": 1,
+                    "amount": 20,
+                    "fees": 1,
+                    "p50": 20,
+                    "p99": 20,
+                },
+            },
+        )
+        self.assertEqual(system.fees_collected, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
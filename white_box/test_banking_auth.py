@@ -0,0 +1,159 @@
+"""
+Tests for the credential store and the session table.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from white_box.banking_auth import (
+    BloomFilter,
+    CredentialStore,
+    SessionTable,
+    iter_credentials,
+    write_store,
+)
+from white_box.integration_exercises import BankingSystem
+
+CREDENTIALS = [(f"user{number}", f"secret{number}") for number in range(500)]
+
+
+class TestBloomFilter(unittest.TestCase):
+    """Tests for the BloomFilter class."""
+
+    def test_no_false_negatives_few_false_positives(self):
+        """Checks added keys are always found and few others are."""
+        bloom = BloomFilter.for_capacity(1000, error_rate=0.01)
+        self.assertEqual(bloom.hashes, 7)
+        for number in range(1000):
+            bloom.add(f"in{number}".encode())
+        self.assertTrue(all(f"in{n}".encode() in bloom for n in range(1000)))
+        false_positives = sum(f"out{n}".encode() in bloom for n in range(10_000))
+        self.assertLess(false_positives, 300)
+
+
+class TestCredentialStore(unittest.TestCase):
+    """Tests for write_store and the CredentialStore class."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "users.store")
+
+    def open_store(self, credentials):
+        """
+        Writes a store of `credentials` and opens it.
+        """
+        write_store(self.path, credentials)
+        store = CredentialStore(self.path)
+        self.addCleanup(store.close)
+        return store
+
+    def test_check(self):
+        """Checks known users, wrong passwords and unknown users."""
+        store = self.open_store([*CREDENTIALS, ("zoé", "pässwörd")])
+        self.assertEqual(len(store), 501)
+        for username, password in CREDENTIALS[::37]:
+            self.assertTrue(store.check(username, password))
+            self.assertFalse(store.check(username, password + "x"))
+        self.assertTrue(store.check("zoé", "pässwörd"))
+        self.assertIn("user0", store)
+        self.assertNotIn("user", store)
+        self.assertFalse(store.check("nobody", "secret0"))
+
+    def test_unknown_users_mostly_stop_at_the_bloom_filter(self):
+        """Checks the counters of unknown user lookups."""
+        store = self.open_store(CREDENTIALS)
+        for number in range(1000):
+            self.assertNotIn(f"stranger{number}", store)
+        info = store.info()
+        self.assertEqual(info["lookups"], 1000)
+        self.assertEqual(info["bloom_rejections"] + info["false_positives"], 1000)
+        self.assertGreater(info["bloom_rejections"], 950)
+
+    def test_edge_cases(self):
+        """Checks the last password wins, empty stores and foreign files."""
+        store = self.open_store([("ana", "old"), ("bob", "b"), ("ana", "new")])
+        self.assertEqual(len(store), 2)
+        self.assertTrue(store.check("ana", "new"))
+        self.assertFalse(store.check("ana", "old"))
+        self.assertNotIn("user", self.open_store([]))
+        with open(self.path, "wb") as stream:
+            stream.write(b"username,password\n")
+        with self.assertRaises(ValueError):
+            CredentialStore(self.path)
+
+    def test_iter_credentials(self):
+        """Checks credentials are read from CSV lines."""
+        lines = ["username,password\n", "ana,a,b\n", '"bob","p,w"\n']
+        self.assertEqual(list(iter_credentials(lines)), [("ana", "a"), ("bob", "p,w")])
+
+    @patch("builtins.print")
+    def test_banking_system_logins(self, mock_print):
+        """Checks BankingSystem authenticates against a store."""
+        system = BankingSystem(credentials=self.open_store(CREDENTIALS))
+        self.assertTrue(system.authenticate("user7", "secret7"))
+        self.assertFalse(system.authenticate("user7", "secret7"))
+        mock_print.assert_called_with("User already logged in.")
+        self.assertFalse(system.authenticate("user8", "secret7"))
+        self.assertFalse(system.authenticate("user123", "pass123"))
+        mock_print.assert_called_with("Authentication failed.")
+        self.assertTrue(system.transfer_money("user7", "user8", 10, "regular"))
+        self.assertEqual(system.account("user8").balance, 1010)
+
+
+class TestSessionTable(unittest.TestCase):
+    """Tests for the SessionTable class."""
+
+    def setUp(self):
+        self.now = 0.0
+        self.sessions = SessionTable(ttl=10, maxsize=3, clock=lambda: self.now)
+
+    def test_sessions_expire(self):
+        """Checks sessions last `ttl` seconds and restart on login."""
+        self.sessions.add("ana")
+        self.now = 5
+        self.sessions.update(["bob", "ana"])
+        self.now = 12
+        self.assertEqual(set(self.sessions), {"ana", "bob"})
+        self.now = 15
+        self.assertNotIn("ana", self.sessions)
+        self.assertNotIn("eve", self.sessions)
+        self.assertEqual(len(self.sessions), 2)
+        self.assertEqual(self.sessions.purge(), 2)
+        self.assertEqual(len(self.sessions), 0)
+        self.assertEqual(self.sessions.expirations, 2)
+
+    def test_size_is_bounded(self):
+        """Checks logins drop expired sessions, then the oldest live ones."""
+        for number in range(3):
+            self.sessions.add(f"user{number}")
+        self.now = 11
+        self.sessions.add("ana")
+        self.assertEqual(list(self.sessions), ["ana"])
+        for username in ("bob", "eve", "ian"):
+            self.sessions.add(username)
+        self.assertEqual(list(self.sessions), ["bob", "eve", "ian"])
+        self.assertEqual(self.sessions.evictions, 1)
+        self.sessions.discard("eve")
+        self.assertEqual(list(self.sessions), ["bob", "ian"])
+
+    @patch("builtins.print")
+    def test_expired_login_blocks_transfers(self, mock_print):
+        """Checks a sender must log in again once the session expired."""
+        system = BankingSystem(sessions=self.sessions)
+        system.authenticate("user123", "pass123")
+        self.assertTrue(system.transfer_money("user123", "ian", 10, "regular"))
+        self.now = 10
+        self.assertFalse(system.transfer_money("user123", "ian", 10, "regular"))
+        mock_print.assert_called_with("Sender not authenticated.")
+        self.assertTrue(system.authenticate("user123", "pass123"))
+        self.assertEqual(
+            system.transfer_batch([("user123", "ian", 10, "regular")]),
+            {"accepted": [0], "rejected": []},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+"""
+Tests for the thread-safe banking system.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from white_box.banking_analytics import TransferAnalytics
+from white_box.banking_concurrent import ConcurrentBankingSystem
+from white_box.banking_journal import TransferJournal, recover
+from white_box.banking_velocity import VelocityLimits
+from white_box.integration_exercises import OPENING_BALANCE, BankingSystem
+
+USERS = [f"user{number}" for number in range(20)]
+
+
+def make_system(stripes=64, **options):
+    """
+    Builds a system with USERS registered and logged in.
+    """
+    system = ConcurrentBankingSystem(stripes=stripes, **options)
+    for username in USERS:
+        system.users[username] = "secret"
+        system.logged_in_users.add(username)
+    return system
+
+
+def run_threads(target, count):
+    """
+    Runs `target(number)` on `count` threads and waits for them.
+    """
+    threads = [threading.Thread(target=target, args=(n,)) for n in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    return not any(thread.is_alive() for thread in threads)
+
+
+class TestConcurrentBankingSystem(unittest.TestCase):
+    """Tests for the ConcurrentBankingSystem class."""
+
+    def setUp(self):
+        interval = sys.getswitchinterval()
+        self.addCleanup(sys.setswitchinterval, interval)
+        sys.setswitchinterval(1e-6)
+
+    @patch("builtins.print")
+    def test_transfer_money_matches_banking_system(self, mock_print):
+        """Checks messages, balances and fees match BankingSystem."""
+        system = ConcurrentBankingSystem()
+        self.assertTrue(system.authenticate("user123", "pass123"))
+        self.assertFalse(system.authenticate("user123", "pass123"))
+        self.assertTrue(system.transfer_money("user123", "ian", 250, "regular"))
+        self.assertFalse(system.transfer_money("user123", "ian", 900, "regular"))
+        mock_print.assert_called_with("Insufficient funds.")
+        self.assertEqual(system.account("user123").balance, 745)
+        self.assertEqual(system.account("ian").balance, 250)
+        self.assertEqual(system.fees_collected, 5)
+        self.assertEqual(
+            system.transfer_batch([("ian", "user123", 1, "regular")])["rejected"],
+            [(0, "not_authenticated")],
+        )
+
+    def test_money_is_conserved_under_contention(self):
+        """Checks concurrent transfers neither create nor lose money."""
+        system = make_system(stripes=4)
+        accepted = []
+
+        def work(number):
+            rng = random.Random(number)
+            transfers = [
+                (rng.choice(USERS), rng.choice(USERS), rng.randint(1, 300), "regular")
+                for _ in range(2000)
+            ]
+            accepted.append(len(system.transfer_batch(transfers)["accepted"]))
+
+        self.assertTrue(run_threads(work, 8))
+        balances = [system.account(username).balance for username in USERS]
+        self.assertTrue(all(balance >= 0 for balance in balances))
+        self.assertAlmostEqual(
+            sum(balances) + system.fees_collected, OPENING_BALANCE * len(USERS)
+        )
+        self.assertGreater(sum(accepted), 0)
+
+    def test_opposite_transfers_do_not_deadlock(self):
+        """Checks transfers in both directions between two accounts finish."""
+        system = make_system(stripes=2)
+        first, second = USERS[0], USERS[1]
+        while system.stripe(first) == system.stripe(second):
+            second = USERS[USERS.index(second) + 1]
+
+        def work(number):
+            pair = (first, second) if number % 2 else (second, first)
+            for _ in range(2000):
+                system.transfer(*pair, 1, "scheduled")
+
+        self.assertTrue(run_threads(work, 4))
+        self.assertAlmostEqual(
+            system.account(first).balance
+            + system.account(second).balance
+            + system.fees_collected,
+            2 * OPENING_BALANCE,
+        )
+
+    @patch("builtins.print")
+    def test_concurrent_retries_run_once(self, mock_print):
+        """Checks retries racing on one idempotency key move money once."""
+        system = make_system(stripes=4)
+        outcomes = []
+
+        def work(number):
+            for attempt in range(50):
+                outcomes.append(
+                    system.transfer_money(
+                        USERS[0], "ian", 1, "regular", f"key{attempt % 25}"
+                    )
+                )
+            outcomes.append(system.transfer_money(USERS[number], "ian", 1, "wire", "w"))
+
+        self.assertTrue(run_threads(work, 8))
+        mock_print.assert_called()
+        self.assertEqual(outcomes.count(True), 400)
+        self.assertEqual(system.account("ian").balance, 25)
+        self.assertEqual(system.idempotency_cache.info()["size"], 25 + 8)
+
+    def test_limits_journal_and_analytics_apply(self):
+        """Checks concurrent transfers go through every transfer stage."""
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "transfers.journal")
+        with TransferJournal(path) as journal:
+            system = make_system(
+                stripes=4,
+                journal=journal,
+                velocity_limits=VelocityLimits({"regular": (60, 1, None)}),
+                analytics=TransferAnalytics(),
+            )
+
+            def work(number):
+                rng = random.Random(number)
+                for _ in range(200):
+                    system.transfer(
+                        rng.choice(USERS), "ian", 1, rng.choice(["regular", "express"])
+                    )
+
+            self.assertTrue(run_threads(work, 4))
+        snapshot = system.analytics.snapshot()
+        self.assertLessEqual(snapshot["regular"]["transfers"], len(USERS))
+        self.assertGreater(system.velocity_limits.rejections, 0)
+        self.assertEqual(
+            sum(metric["transfers"] for metric in snapshot.values()),
+            journal.records,
+        )
+        self.assertEqual(system.account("ian").balance, journal.records)
+
+        recovered = BankingSystem()
+        recover(recovered, path)
+        self.assertEqual(recovered.account("ian").balance, journal.records)
+        self.assertEqual(recovered.fees_collected, system.fees_collected)
+
+
+if __name__ == "__main__":
+    unittest.main()
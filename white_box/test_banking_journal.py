@@ -0,0 +1,101 @@
+"""
+Tests for the transfer journal.
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from white_box.banking_journal import TransferJournal, iter_records, recover
+from white_box.integration_exercises import BankingSystem
+
+
+class TestTransferJournal(unittest.TestCase):
+    """Tests for the TransferJournal class and recovery."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "transfers.journal")
+
+    def run_transfers(self, **options):
+        """
+        Logs user123 in and makes a few transfers through a journaled system.
+        """
+        with patch("builtins.print"), TransferJournal(self.path, **options) as journal:
+            system = BankingSystem(journal=journal)
+            system.authenticate("user123", "pass123")
+            system.authenticate("user123", "pass123")
+            system.transfer_money("user123", "ian", 250, "regular")
+            system.transfer_money("user123", "ian", 5000, "regular")
+            system.transfer_money("ian", "user123", 10, "regular")
+            system.transfer_batch([("user123", "ana", 100.5, "express")])
+        return system, journal
+
+    def test_recover_rebuilds_ledger(self):
+        """Checks replaying the journal gives back logins, balances and fees."""
+        system, journal = self.run_transfers()
+        self.assertEqual(journal.stats()["records"], 3)
+
+        recovered = BankingSystem()
+        report = recover(recovered, self.path)
+        self.assertEqual(report, {"logins": 1, "transfers": 2, "truncated_bytes": 0})
+        self.assertEqual(set(recovered.logged_in_users), {"user123"})
+        self.assertEqual(recovered.fees_collected, system.fees_collected)
+        for number in ("user123", "ian", "ana"):
+            self.assertEqual(
+                recovered.account(number).balance, system.account(number).balance
+            )
+
+    def test_group_commit(self):
+        """Checks fsyncs are batched by record count and by age."""
+        with patch("white_box.banking_journal.fsync") as mock_fsync:
+            _, journal = self.run_transfers(max_records=2, max_delay=60)
+            self.assertEqual(
+                journal.stats(), {"records": 3, "commits": 2, "pending": 0}
+            )
+            self.assertEqual(mock_fsync.call_count, 2)
+
+            os.remove(self.path)
+            _, journal = self.run_transfers(max_records=100, max_delay=0)
+            self.assertEqual(journal.commits, 3)
+
+    @patch("builtins.print")
+    def test_idle_group_is_committed(self, mock_print):
+        """Checks records become durable after max_delay with no more appends."""
+        with TransferJournal(self.path, max_delay=0.005) as journal:
+            system = BankingSystem(journal=journal)
+            system.authenticate("user123", "pass123")
+            self.assertTrue(system.transfer_money("user123", "ian", 250, "regular"))
+            mock_print.assert_called()
+            deadline = time.monotonic() + 5
+            while journal.stats()["pending"] and time.monotonic() < deadline:
+                time.sleep(0.005)
+            stats = journal.stats()
+            self.assertEqual((stats["records"], stats["pending"]), (2, 0))
+            self.assertGreaterEqual(stats["commits"], 1)
+            with open(self.path, "rb") as stream:
+                self.assertEqual(len(list(iter_records(stream))), 2)
+
+    def test_torn_tail_is_dropped(self):
+        """Checks a half-written record is cut off and appends resume."""
+        self.run_transfers()
+        size = os.path.getsize(self.path)
+        with open(self.path, "ab") as stream:
+            stream.write(b"\x20\x00\x00\x00garbage")
+
+        report = recover(BankingSystem(), self.path)
+        self.assertEqual(report["transfers"], 2)
+        self.assertEqual(report["truncated_bytes"], 11)
+        self.assertEqual(os.path.getsize(self.path), size)
+
+        with TransferJournal(self.path) as journal:
+            journal.append_login("ian")
+        with open(self.path, "rb") as stream:
+            self.assertEqual(len(list(iter_records(stream))), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Tests for the sharded banking system.
+"""
+
+import random
+import unittest
+from unittest.mock import call, patch
+
+from white_box.banking_analytics import TransferAnalytics
+from white_box.banking_sharded import ShardedBankingSystem, shard_of
+from white_box.integration_exercises import BankingSystem
+from white_box.output_sinks import NullSink
+
+USERS = [f"user{number}" for number in range(20)]
+
+
+def make_transfers(rng, count):
+    """
+    Builds small transfers between USERS and a few outsiders, some invalid,
+    none large enough to depend on money received earlier in the batch.
+    """
+    senders = [*USERS, "stranger"]
+    receivers = [*USERS, "ian", "zoe"]
+    types = ["regular", "express", "scheduled", "instant"]
+    return [
+        (
+            rng.choice(senders),
+            rng.choice(receivers),
+            rng.choice([rng.randint(0, 20), round(rng.uniform(0, 20), 2)]),
+            rng.choice(types),
+        )
+        for _ in range(count)
+    ]
+
+
+class TestShardedBankingSystem(unittest.TestCase):
+    """Tests for the ShardedBankingSystem class."""
+
+    def setUp(self):
+        self.system = ShardedBankingSystem(shards=3)
+        self.addCleanup(self.system.close)
+
+    def log_in(self):
+        """
+        Registers USERS and logs them in, except the last one.
+        """
+        self.system.add_users(dict.fromkeys(USERS, "secret"))
+        with patch("builtins.print"):
+            for username in USERS[:-1]:
+                self.system.authenticate(username, "secret")
+
+    def test_users_are_spread(self):
+        """Checks users land on several shards, each on a fixed one."""
+        shards = {shard_of(username, 3) for username in USERS}
+        self.assertEqual(shards, {0, 1, 2})
+        self.assertEqual(self.system.shard("user7"), shard_of("user7", 3))
+
+    @patch("builtins.print")
+    def test_transfer_money_matches_banking_system(self, mock_print):
+        """Checks messages, balances and fees match BankingSystem."""
+        system = self.system
+        self.assertTrue(system.authenticate("user123", "pass123"))
+        self.assertFalse(system.authenticate("user123", "pass123"))
+        self.assertFalse(system.authenticate("user123", "wrong"))
+        self.assertTrue(system.transfer_money("user123", "ian", 250, "regular"))
+        self.assertFalse(system.transfer_money("user123", "ian", 900, "regular"))
+        self.assertEqual(
+            mock_print.call_args_list,
+            [
+                call("User user123 authenticated successfully."),
+                call("User already logged in."),
+                call("Authentication failed."),
+                call(
+                    "Money transfer of $250 (regular transfer)"
+                    " from user123 to ian processed successfully."
+                ),
+                call("Insufficient funds."),
+            ],
+        )
+        self.assertEqual(system.balance("user123"), 745)
+        self.assertEqual(system.balance("ian"), 250)
+        self.assertEqual(system.fees_collected, 5)
+
+    def test_batch_matches_banking_system(self):
+        """Checks a mixed batch has the same outcome on one system or many."""
+        transfers = make_transfers(random.Random(3), 500)
+        single = BankingSystem(sink=NullSink(), analytics=TransferAnalytics())
+        single.users.update(dict.fromkeys(USERS, "secret"))
+        single.logged_in_users.update(USERS[:-1])
+        self.log_in()
+
+        expected = single.transfer_batch(transfers)
+        report = self.system.transfer_batch(transfers)
+        self.assertEqual(report, expected)
+        self.assertGreater(len(report["accepted"]), 100)
+        self.assertEqual(
+            {reason for _, reason in report["rejected"]},
+            {"not_authenticated", "invalid_type", "invalid_amount"},
+        )
+        for account_number in [*USERS, "ian", "zoe"]:
+            self.assertEqual(
+                self.system.balance(account_number),
+                single.account(account_number).balance,
+            )
+        self.assertEqual(self.system.totals()["fees"], single.fee_cents)
+        # Too few transfers per type for the sketches to compact: exact.
+        self.assertEqual(
+            self.system.analytics().snapshot(), single.analytics.snapshot()
+        )
+
+    def test_money_is_conserved(self):
+        """Checks rejected and cross-shard transfers leave nothing in escrow."""
+        self.log_in()
+        rng = random.Random(5)
+        for _ in range(5):
+            transfers = [
+                (rng.choice(USERS), rng.choice(USERS), rng.randint(1, 800), "express")
+                for _ in range(200)
+            ]
+            report = self.system.transfer_batch(transfers)
+            self.assertEqual(
+                len(report["accepted"]) + len(report["rejected"]), len(transfers)
+            )
+        self.assertIn(
+            (0, "insufficient_funds"),
+            self.system.transfer_batch([(USERS[0], USERS[1], 10**6, "regular")])[
+                "rejected"
+            ],
+        )
+        totals = self.system.totals()
+        self.assertEqual(totals["escrow"], 0)
+        self.assertEqual(totals["opened"], 100_000 * (len(USERS) + 1))
+        self.assertEqual(
+            totals["held"] + totals["escrow"] + totals["fees"], totals["opened"]
+        )
+
+    def test_errors_reach_the_caller(self):
+        """Checks an error raised on a shard is raised again by the caller."""
+        with patch("builtins.print"):
+            self.assertTrue(self.system.authenticate("user123", "pass123"))
+        with self.assertRaises(TypeError):
+            self.system.transfer_batch([("user123", "ian", None, "regular")])
+        self.assertEqual(self.system.balance("user123"), 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+"""
+Tests for the velocity limits.
+"""
+
+import random
+import unittest
+from unittest.mock import patch
+
+from white_box.banking_velocity import VelocityLimits
+from white_box.integration_exercises import BankingSystem
+
+
+class TestVelocityLimits(unittest.TestCase):
+    """Tests for the VelocityLimits class."""
+
+    def setUp(self):
+        self.now = 0.0
+        self.limits = VelocityLimits(
+            {"regular": (60, 3, None), "express": (60, None, 100)},
+            clock=lambda: self.now,
+        )
+
+    def test_count_limit(self):
+        """Checks a sender gets `count` transfers per window."""
+        self.assertEqual(
+            [self.limits.admit("ana", 100, "regular") for _ in range(4)],
+            [True, True, True, False],
+        )
+        self.assertTrue(self.limits.admit("bob", 100, "regular"))
+        # Buckets are 6 seconds wide; the one holding time 0 leaves at 66.
+        self.now = 65.9
+        self.assertFalse(self.limits.admit("ana", 100, "regular"))
+        self.now = 66
+        self.assertTrue(self.limits.admit("ana", 100, "regular"))
+        self.assertEqual(self.limits.rejections, 2)
+
+    def test_amount_limit_per_type(self):
+        """Checks amounts add up per type and other types are not limited."""
+        self.assertTrue(self.limits.admit("ana", 6000, "express"))
+        self.assertFalse(self.limits.admit("ana", 5000, "express"))
+        self.assertTrue(self.limits.admit("ana", 4000, "express"))
+        self.assertFalse(self.limits.admit("ana", 1, "express"))
+        self.assertTrue(self.limits.admit("ana", 10**9, "scheduled"))
+        self.limits.remove_limit("express")
+        self.assertTrue(self.limits.admit("ana", 1, "express"))
+        with self.assertRaises(ValueError):
+            self.limits.set_limit("regular", 0, 1)
+
+    def test_never_admits_past_an_exact_window(self):
+        """Checks random traffic never goes past the limit of a true window."""
+        rng = random.Random(1)
+        limits = VelocityLimits({"regular": (10, 5, 3)}, buckets=4)
+        admitted = []
+        for _ in range(5000):
+            self.now += rng.expovariate(2)
+            cents = rng.randint(1, 100)
+            recent = [c for t, c in admitted if t > self.now - 10]
+            exact = len(recent) < 5 and sum(recent) + cents <= 300
+            if limits.admit("ana", cents, "regular", self.now):
+                self.assertTrue(exact)
+                admitted.append((self.now, cents))
+        self.assertGreater(len(admitted), 900)
+
+    def test_memory_is_bounded(self):
+        """Checks idle senders are dropped, then the oldest past maxsize."""
+        limits = VelocityLimits({"regular": (10, 3, None)}, maxsize=50)
+        for number in range(100):
+            self.assertTrue(limits.admit(f"user{number}", 1, "regular", 0))
+        self.assertEqual(len(limits), 50)
+        self.assertEqual(limits.evictions, 50)
+        limits.admit("ana", 1, "regular", 30)
+        self.assertEqual(
+            limits.info(),
+            {"senders": 1, "rejections": 0, "expirations": 50, "evictions": 50},
+        )
+
+    def test_evicted_sender_stays_limited(self):
+        """Checks a sender evicted within its window is still held to it."""
+        limits = VelocityLimits({"regular": (60, 3, 2.5)}, maxsize=2)
+        self.assertTrue(limits.admit("ana", 100, "regular", 0))
+        self.assertTrue(limits.admit("ana", 100, "regular", 0))
+        self.assertTrue(limits.admit("bob", 1, "regular", 1))
+        self.assertTrue(limits.admit("cat", 1, "regular", 1))
+        self.assertEqual((len(limits), limits.evictions), (2, 1))
+        self.assertFalse(limits.admit("ana", 100, "regular", 2))
+        self.assertTrue(limits.admit("ana", 50, "regular", 2))
+        self.assertFalse(limits.admit("ana", 1, "regular", 3))
+        # The sketched buckets leave the window like the tracked ones.
+        self.assertTrue(limits.admit("ana", 200, "regular", 67))
+
+    def test_never_admits_past_a_window_when_full(self):
+        """Checks random traffic from many senders never passes the limit."""
+        rng = random.Random(2)
+        limits = VelocityLimits({"regular": (10, 4, None)}, maxsize=5, buckets=4)
+        admitted = {}
+        now = 0.0
+        for _ in range(5000):
+            now += rng.expovariate(20)
+            sender = f"user{rng.randrange(40)}"
+            times = admitted.setdefault(sender, [])
+            if limits.admit(sender, 1, "regular", now):
+                self.assertLess(len([t for t in times if t > now - 10]), 4)
+                times.append(now)
+        self.assertGreater(limits.evictions, 100)
+        self.assertGreater(sum(map(len, admitted.values())), 1000)
+
+
+class TestBankingSystemVelocity(unittest.TestCase):
+    """Tests for velocity limits in BankingSystem transfers."""
+
+    @patch("builtins.print")
+    def test_transfers_over_the_limit_are_rejected(self, mock_print):
+        """Checks rejected transfers move no money and do not count."""
+        now = [0.0]
+        limits = VelocityLimits({"regular": (60, 2, 300)}, clock=lambda: now[0])
+        system = BankingSystem(velocity_limits=limits)
+        system.authenticate("user123", "pass123")
+        self.assertFalse(system.transfer_money("user123", "ian", 5000, "regular"))
+        self.assertTrue(system.transfer_money("user123", "ian", 250, "regular"))
+        self.assertFalse(system.transfer_money("user123", "ian", 100, "regular"))
+        mock_print.assert_called_with("Transfer limit reached, try again later.")
+        report = system.transfer_batch(
+            [
+                ("user123", "ian", 50, "regular"),
+                ("user123", "ian", 1, "regular"),
+                ("user123", "ian", 1, "express"),
+            ]
+        )
+        self.assertEqual(
+            report, {"accepted": [0, 2], "rejected": [(1, "velocity_limit")]}
+        )
+        self.assertEqual(system.account("ian").balance, 301)
+        self.assertFalse(system.transfer_money("user123", "ian", 1, "regular", "k1"))
+        now[0] = 70
+        self.assertTrue(system.transfer_money("user123", "ian", 1, "regular", "k1"))
+        self.assertTrue(system.transfer_money("user123", "ian", 1, "regular", "k1"))
+        self.assertEqual(system.account("ian").balance, 302)
+
+
+if __name__ == "__main__":
+    unittest.main()
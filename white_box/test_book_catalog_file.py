@@ -0,0 +1,199 @@
+"""
+Tests for the memory-mapped book catalog.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from white_box.book_catalog_file import (
+    ENTRY,
+    MAGIC,
+    RECORD,
+    TITLES_HEADER,
+    CatalogFile,
+)
+from white_box.book_store import Book
+
+
+class TestCatalogFile(unittest.TestCase):
+    """Tests for the CatalogFile class."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "catalog.bin")
+
+    def open(self):
+        """Opens the test catalog and closes it at the end of the test."""
+        catalog = CatalogFile(self.path, Book)
+        self.addCleanup(catalog.close)
+        return catalog
+
+    def test_catalog_file_new(self):
+        """Checks a new catalog is empty and only holds the header."""
+        catalog = self.open()
+        self.assertEqual(len(catalog), 0)
+        self.assertEqual(list(catalog), [])
+        with open(self.path, "rb") as records:
+            self.assertEqual(records.read(), MAGIC)
+
+    def test_catalog_file_append_and_read(self):
+        """Checks books round-trip, including non-ASCII strings."""
+        catalog = self.open()
+        catalog.append(Book("Dune", "Frank Herbert", 9.99, 5))
+        catalog.extend(
+            [Book("Cien años", "García Márquez", 12.5, 0), Book("", "", 0, 1)]
+        )
+        self.assertEqual(len(catalog), 3)
+
+        book = catalog[1]
+        self.assertIsInstance(book, Book)
+        self.assertEqual(book.title, "Cien años")
+        self.assertEqual(book.author, "García Márquez")
+        self.assertEqual(book.price, 12.5)
+        self.assertEqual(book.quantity, 0)
+        self.assertEqual(catalog[-1].quantity, 1)
+        self.assertEqual([book.title for book in catalog[:2]], ["Dune", "Cien años"])
+        with self.assertRaises(IndexError):
+            catalog[3]  # pylint: disable=pointless-statement
+
+    def test_catalog_file_reopen(self):
+        """Checks books survive closing and reopening the catalog."""
+        with CatalogFile(self.path, Book) as catalog:
+            catalog.append(Book("Dune", "Frank Herbert", 9.99, 5))
+
+        catalog = self.open()
+        self.assertEqual(len(catalog), 1)
+        self.assertEqual(catalog[0].author, "Frank Herbert")
+        catalog.append(Book("Emma", "Jane Austen", 5.5, 2))
+        self.assertEqual(catalog[1].title, "Emma")
+
+    def test_catalog_file_refresh(self):
+        """Checks a reader sees another handle's appends after a refresh."""
+        writer = self.open()
+        reader = self.open()
+        writer.append(Book("Dune", "Frank Herbert", 9.99, 5))
+        self.assertEqual(len(reader), 0)
+        reader.refresh()
+        self.assertEqual(reader[0].title, "Dune")
+
+    def test_catalog_file_torn_record(self):
+        """Checks a partially written record is ignored and overwritten."""
+        with CatalogFile(self.path, Book) as catalog:
+            catalog.append(Book("Dune", "Frank Herbert", 9.99, 5))
+        with open(self.path, "ab") as records:
+            records.write(b"\x01" * (RECORD.size // 2))
+
+        catalog = self.open()
+        self.assertEqual(len(catalog), 1)
+        catalog.append(Book("Emma", "Jane Austen", 5.5, 2))
+        self.assertEqual(catalog[1].title, "Emma")
+        self.assertEqual(os.path.getsize(self.path), len(MAGIC) + 2 * RECORD.size)
+
+    def test_catalog_file_bad_magic(self):
+        """Checks files that are not catalogs are rejected."""
+        with open(self.path, "wb") as records:
+            records.write(b"not a catalog")
+        with self.assertRaises(ValueError):
+            CatalogFile(self.path, Book)
+
+
+class TestTitleIndex(unittest.TestCase):
+    """Tests for the title index kept next to a catalog."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "catalog.bin")
+
+    def open(self):
+        """Opens the test catalog and closes it at the end of the test."""
+        catalog = CatalogFile(self.path, Book)
+        self.addCleanup(catalog.close)
+        return catalog
+
+    def titles_header(self):
+        """Returns the magic and sorted entry count of the index file."""
+        with open(f"{self.path}.titles", "rb") as titles:
+            return TITLES_HEADER.unpack(titles.read(TITLES_HEADER.size))
+
+    def test_title_rows(self):
+        """Checks rows are found by lowercased title, below the given stop."""
+        catalog = self.open()
+        catalog.extend(
+            [
+                Book("Dune", "Frank Herbert", 9.99, 5),
+                Book("Emma", "Jane Austen", 5.5, 2),
+                Book("DUNE", "Someone", 1.0, 1),
+            ]
+        )
+        self.assertEqual(catalog.index_titles(), 3)
+        self.assertEqual(catalog.title_rows("dune", 3), [0, 2])
+        self.assertEqual(catalog.title_rows("dune", 2), [0])
+        self.assertEqual(catalog.title_rows("ulysses", 3), [])
+        self.assertEqual(self.titles_header()[1], 3)
+
+    def test_reopen_reads_no_titles(self):
+        """Checks a reopened catalog only decodes the rows it looks up."""
+        with CatalogFile(self.path, Book) as catalog:
+            catalog.extend([Book(f"Title {i}", "A", 1.0, 1) for i in range(100)])
+            catalog.index_titles()
+
+        catalog = self.open()
+        with patch.object(CatalogFile, "title", wraps=catalog.title) as title:
+            self.assertEqual(catalog.index_titles(), 100)
+            self.assertEqual(catalog.title_rows("title 42", 100), [42])
+        self.assertEqual(title.call_count, 1)
+
+    def test_appended_rows_are_covered(self):
+        """Checks rows appended by another handle are indexed on next sync."""
+        writer = self.open()
+        writer.append(Book("Dune", "Frank Herbert", 9.99, 5))
+        reader = self.open()
+        self.assertEqual(reader.index_titles(), 1)
+
+        writer.append(Book("Emma", "Jane Austen", 5.5, 2))
+        self.assertEqual(writer.index_titles(), 2)
+        self.assertEqual(reader.index_titles(), 2)
+        self.assertEqual(reader.title_rows("emma", 2), [1])
+        self.assertEqual(self.titles_header()[1], 1)
+        self.assertEqual(
+            os.path.getsize(f"{self.path}.titles"),
+            TITLES_HEADER.size + 2 * ENTRY.size,
+        )
+
+    @patch("white_box.book_catalog_file.COMPACT_MIN", 4)
+    def test_appended_entries_are_merged(self):
+        """Checks enough appended entries are sorted into a new file."""
+        catalog = self.open()
+        catalog.append(Book("Book 0", "A", 1.0, 1))
+        catalog.index_titles()
+        reader = self.open()
+        reader.index_titles()
+        for number in range(1, 7):
+            catalog.append(Book(f"Book {number}", "A", 1.0, 1))
+            catalog.index_titles()
+        self.assertEqual(self.titles_header()[1], 6)
+        self.assertEqual(catalog.title_rows("book 5", 7), [5])
+        self.assertEqual(reader.index_titles(), 7)
+        self.assertEqual(reader.title_rows("book 6", 7), [6])
+
+    def test_stale_index_is_rebuilt(self):
+        """Checks an index left over from another catalog is rebuilt."""
+        with CatalogFile(self.path, Book) as catalog:
+            catalog.extend([Book("Dune", "A", 1.0, 1), Book("Emma", "B", 1.0, 1)])
+            catalog.index_titles()
+        os.remove(self.path)
+        os.remove(f"{self.path}.heap")
+
+        catalog = self.open()
+        catalog.append(Book("Ulysses", "C", 1.0, 1))
+        self.assertEqual(catalog.index_titles(), 1)
+        self.assertEqual(catalog.title_rows("ulysses", 1), [0])
+        self.assertEqual(catalog.title_rows("dune", 1), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Tests for the compact book column store.
+"""
+
+import unittest
+from unittest.mock import patch
+
+from white_box.book_columns import BookColumns, BookView, StringTable
+from white_box.book_store import Book
+
+
+class TestStringTable(unittest.TestCase):
+    """Tests for the StringTable class."""
+
+    def test_string_table_add(self):
+        """Checks strings round-trip, including non-ASCII ones."""
+        table = StringTable()
+        self.assertEqual(table.add("Dune"), 0)
+        self.assertEqual(table.add("Cien años"), 1)
+        self.assertEqual(table.add("Dune"), 2)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table[1], "Cien años")
+        self.assertEqual(table[2], "Dune")
+
+    def test_string_table_intern(self):
+        """Checks interned tables store equal strings once."""
+        table = StringTable(intern=True)
+        self.assertEqual(table.add("Jane Austen"), 0)
+        self.assertEqual(table.add(""), 1)
+        self.assertEqual(table.add("Jane Austen"), 0)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table[1], "")
+
+
+class TestBookColumns(unittest.TestCase):
+    """Tests for the BookColumns class."""
+
+    def setUp(self):
+        self.columns = BookColumns(
+            [
+                Book("Dune", "Frank Herbert", 9.99, 5),
+                Book("Children of Dune", "Frank Herbert", 7.5, 0),
+            ]
+        )
+
+    def test_book_columns_layout(self):
+        """Checks fields land in their typed columns."""
+        self.assertEqual(len(self.columns), 2)
+        self.assertEqual(len(self.columns.authors), 1)
+        self.assertEqual(list(self.columns.prices), [9.99, 7.5])
+        self.assertEqual(list(self.columns.quantities), [5, 0])
+
+    def test_book_columns_views(self):
+        """Checks views expose the Book attributes."""
+        book = self.columns[-1]
+        self.assertIsInstance(book, BookView)
+        self.assertEqual(book.title, "Children of Dune")
+        self.assertEqual(book.author, "Frank Herbert")
+        self.assertEqual(book.price, 7.5)
+        self.assertEqual(book.quantity, 0)
+        self.assertEqual(book, self.columns[1])
+        self.assertNotEqual(book, self.columns[0])
+        self.assertEqual(len({book, self.columns[1]}), 1)
+        self.assertEqual([view.title for view in self.columns[:1]], ["Dune"])
+        self.assertEqual([view.row for view in self.columns], [0, 1])
+
+    def test_book_columns_index_error(self):
+        """Checks out of range rows are rejected."""
+        with self.assertRaises(IndexError):
+            self.columns[2]  # pylint: disable=pointless-statement
+
+    def test_book_view_writes(self):
+        """Checks writes through a view update the columns."""
+        book = self.columns[0]
+        book.title = "Dune Messiah"
+        book.author = "F. Herbert"
+        book.price = 8.0
+        book.quantity = 3
+        self.assertEqual(self.columns[0].title, "Dune Messiah")
+        self.assertEqual(self.columns[0].author, "F. Herbert")
+        self.assertEqual(self.columns.prices[0], 8.0)
+        self.assertEqual(self.columns.quantities[0], 3)
+
+    @patch("builtins.print")
+    def test_book_view_display(self, mock_print):
+        """Checks views display like books."""
+        self.columns[0].display()
+        self.assertEqual(mock_print.call_count, 4)
+        mock_print.assert_any_call("Title: Dune")
+        mock_print.assert_called_with("Quantity: 5")
+
+
+if __name__ == "__main__":
+    unittest.main()
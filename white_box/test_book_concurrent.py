@@ -0,0 +1,142 @@
+"""
+Tests for the thread-safe book store.
+"""
+
+import threading
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from itertools import islice
+
+from white_box.book_concurrent import ConcurrentBookStore, Segment
+from white_box.book_store import Book, BookStore
+
+
+def make_books(first, count):
+    """
+    Builds `count` numbered books.
+    """
+    return [
+        Book(f"Title {i}", f"Author {i % 7}", 9.99, 1)
+        for i in range(first, first + count)
+    ]
+
+
+class TestSegment(unittest.TestCase):
+    """Tests for the Segment class."""
+
+    def test_merge_leaves_inputs_unchanged(self):
+        """Checks merging builds a new segment without touching the old ones."""
+        books = [Book("Dune", "Frank Herbert", 9.99, 5)] * 2
+        first = Segment.build(books, 0, 1)
+        second = Segment.build(books, 1, 2)
+        merged = first.merge(second)
+
+        self.assertEqual((merged.start, merged.stop), (0, 2))
+        self.assertEqual(merged.titles["dune"], [0, 1])
+        self.assertEqual(first.titles["dune"], [0])
+        self.assertEqual(list(merged.search_indexes["title"].candidates("dun")), [0, 1])
+        self.assertEqual(list(first.search_indexes["title"].candidates("dun")), [0])
+
+
+class TestConcurrentBookStore(unittest.TestCase):
+    """Tests for the ConcurrentBookStore class."""
+
+    def setUp(self):
+        self.book1 = Book("Dune", "Frank Herbert", 9.99, 5)
+        self.book2 = Book("Emma", "Jane Austen", 5.99, 2)
+        self.book3 = Book("Dune", "Someone Else", 1.99, 1)
+        self.store = ConcurrentBookStore()
+        self.store.add_books([self.book1, self.book2])
+        self.store.add_books([self.book3])
+
+    def test_add_book(self):
+        """Checks add_book prints the same message as BookStore."""
+        output = StringIO()
+        with redirect_stdout(output):
+            self.store.add_book(Book("Ulysses", "James Joyce", 12.0, 1))
+        self.assertEqual(output.getvalue(), "Book 'Ulysses' added to the store.\n")
+        self.assertEqual(len(self.store.snapshot()), 4)
+
+    def test_find_books(self):
+        """Checks lookups span every segment, in insertion order."""
+        self.assertEqual(self.store.find_books("DUNE"), [self.book1, self.book3])
+        self.assertEqual(self.store.find_books("Ulysses"), [])
+
+    def test_search(self):
+        """Checks substring search spans every segment."""
+        self.assertEqual(list(self.store.search("un")), [self.book1, self.book3])
+        self.assertEqual(list(self.store.search("austen")), [self.book2])
+        self.assertEqual(
+            list(self.store.search("e", fields=("author",))),
+            [self.book1, self.book2, self.book3],
+        )
+        self.assertEqual(
+            list(self.store.search("")), [self.book1, self.book2, self.book3]
+        )
+
+    def test_snapshot_isolation(self):
+        """Checks a snapshot does not see books added after it was taken."""
+        snapshot = self.store.snapshot()
+        self.store.add_books([Book("Dune Messiah", "Frank Herbert", 8.99, 1)])
+        self.assertEqual(len(snapshot), 3)
+        self.assertEqual(list(snapshot.search("messiah")), [])
+        self.assertEqual(len(self.store.find_books("dune messiah")), 1)
+        self.assertEqual(self.store.snapshot().version, snapshot.version + 1)
+
+    def test_segments_stay_few(self):
+        """Checks one-book writes are merged into a logarithmic number of segments."""
+        for number in range(1000):
+            self.store.add_books(make_books(number, 1))
+        self.assertLessEqual(len(self.store.snapshot().segments), 11)
+        self.assertEqual(len(self.store.find_books("title 500")), 1)
+
+    def test_output_matches_book_store(self):
+        """Checks display and search text is the same as BookStore's."""
+        book_store = BookStore()
+        book_store.add_books([self.book1, self.book2, self.book3])
+        for method, args in (("display_books", ()), ("search_book", ("dune",))):
+            expected, actual = StringIO(), StringIO()
+            with redirect_stdout(expected):
+                getattr(book_store, method)(*args)
+            with redirect_stdout(actual):
+                getattr(self.store, method)(*args)
+            self.assertEqual(actual.getvalue(), expected.getvalue())
+
+        expected, actual = StringIO(), StringIO()
+        with redirect_stdout(expected):
+            BookStore().display_books()
+        ConcurrentBookStore().display_books(out=actual)
+        self.assertEqual(actual.getvalue(), expected.getvalue())
+
+    def test_readers_during_writes(self):
+        """Checks readers always see consistent results while a writer adds."""
+        errors = []
+        done = threading.Event()
+
+        def reader():
+            try:
+                while not done.is_set():
+                    snapshot = self.store.snapshot()
+                    found = snapshot.search("title")
+                    self.assertEqual(sum(1 for _ in found), len(snapshot) - 3)
+                    for book in islice(snapshot.search("7"), 5):
+                        self.assertIn("7", book.title)
+            except AssertionError as error:
+                errors.append(error)
+
+        readers = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in readers:
+            thread.start()
+        for first in range(0, 2000, 20):
+            self.store.add_books(make_books(first, 20))
+        done.set()
+        for thread in readers:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.store.find_books("title 1999")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+Tests for the typo-tolerant title search.
+"""
+
+import random
+import unittest
+
+from white_box.book_fuzzy import BKTree, FuzzyTitleIndex, edit_distance
+from white_box.book_search import TrigramIndex
+from white_box.book_store import Book
+
+
+def reference_distance(first, second):
+    """
+    Textbook dynamic-programming Levenshtein distance.
+    """
+    previous = list(range(len(second) + 1))
+    for i, char in enumerate(first, start=1):
+        current = [i]
+        for j, other in enumerate(second, start=1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (char != other),
+                )
+            )
+        previous = current
+    return previous[-1]
+
+
+class TestEditDistance(unittest.TestCase):
+    """Tests for the edit_distance function."""
+
+    def test_known_distances(self):
+        """Checks a few classic pairs."""
+        self.assertEqual(edit_distance("kitten", "sitting"), 3)
+        self.assertEqual(edit_distance("dune", "dune"), 0)
+        self.assertEqual(edit_distance("dune", "dnue"), 2)
+        self.assertEqual(edit_distance("", "emma"), 4)
+        self.assertEqual(edit_distance("emma", ""), 4)
+
+    def test_matches_reference(self):
+        """Checks random pairs against the dynamic-programming distance."""
+        rng = random.Random(0)
+        for _ in range(500):
+            first = "".join(rng.choices("abc ", k=rng.randint(0, 12)))
+            second = "".join(rng.choices("abc ", k=rng.randint(0, 12)))
+            self.assertEqual(
+                edit_distance(first, second), reference_distance(first, second)
+            )
+
+
+class TestBKTree(unittest.TestCase):
+    """Tests for the BKTree class."""
+
+    def test_search(self):
+        """Checks only words within the radius are found, duplicates included."""
+        tree = BKTree()
+        for row, word in enumerate(["book", "books", "cake", "boo", "book"]):
+            tree.add(word, row)
+        self.assertEqual(tree.size, 4)
+        self.assertEqual(sorted(tree.search("bock", 1)), [(1, 0), (1, 4)])
+        self.assertEqual(
+            sorted(tree.search("book", 1)), [(0, 0), (0, 4), (1, 1), (1, 3)]
+        )
+        self.assertEqual(list(BKTree().search("book", 2)), [])
+
+
+class TestFuzzyTitleIndex(unittest.TestCase):
+    """Tests for the FuzzyTitleIndex class."""
+
+    def setUp(self):
+        titles = ["Dune", "Dune Messiah", "Emma", "Pride and Prejudice", "Duke"]
+        self.books = [Book(title, "author", 1.0, 1) for title in titles]
+        self.trigrams = TrigramIndex()
+        for row, book in enumerate(self.books):
+            self.trigrams.add(row, book.title)
+        self.index = FuzzyTitleIndex(self.trigrams)
+
+    def test_long_query(self):
+        """Checks queries long enough for the trigram filter."""
+        self.assertEqual(self.index.search(self.books, "dune mesia", 2, 10), (1,))
+        self.assertEqual(
+            self.index.search(self.books, "PRIDE AND PREJUDISE", 1, 10), (3,)
+        )
+
+    def test_short_query(self):
+        """Checks short queries are ranked by distance, then row."""
+        self.assertEqual(self.index.search(self.books, "dune", 1, 10), (0, 4))
+        self.assertEqual(self.index.search(self.books, "dume", 1, 10), (0, 4))
+        self.assertEqual(self.index.search(self.books, "dune", 1, 1), (0,))
+
+    def test_matches_brute_force(self):
+        """Checks both strategies agree with a scan over random titles."""
+        rng = random.Random(1)
+        books = [
+            Book("".join(rng.choices("abcd ", k=rng.randint(1, 10))), "a", 1.0, 1)
+            for _ in range(300)
+        ]
+        trigrams = TrigramIndex()
+        for row, book in enumerate(books):
+            trigrams.add(row, book.title)
+        index = FuzzyTitleIndex(trigrams)
+        for _ in range(100):
+            query = "".join(rng.choices("abcd ", k=rng.randint(1, 10)))
+            expected = sorted(
+                (reference_distance(query, book.title), row)
+                for row, book in enumerate(books)
+                if reference_distance(query, book.title) <= 2
+            )
+            self.assertEqual(
+                index.search(books, query, 2, 1000), tuple(row for _, row in expected)
+            )
+
+    def test_cache(self):
+        """Checks results are cached until new books are indexed."""
+        self.assertEqual(self.index.search(self.books, "emm", 1, 10), (2,))
+        self.assertIn(("emm", 1, 10), self.index.cache)
+
+        self.books.append(Book("Emmy", "author", 1.0, 1))
+        self.trigrams.add(5, "Emmy")
+        self.assertEqual(self.index.search(self.books, "emm", 1, 10), (2, 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
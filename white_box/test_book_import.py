@@ -0,0 +1,106 @@
+"""
+Tests for the streaming catalog parser.
+"""
+
+import unittest
+
+from white_box.book_import import batched, detect_format, iter_books, iter_records
+from white_box.book_store import Book
+
+CSV_LINES = [
+    "title,author,price,quantity\n",
+    "Dune,Frank Herbert,9.99,5\n",
+    '"Emma, Vol. 1",Jane Austen,5.5,0\n',
+]
+JSONL_LINES = [
+    "\n",
+    '{"title": "Dune", "author": "Frank Herbert", "price": 9.99, "quantity": 5}\n',
+    "\n",
+    '{"title": "Emma", "author": "Jane Austen", "price": 5.5, "quantity": 0}\n',
+]
+
+
+class TestDetectFormat(unittest.TestCase):
+    """Tests for the detect_format function."""
+
+    def test_detect_format_csv(self):
+        """Checks a header line is detected as CSV."""
+        fmt, lines = detect_format(iter(CSV_LINES))
+        self.assertEqual(fmt, "csv")
+        self.assertEqual(list(lines), CSV_LINES)
+
+    def test_detect_format_jsonl(self):
+        """Checks leading blank lines are skipped and kept."""
+        fmt, lines = detect_format(iter(JSONL_LINES))
+        self.assertEqual(fmt, "jsonl")
+        self.assertEqual(list(lines), JSONL_LINES)
+
+    def test_detect_format_empty(self):
+        """Checks an empty input defaults to CSV."""
+        fmt, lines = detect_format(iter([]))
+        self.assertEqual(fmt, "csv")
+        self.assertEqual(list(lines), [])
+
+
+class TestIterRecords(unittest.TestCase):
+    """Tests for the iter_records function."""
+
+    def test_iter_records_unknown_format(self):
+        """Checks an unknown format is rejected."""
+        with self.assertRaises(ValueError):
+            list(iter_records(CSV_LINES, "xml"))
+
+
+class TestIterBooks(unittest.TestCase):
+    """Tests for the iter_books function."""
+
+    def test_iter_books_csv(self):
+        """Checks CSV rows become books with converted fields."""
+        books = list(iter_books(CSV_LINES, Book))
+        self.assertEqual(len(books), 2)
+        self.assertEqual(books[1].title, "Emma, Vol. 1")
+        self.assertEqual(books[1].price, 5.5)
+        self.assertEqual(books[1].quantity, 0)
+
+    def test_iter_books_jsonl(self):
+        """Checks JSONL rows become books."""
+        books = list(iter_books(JSONL_LINES, Book, "jsonl"))
+        self.assertEqual([book.title for book in books], ["Dune", "Emma"])
+
+    def test_iter_books_invalid_row(self):
+        """Checks a bad row reports its number."""
+        lines = CSV_LINES + ["Bad,Author,cheap,1\n"]
+        with self.assertRaisesRegex(ValueError, "row 3"):
+            list(iter_books(lines, Book))
+
+    def test_iter_books_missing_field(self):
+        """Checks a row missing a field is rejected."""
+        with self.assertRaisesRegex(ValueError, "row 1"):
+            list(iter_books(['{"title": "Dune"}\n'], Book))
+
+    def test_iter_books_non_string_field(self):
+        """Checks titles and authors that are not strings are rejected."""
+        for line in (
+            '{"title": 42, "author": "A", "price": 1, "quantity": 1}\n',
+            '{"title": "Dune", "author": null, "price": 1, "quantity": 1}\n',
+        ):
+            with self.assertRaisesRegex(ValueError, "row 1"):
+                list(iter_books([line], Book))
+        with self.assertRaisesRegex(ValueError, "row 1"):
+            list(iter_books(["title,author,price,quantity\n", "Dune\n"], Book))
+
+
+class TestBatched(unittest.TestCase):
+    """Tests for the batched function."""
+
+    def test_batched(self):
+        """Checks the last batch holds the remainder."""
+        self.assertEqual(list(batched(range(5), 2)), [[0, 1], [2, 3], [4]])
+
+    def test_batched_empty(self):
+        """Checks an empty iterable yields no batches."""
+        self.assertEqual(list(batched([], 2)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
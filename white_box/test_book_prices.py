@@ -0,0 +1,81 @@
+"""
+Tests for the sorted price index.
+"""
+
+import random
+import unittest
+
+from white_box import book_prices
+from white_box.book_prices import PriceIndex
+
+
+class TestPriceIndex(unittest.TestCase):
+    """Tests for the PriceIndex class."""
+
+    def setUp(self):
+        self.index = PriceIndex()
+        for row, price in enumerate([25.0, 9.99, 10.0, 9.99, 30.0]):
+            self.index.add(row, price)
+
+    def test_range(self):
+        """Checks range queries are inclusive and sorted by price, then row."""
+        self.assertEqual(list(self.index.range(9.99, 25)), [1, 3, 2, 0])
+        self.assertEqual(list(self.index.range(10.5, 20)), [])
+        self.assertEqual(list(self.index.range(30, 100)), [4])
+
+    def test_cheapest(self):
+        """Checks rows come out cheapest first."""
+        self.assertEqual(list(self.index.cheapest()), [1, 3, 2, 0, 4])
+        self.assertEqual(list(self.index.cheapest(2)), [1, 3])
+        self.assertEqual(len(self.index), 5)
+
+    def test_remove(self):
+        """Checks only the matching entry is removed."""
+        self.index.remove(3, 9.99)
+        self.index.remove(2, 11.0)
+        self.index.remove(7, 9.99)
+        self.assertEqual(list(self.index.cheapest()), [1, 2, 0, 4])
+
+    def test_insert_after_flush(self):
+        """Checks entries added between queries are sorted in."""
+        list(self.index.cheapest())
+        self.index.add(5, 5.0)
+        self.index.add(6, 26.0)
+        self.assertEqual(list(self.index.cheapest()), [5, 1, 3, 2, 0, 6, 4])
+
+    def test_bulk_merge(self):
+        """Checks large batches go through the merge and stay sorted."""
+        rng = random.Random(0)
+        prices = [
+            round(rng.uniform(1, 50), 2) for _ in range(book_prices.INSORT_LIMIT * 3)
+        ]
+        index = PriceIndex()
+        for row, price in enumerate(prices[:10]):
+            index.add(row, price)
+        list(index.cheapest())
+        for row, price in enumerate(prices[10:], start=10):
+            index.add(row, price)
+
+        expected = sorted(range(len(prices)), key=lambda row: (prices[row], row))
+        self.assertEqual(list(index.cheapest()), expected)
+        self.assertEqual(
+            list(index.range(10, 20)),
+            [row for row in expected if 10 <= prices[row] <= 20],
+        )
+
+    def test_bulk_readd(self):
+        """Checks a large batch of already indexed rows is merged in order."""
+        count = book_prices.INSORT_LIMIT * 4
+        index = PriceIndex()
+        for row in range(count):
+            index.add(row, 10.0)
+        list(index.cheapest())
+        for row in range(0, count, 2):
+            index.remove(row, 10.0)
+        for row in range(0, count, 2):
+            index.add(row, 10.0)
+        self.assertEqual(list(index.cheapest()), list(range(count)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Tests for the shared book rendering.
+"""
+
+import unittest
+from io import StringIO
+from unittest.mock import patch
+
+from white_box.book_render import (
+    display,
+    iter_pages,
+    render_book,
+    render_page,
+)
+from white_box.book_store import Book
+
+
+class TestRenderBook(unittest.TestCase):
+    """Tests for the render_book and render_page functions."""
+
+    def test_render_book(self):
+        """Checks the four display lines."""
+        self.assertEqual(
+            render_book(Book("Dune", "Frank Herbert", 9.99, 5)),
+            "Title: Dune\nAuthor: Frank Herbert\nPrice: $9.99\nQuantity: 5\n",
+        )
+
+    def test_render_page(self):
+        """Checks a page starts with its header."""
+        book = Book("Dune", "Frank Herbert", 9.99, 5)
+        self.assertEqual(render_page("Header", [book]), "Header\n" + render_book(book))
+        self.assertEqual(render_page("Header", []), "Header\n")
+
+
+class TestIterPages(unittest.TestCase):
+    """Tests for the iter_pages function."""
+
+    def test_iter_pages(self):
+        """Checks books are split in pages and the header opens the first."""
+        books = [Book(f"title{i}", "author", 1, 1) for i in range(5)]
+        pages = list(iter_pages("Header", books, 2))
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(pages[0], render_page("Header", books[:2]))
+        self.assertEqual(pages[1], render_book(books[2]) + render_book(books[3]))
+        self.assertEqual(pages[2], render_book(books[4]))
+
+    def test_iter_pages_exact_fit(self):
+        """Checks no empty trailing page is produced."""
+        books = [Book(f"title{i}", "author", 1, 1) for i in range(2)]
+        self.assertEqual(len(list(iter_pages("Header", books, 2))), 1)
+
+    def test_iter_pages_no_books(self):
+        """Checks the header is produced even without books."""
+        self.assertEqual(list(iter_pages("Header", [], 2)), ["Header\n"])
+
+
+class TestDisplay(unittest.TestCase):
+    """Tests for the display function."""
+
+    def test_display_out(self):
+        """Checks a stream gets the whole text in one write."""
+        book = Book("Dune", "Frank Herbert", 9.99, 5)
+        out = StringIO()
+        with patch("builtins.print") as mock_print:
+            display(book, out)
+            mock_print.assert_not_called()
+        self.assertEqual(out.getvalue(), render_book(book))
+
+
+if __name__ == "__main__":
+    unittest.main()
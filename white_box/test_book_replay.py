@@ -0,0 +1,126 @@
+"""
+Tests for the command replay.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from white_box.book_replay import (
+    Histogram,
+    bucket_limit,
+    bucket_of,
+    format_report,
+    iter_commands,
+    replay,
+)
+from white_box.book_store import BookStore
+
+SCRIPT = (
+    "add\tDune\tFrank Herbert\t9.99\t5\n"
+    "3\tEmma\tJane Austen\t5.99\t2\n"
+    "\n"
+    "search\tdune\n"
+    "bogus\n"
+    "add\tBroken\tNobody\tfree\t1\n"
+    "display\n"
+    "exit\n"
+    "add\tAfter Exit\tNobody\t1.0\t1\n"
+)
+
+
+class TestHistogram(unittest.TestCase):
+    """Tests for the Histogram class."""
+
+    def test_buckets_cover_every_duration(self):
+        """Checks each duration falls in the bucket whose bounds hold it."""
+        for nanoseconds in list(range(300)) + [10**6, 10**9 + 7]:
+            bucket = bucket_of(nanoseconds)
+            self.assertLessEqual(nanoseconds, bucket_limit(bucket))
+            if bucket:
+                self.assertLess(bucket_limit(bucket - 1), nanoseconds)
+
+    def test_summary(self):
+        """Checks counts, mean and percentiles."""
+        histogram = Histogram()
+        for nanoseconds in [1000] * 98 + [50_000, 1_000_000]:
+            histogram.add(nanoseconds)
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 100)
+        self.assertAlmostEqual(summary["mean_us"], 11.48)
+        self.assertAlmostEqual(summary["p50_us"], 1.023)
+        self.assertAlmostEqual(summary["max_us"], 1000.0)
+        self.assertEqual(sum(summary["buckets_ns"].values()), 100)
+        self.assertEqual(Histogram().summary()["mean_us"], 0.0)
+
+
+class TestReplay(unittest.TestCase):
+    """Tests for the replay function."""
+
+    def test_iter_commands_jsonl(self):
+        """Checks JSONL logs are parsed, menu numbers included."""
+        lines = [
+            json.dumps({"command": "search", "title": "Dune"}) + "\n",
+            json.dumps(
+                {
+                    "command": "3",
+                    "title": "Emma",
+                    "author": "Jane Austen",
+                    "price": "5.99",
+                    "quantity": 2,
+                }
+            )
+            + "\n",
+            json.dumps({"command": "add", "title": "Emma"}) + "\n",
+            "not json\n",
+            json.dumps({"command": "search", "title": 42}) + "\n",
+            json.dumps(
+                {
+                    "command": "add",
+                    "title": ["Emma"],
+                    "author": None,
+                    "price": 1,
+                    "quantity": 1,
+                }
+            )
+            + "\n",
+        ]
+        commands = list(iter_commands(lines))
+        self.assertEqual(commands[0], ("search", "Dune"))
+        self.assertEqual(commands[1][0], "add")
+        self.assertEqual(commands[1][1].price, 5.99)
+        self.assertEqual([command for command, _ in commands[2:]], [None] * 4)
+
+    def test_replay_script(self):
+        """Checks commands run silently until exit and invalid lines are counted."""
+        store = BookStore()
+        output = StringIO()
+        with redirect_stdout(output):
+            report = replay(store, StringIO(SCRIPT))
+
+        self.assertEqual(output.getvalue(), "")
+        self.assertEqual([book.title for book in store.books], ["Dune", "Emma"])
+        self.assertEqual(report["invalid"], 2)
+        counts = {
+            name: summary["count"] for name, summary in report["commands"].items()
+        }
+        self.assertEqual(counts, {"display": 1, "search": 1, "add": 2, "exit": 1})
+        self.assertIn("search", format_report(report))
+
+    def test_replay_path(self):
+        """Checks scripts can be read from a file."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "commands.txt")
+            with open(path, "w", encoding="utf-8") as script:
+                script.write(SCRIPT)
+            store = BookStore()
+            report = replay(store, path)
+        self.assertEqual(len(store.books), 2)
+        self.assertEqual(report["commands"]["add"]["count"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Tests for the trigram substring search.
+"""
+
+import unittest
+
+from white_box.book_search import TrigramIndex, iter_matches, trigrams
+from white_box.book_store import Book
+
+
+class TestTrigrams(unittest.TestCase):
+    """Tests for the trigrams function."""
+
+    def test_trigrams_padded(self):
+        """Checks the text is padded on both sides."""
+        self.assertEqual(trigrams("ab"), {"\x00ab", "ab\x00"})
+
+    def test_trigrams_single_letter(self):
+        """Checks even a one-letter text has a trigram."""
+        self.assertEqual(trigrams("a"), {"\x00a\x00"})
+
+
+class TestTrigramIndex(unittest.TestCase):
+    """Tests for the TrigramIndex class."""
+
+    def setUp(self):
+        self.index = TrigramIndex()
+        for row, text in enumerate(["Dune", "Dune Messiah", "Emma", "A"]):
+            self.index.add(row, text)
+
+    def test_candidates_long_needle(self):
+        """Checks a needle with trigrams only returns rows sharing them."""
+        self.assertEqual(list(self.index.candidates("une")), [0, 1])
+
+    def test_candidates_missing_trigram(self):
+        """Checks a needle with an unknown trigram returns nothing."""
+        self.assertEqual(list(self.index.candidates("xyz")), [])
+
+    def test_candidates_short_needle(self):
+        """Checks needles shorter than a trigram are merged without repeats."""
+        self.assertEqual(list(self.index.candidates("m")), [1, 2])
+        self.assertEqual(list(self.index.candidates("a")), [1, 2, 3])
+
+    def test_candidates_empty_needle(self):
+        """Checks the empty needle matches every row."""
+        self.assertEqual(list(self.index.candidates("")), [0, 1, 2, 3])
+
+
+class TestIterMatches(unittest.TestCase):
+    """Tests for the iter_matches function."""
+
+    def setUp(self):
+        self.books = [
+            Book("Dune", "Frank Herbert", 9.99, 5),
+            Book("Emma", "Jane Austen", 5.99, 2),
+            Book("Herbert's Guide", "Someone", 1.99, 1),
+        ]
+        self.indexes = {"title": TrigramIndex(), "author": TrigramIndex()}
+        for row, book in enumerate(self.books):
+            self.indexes["title"].add(row, book.title)
+            self.indexes["author"].add(row, book.author)
+
+    def test_iter_matches_both_fields(self):
+        """Checks matches in either field come back once, in insertion order."""
+        matches = list(iter_matches(self.books, self.indexes, "HERBERT"))
+        self.assertEqual(matches, [self.books[0], self.books[2]])
+
+    def test_iter_matches_filters_false_positives(self):
+        """Checks rows sharing every trigram but not the substring are dropped."""
+        self.assertEqual(list(iter_matches(self.books, self.indexes, "dunee")), [])
+        self.assertEqual(list(iter_matches(self.books, self.indexes, "mmaj")), [])
+
+    def test_iter_matches_is_lazy(self):
+        """Checks results are produced on demand."""
+        matches = iter_matches(self.books, self.indexes, "e")
+        self.assertIs(next(matches), self.books[0])
+        self.assertIs(next(matches), self.books[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+"""
+Tests for the asyncio BookStore server.
+"""
+
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from white_box.book_server import BookServer, parse_command
+from white_box.book_store import Book, BookStore
+
+
+class TestParseCommand(unittest.TestCase):
+    """Tests for the parse_command function."""
+
+    def test_parse_command_names_and_numbers(self):
+        """Checks commands are found by name or menu number."""
+        self.assertEqual(parse_command("display\n"), ("display", None))
+        self.assertEqual(parse_command("1"), ("display", None))
+        self.assertEqual(parse_command("SEARCH\tDune\r\n"), ("search", "Dune"))
+        self.assertEqual(parse_command("4"), ("exit", None))
+
+    def test_parse_command_add(self):
+        """Checks add arguments become a Book."""
+        command, book = parse_command("3\tDune\tFrank Herbert\t9.99\t5\n")
+        self.assertEqual(command, "add")
+        self.assertIsInstance(book, Book)
+        self.assertEqual(book.author, "Frank Herbert")
+        self.assertEqual(book.price, 9.99)
+        self.assertEqual(book.quantity, 5)
+
+    def test_parse_command_invalid(self):
+        """Checks unknown commands, wrong arities and bad numbers fail."""
+        for line in ("99", "search", "display\textra", "add\tDune\tA\tcheap\t1"):
+            with self.assertRaises(ValueError):
+                parse_command(line)
+
+
+class TestBookServer(unittest.IsolatedAsyncioTestCase):
+    """Tests for the BookServer class."""
+
+    async def asyncSetUp(self):
+        self.store = BookStore()
+        self.book_server = BookServer(self.store)
+        self.server = await self.book_server.start()
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        await self.book_server.stop()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def request(self, reader, writer, line):
+        """Sends a request and returns the response without its terminator."""
+        writer.write(f"{line}\n".encode())
+        await writer.drain()
+        lines = []
+        while (response := await reader.readline()) != b"\n":
+            lines.append(response.decode())
+        return "".join(lines)
+
+    async def test_session(self):
+        """Checks every command answers like the interactive menu."""
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        self.assertEqual(
+            await self.request(reader, writer, "display"), "No books in the store.\n"
+        )
+        self.assertEqual(
+            await self.request(reader, writer, "add\tDune\tFrank Herbert\t9.99\t5"),
+            "Book 'Dune' added to the store.\n",
+        )
+        self.assertEqual(
+            await self.request(reader, writer, "2\tdune"),
+            "Found 1 book(s) with title 'dune':\n"
+            "Title: Dune\nAuthor: Frank Herbert\nPrice: $9.99\nQuantity: 5\n",
+        )
+        self.assertIn("Title: Dune\n", await self.request(reader, writer, "1"))
+        self.assertEqual(
+            await self.request(reader, writer, "oops"),
+            "Invalid choice. Please try again.\n",
+        )
+        self.assertEqual(await self.request(reader, writer, "exit"), "Exiting...\n")
+        self.assertEqual(await reader.read(), b"")
+        writer.close()
+
+    async def test_undecodable_and_overlong_lines(self):
+        """Checks bad bytes and overlong lines are answered as invalid."""
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(b"\xff\xfe\n")
+        self.assertEqual(
+            await reader.readuntil(b"\n\n"), b"Invalid choice. Please try again.\n\n"
+        )
+        writer.write(b"x" * 100_000 + b"\nexit\n")
+        response = await reader.read()
+        self.assertIn("Invalid choice. Please try again.\n", response.decode())
+        self.assertTrue(response.endswith(b"Exiting...\n\n"))
+        writer.close()
+
+    async def test_cancelled_add_does_not_stop_writer(self):
+        """Checks a request cancelled while queued leaves the writer running."""
+        cancelled = asyncio.create_task(self.book_server.respond("add\tDune\tA\t1\t1"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        self.assertEqual(
+            await asyncio.wait_for(
+                self.book_server.respond("add\tEmma\tB\t1\t1"), timeout=5
+            ),
+            ("Book 'Emma' added to the store.\n", False),
+        )
+        self.assertEqual(len(self.store.books), 2)
+
+    async def test_concurrent_adds_are_batched(self):
+        """Checks adds queued by many clients are applied in few batches."""
+        with patch.object(
+            self.store, "add_books", wraps=self.store.add_books
+        ) as add_books:
+
+            responses = await asyncio.gather(
+                *(
+                    self.book_server.respond(f"add\ttitle{i}\tauthor\t1\t1")
+                    for i in range(20)
+                )
+            )
+
+        self.assertEqual(len(self.store.books), 20)
+        self.assertEqual(responses[3], ("Book 'title3' added to the store.\n", False))
+        self.assertEqual(add_books.call_count, 1)
+
+    async def test_failed_add_is_reported(self):
+        """Checks a failing batch fails the waiting requests."""
+        with patch.object(self.store, "add_books", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                await self.book_server.respond("add\tDune\tA\t1\t1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Tests for the incremental inventory aggregates.
+"""
+
+import unittest
+
+from white_box.book_stats import InventoryStats
+from white_box.book_store import Book
+
+
+class TestInventoryStats(unittest.TestCase):
+    """Tests for the InventoryStats class."""
+
+    def setUp(self):
+        self.stats = InventoryStats()
+        self.book = Book("Dune", "Frank Herbert", 10.0, 3)
+        self.stats.add(self.book)
+        self.stats.add(Book("Emma", "Jane Austen", 5.0, 0))
+        self.stats.add(Book("Children of Dune", "Frank Herbert", 2.0, 1))
+
+    def test_add(self):
+        """Checks added books are accounted for."""
+        snapshot = self.stats.snapshot()
+        self.assertEqual(snapshot["books"], 3)
+        self.assertEqual(snapshot["total_value"], 32.0)
+        self.assertEqual(snapshot["out_of_stock"], 1)
+        self.assertEqual(
+            dict(snapshot["units_by_author"]), {"Frank Herbert": 4, "Jane Austen": 0}
+        )
+
+    def test_update(self):
+        """Checks changes apply the difference with the old values."""
+        self.book.quantity = 0
+        self.stats.update(self.book, 10.0, 3)
+        snapshot = self.stats.snapshot()
+        self.assertEqual(snapshot["total_value"], 2.0)
+        self.assertEqual(snapshot["out_of_stock"], 2)
+        self.assertEqual(snapshot["units_by_author"]["Frank Herbert"], 1)
+
+    def test_snapshot_is_read_only(self):
+        """Checks units per author cannot be changed through a snapshot."""
+        with self.assertRaises(TypeError):
+            self.stats.snapshot()["units_by_author"]["Jane Austen"] = 10
+
+
+if __name__ == "__main__":
+    unittest.main()
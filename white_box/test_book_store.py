@@ -2,11 +2,15 @@
 File that tests several classes and their integration.
 """
 
+import os
+import tempfile
 import unittest
+from contextlib import redirect_stdout
 from io import StringIO
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
-from white_box.book_store import Book, BookStore, main
+from white_box.book_catalog_file import CatalogFile
+from white_box.book_store import Book, BookList, BookStore, main
 
 
 class TestBook(unittest.TestCase):
@@ -33,6 +37,13 @@ class TestBook(unittest.TestCase):
         self.assertEqual(book.price, self.price)
         self.assertEqual(book.quantity, self.quantity)
 
+    def test_book_has_no_dict(self):
+        """
+        Checks books use slots instead of a per-instance dict.
+        """
+        book = Book(self.title, self.author, self.price, self.quantity)
+        self.assertFalse(hasattr(book, "__dict__"))
+
     @patch("builtins.print")
     def test_book_display(self, mock_print):
         """
@@ -48,8 +59,20 @@ class TestBook(unittest.TestCase):
         mock_print.assert_any_call(f"Quantity: {self.quantity}")
         mock_print.assert_called_with(f"Quantity: {self.quantity}")
 
+    def test_book_display_out(self):
+        """
+        Checks the book display can write to a stream instead.
+        """
+        book = Book(self.title, self.author, self.price, self.quantity)
+        printed = StringIO()
+        written = StringIO()
+        with redirect_stdout(printed):
+            book.display()
+        book.display(out=written)
+        self.assertEqual(written.getvalue(), printed.getvalue())
 
-class TestBookStore(unittest.TestCase):
+
+class TestBookStore(unittest.TestCase):  # pylint: disable=too-many-public-methods
     """
     Book store unittest class.
     """
@@ -131,6 +154,584 @@ class TestBookStore(unittest.TestCase):
             self.assertTrue(mock_print.called)
             mock_print.assert_any_call("No book found with title 'nonexistent'.")
 
+    def test_book_store_search_book_duplicate_titles(self):
+        """
+        Checks the search returns every book sharing a title, in insertion order.
+        """
+        book1 = Book("Dune", "author1", 9.99, 5)
+        book2 = Book("title2", "author2", 19.99, 3)
+        book3 = Book("DUNE", "author3", 4.99, 1)
+
+        book_store = BookStore()
+        with patch("builtins.print"):
+            book_store.add_book(book1)
+            book_store.add_book(book2)
+            book_store.add_book(book3)
+
+        with patch("builtins.print") as mock_print:
+            book_store.search_book("dune")
+            mock_print.assert_any_call("Found 2 book(s) with title 'dune':")
+            mock_print.assert_any_call("Author: author1")
+            mock_print.assert_any_call("Author: author3")
+            self.assertEqual(mock_print.call_count, 9)
+
+    def test_book_store_search_book_appended_directly(self):
+        """
+        Checks books appended straight to the list are still found.
+        """
+        book_store = BookStore()
+        book_store.books.append(Book("title1", "author1", 9.99, 5))
+
+        with patch("builtins.print") as mock_print:
+            book_store.search_book("TITLE1")
+            mock_print.assert_any_call("Found 1 book(s) with title 'TITLE1':")
+
+            book_store.books = [Book("title2", "author2", 19.99, 3)]
+            book_store.search_book("title1")
+            mock_print.assert_any_call("No book found with title 'title1'.")
+
+    def test_book_store_books_assigned_list(self):
+        """
+        Checks an assigned list is kept as is and books added to it are found.
+        """
+        dune = Book("Dune", "Frank Herbert", 9.99, 5)
+        emma = Book("Emma", "Jane Austen", 5.99, 2)
+        books = [dune]
+        book_store = BookStore()
+        book_store.books = books
+        self.assertIs(book_store.books, books)
+        self.assertEqual(book_store.find_books("dune"), [dune])
+        books.append(emma)
+        self.assertEqual(book_store.find_books("emma"), [emma])
+        book_store.books += [Book("Ulysses", "James Joyce", 25.0, 1)]
+        self.assertIs(book_store.books, books)
+        self.assertEqual(len(book_store.find_books("ulysses")), 1)
+        self.assertEqual(book_store.stats()["books"], 3)
+
+        tracked = BookList([dune])
+        book_store.books = tracked
+        self.assertIs(book_store.books, tracked)
+        tracked[0] = emma
+        self.assertEqual(book_store.find_books("emma"), [emma])
+        self.assertEqual(book_store.find_books("dune"), [])
+
+    def test_book_store_books_replaced_or_renamed(self):
+        """
+        Checks lookups follow books replaced, removed or renamed in place.
+        """
+        book_store = BookStore()
+        book_store.add_books(
+            [Book("Old", "author1", 9.99, 5), Book("Emma", "Jane Austen", 5.99, 2)]
+        )
+        self.assertEqual(len(book_store.find_books("old")), 1)
+
+        new = Book("New", "author2", 4.0, 1)
+        book_store.books[0] = new
+        self.assertEqual(book_store.find_books("new"), [new])
+        self.assertEqual(book_store.find_books("old"), [])
+        self.assertEqual(book_store.stats()["total_value"], 4.0 + 5.99 * 2)
+
+        new.title = "Renamed"
+        new.author = "Someone"
+        self.assertEqual(book_store.find_books("renamed"), [new])
+        self.assertEqual(list(book_store.search("someone")), [new])
+        self.assertEqual(book_store.find_books("new"), [])
+
+        del book_store.books[0]
+        self.assertEqual(book_store.find_books("renamed"), [])
+        self.assertEqual(book_store.find_books("emma"), [book_store.books[0]])
+
+        compact = BookStore(compact=True)
+        compact.add_books([Book("Old", "author1", 9.99, 5)])
+        compact.books[0].title = "New"
+        self.assertEqual([book.title for book in compact.find_books("new")], ["New"])
+
+    def test_book_store_search_substring(self):
+        """
+        Checks the substring search covers titles and authors.
+        """
+        book1 = Book("Dune", "Frank Herbert", 9.99, 5)
+        book2 = Book("Emma", "Jane Austen", 5.99, 2)
+
+        book_store = BookStore()
+        with patch("builtins.print"):
+            book_store.add_book(book1)
+            book_store.add_book(book2)
+
+        self.assertEqual(list(book_store.search("un")), [book1])
+        self.assertEqual(list(book_store.search("AUSTEN")), [book2])
+        self.assertEqual(list(book_store.search("e")), [book1, book2])
+        self.assertEqual(list(book_store.search("m", fields=("title",))), [book2])
+
+        book3 = Book("Children of Dune", "Frank Herbert", 7.99, 1)
+        with patch("builtins.print"):
+            book_store.add_book(book3)
+        self.assertEqual(list(book_store.search("dune")), [book1, book3])
+
+    def test_book_store_load_from_stream(self):
+        """
+        Checks a JSONL stream is loaded silently and indexed.
+        """
+        stream = StringIO(
+            '{"title": "Dune", "author": "Frank Herbert", "price": 9.99, '
+            '"quantity": 5}\n'
+            '{"title": "Emma", "author": "Jane Austen", "price": 5.5, '
+            '"quantity": 2}\n'
+        )
+        book_store = BookStore()
+        with patch("builtins.print") as mock_print:
+            report = book_store.load_from(stream, batch_size=1)
+            mock_print.assert_not_called()
+
+        self.assertEqual(report["rows"], 2)
+        self.assertGreaterEqual(report["rows_per_second"], 0)
+        self.assertEqual([book.title for book in book_store.books], ["Dune", "Emma"])
+        self.assertEqual(len(book_store.find_books("EMMA")), 1)
+        self.assertEqual(len(list(book_store.search("austen"))), 1)
+
+    def test_book_store_load_from_path(self):
+        """
+        Checks a CSV file is loaded from its path.
+        """
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".csv", delete=False, encoding="utf-8"
+        ) as catalog:
+            catalog.write("title,author,price,quantity\nDune,Frank Herbert,9.99,5\n")
+        self.addCleanup(os.remove, catalog.name)
+
+        book_store = BookStore()
+        report = book_store.load_from(catalog.name)
+        self.assertEqual(report["rows"], 1)
+        self.assertEqual(book_store.books[0].author, "Frank Herbert")
+        self.assertEqual(book_store.books[0].quantity, 5)
+
+    def test_book_store_compact(self):
+        """
+        Checks a compact store keeps books in columns and still searches them.
+        """
+        book_store = BookStore(compact=True)
+        with patch("builtins.print") as mock_print:
+            book_store.add_book(Book("Dune", "Frank Herbert", 9.99, 5))
+            book_store.add_book(Book("Emma", "Jane Austen", 5.5, 2))
+            mock_print.assert_called_with("Book 'Emma' added to the store.")
+
+        self.assertEqual(len(book_store.books), 2)
+        self.assertEqual(book_store.find_books("dune"), [book_store.books[0]])
+        self.assertEqual(list(book_store.search("austen")), [book_store.books[1]])
+
+        with patch("builtins.print") as mock_print:
+            book_store.display_books()
+            self.assertEqual(mock_print.call_count, 9)
+            mock_print.assert_any_call("Price: $5.5")
+
+    def test_book_store_open(self):
+        """
+        Checks a store opened on a catalog file persists its books.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "catalog.bin")
+            book_store = BookStore.open(path)
+            with patch("builtins.print"):
+                book_store.add_book(Book("Dune", "Frank Herbert", 9.99, 5))
+            book_store.books.close()
+
+            book_store = BookStore.open(path)
+            self.assertEqual(len(book_store.books), 1)
+            self.assertEqual(book_store.find_books("DUNE")[0].price, 9.99)
+            with patch("builtins.print"):
+                book_store.add_book(Book("Emma", "Jane Austen", 5.5, 2))
+            self.assertEqual(list(book_store.search("austen"))[0].title, "Emma")
+            book_store.books.close()
+
+    def test_book_store_open_title_lookup(self):
+        """
+        Checks title lookups on a reopened catalog go through its title
+        index instead of decoding every book, and see books added since.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "catalog.bin")
+            book_store = BookStore.open(path)
+            book_store.add_books([Book(f"Title {i}", "A", 1.0, 1) for i in range(50)])
+            self.assertEqual(len(book_store.find_books("title 7")), 1)
+            book_store.books.close()
+
+            book_store = BookStore.open(path)
+            with patch("builtins.print"):
+                book_store.add_book(Book("Title 7", "B", 2.0, 1))
+            with patch.object(
+                CatalogFile, "__getitem__", wraps=book_store.books.__getitem__
+            ) as getitem:
+                found = book_store.find_books("TITLE 7")
+            self.assertEqual([book.author for book in found], ["A", "B"])
+            self.assertEqual(getitem.call_count, 2)
+            self.assertEqual(len(list(book_store.search("title 4"))), 1 + 10)
+            book_store.books.close()
+
+    def test_book_store_open_secondary_indexes_first(self):
+        """
+        Checks stats, search and price queries made first after opening and
+        adding a book see it.
+        """
+        queries = {
+            "stats": lambda store: store.stats()["total_value"],
+            "search": lambda store: len(list(store.search("herbert"))),
+            "cheapest": lambda store: len(list(store.cheapest_books())),
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            for name, query in queries.items():
+                book_store = BookStore.open(os.path.join(directory, name))
+                book_store.add_books([Book("Dune", "Frank Herbert", 2.0, 3)])
+                self.assertEqual(query(book_store), 6.0 if name == "stats" else 1)
+                book_store.books.close()
+
+    def test_book_store_secondary_indexes_after_replace_or_rename(self):
+        """
+        Checks stats, search and price queries made first after a book is
+        replaced or renamed see the change, then and later.
+        """
+        for change in ("replace", "rename"):
+            book_store = BookStore()
+            dune = Book("Dune", "Frank Herbert", 2.0, 3)
+            book_store.add_books([dune])
+            self.assertEqual(book_store.stats()["books"], 1)
+            self.assertEqual(list(book_store.search("dune")), [dune])
+            self.assertEqual(list(book_store.cheapest_books()), [dune])
+            if change == "replace":
+                book = Book("Ulysses", "James Joyce", 3.0, 1)
+                book_store.books[0] = book
+            else:
+                book = dune
+                book.title = "Ulysses"
+            self.assertEqual(book_store.stats()["books"], 1)
+            self.assertEqual(list(book_store.search("ulys")), [book])
+            self.assertEqual(list(book_store.cheapest_books()), [book])
+
+            emma = Book("Emma", "Jane Austen", 1.0, 1)
+            book_store.add_books([emma])
+            self.assertEqual(book_store.stats()["books"], 2)
+            self.assertEqual(list(book_store.search("ulys")), [book])
+            self.assertEqual(list(book_store.cheapest_books()), [emma, book])
+
+    def test_book_store_display_books_out(self):
+        """
+        Checks writing to a stream produces exactly the printed text.
+        """
+        book_store = BookStore()
+        printed = StringIO()
+        written = StringIO()
+        with redirect_stdout(printed):
+            book_store.display_books()
+        book_store.display_books(out=written)
+        self.assertEqual(written.getvalue(), printed.getvalue())
+
+        with patch("builtins.print"):
+            for i in range(5):
+                book_store.add_book(Book(f"title{i}", f"author{i}", 9.99 + i, i))
+
+        printed = StringIO()
+        written = StringIO()
+        with redirect_stdout(printed):
+            book_store.display_books()
+        with patch("builtins.print") as mock_print:
+            book_store.display_books(out=written)
+            mock_print.assert_not_called()
+        self.assertEqual(written.getvalue(), printed.getvalue())
+
+    def test_book_store_display_books_pages(self):
+        """
+        Checks the stream gets one write per page.
+        """
+        book_store = BookStore()
+        book_store.books.extend(Book(f"t{i}", "a", 1, 1) for i in range(5))
+        out = MagicMock()
+        book_store.display_books(out=out, page_size=2)
+        self.assertEqual(out.write.call_count, 3)
+        self.assertEqual(len(list(book_store.iter_display(page_size=5))), 1)
+        self.assertEqual(
+            "".join(book_store.iter_display(page_size=2)),
+            "".join(call.args[0] for call in out.write.call_args_list),
+        )
+
+    def test_book_store_search_book_out(self):
+        """
+        Checks search results written to a stream match the printed text.
+        """
+        book_store = BookStore()
+        book_store.books.extend(
+            [Book("Dune", "a1", 1, 1), Book("dune", "a2", 2, 2), Book("x", "a", 3, 3)]
+        )
+        for title in ("DUNE", "missing"):
+            printed = StringIO()
+            written = StringIO()
+            with redirect_stdout(printed):
+                book_store.search_book(title)
+            book_store.search_book(title, out=written)
+            self.assertEqual(written.getvalue(), printed.getvalue())
+
+    def test_book_store_stats(self):
+        """
+        Checks the aggregates follow adds and price or quantity changes.
+        """
+        book1 = Book("Dune", "Frank Herbert", 10.0, 3)
+        book2 = Book("Emma", "Jane Austen", 5.0, 0)
+        book_store = BookStore()
+        self.assertEqual(book_store.stats()["books"], 0)
+
+        with patch("builtins.print"):
+            book_store.add_book(book1)
+        book_store.add_books([book2])
+        stats = book_store.stats()
+        self.assertEqual(stats["books"], 2)
+        self.assertEqual(stats["total_value"], 30.0)
+        self.assertEqual(stats["out_of_stock"], 1)
+
+        book1.quantity = 0
+        book2.quantity = 4
+        book2.price = 2.5
+        stats = book_store.stats()
+        self.assertEqual(stats["total_value"], 10.0)
+        self.assertEqual(stats["out_of_stock"], 1)
+        self.assertEqual(
+            dict(stats["units_by_author"]), {"Frank Herbert": 0, "Jane Austen": 4}
+        )
+
+    def test_book_store_stats_shared_books(self):
+        """
+        Checks a book added twice or to two stores keeps every total right.
+        """
+        book = Book("Dune", "Frank Herbert", 10.0, 1)
+        first, second = BookStore(), BookStore()
+        first.add_books([book, book])
+        second.add_books([book])
+        self.assertEqual(book.stores, (first, second))
+
+        book.quantity = 5
+        self.assertEqual(first.stats()["total_value"], 100.0)
+        self.assertEqual(second.stats()["total_value"], 50.0)
+        book.price = 2.0
+        self.assertEqual(first.stats()["total_value"], 20.0)
+        self.assertEqual(second.stats()["total_value"], 10.0)
+        self.assertEqual(list(first.cheapest_books()), [book, book])
+        self.assertEqual(list(second.books_in_price_range(1, 3)), [book])
+
+    def test_book_store_indexes_built_on_use(self):
+        """
+        Checks each index is built on first use and follows later changes.
+        """
+        dune = Book("Dune", "Frank Herbert", 10.0, 1)
+        emma = Book("Emma", "Jane Austen", 4.0, 2)
+        book_store = BookStore()
+        book_store.add_books([dune])
+        self.assertEqual(book_store.find_books("dune"), [dune])
+        dune.price = 6.0
+        book_store.add_books([emma])
+        self.assertEqual(book_store.stats()["total_value"], 14.0)
+        emma.quantity = 3
+        self.assertEqual(list(book_store.cheapest_books()), [emma, dune])
+        emma.price = 8.0
+        self.assertEqual(list(book_store.cheapest_books()), [dune, emma])
+        self.assertEqual(book_store.stats()["total_value"], 30.0)
+        self.assertEqual(list(book_store.search("austen")), [emma])
+
+    def test_book_store_stats_compact(self):
+        """
+        Checks changes made through compact views are tracked too.
+        """
+        book_store = BookStore(compact=True)
+        book_store.add_books([Book("Dune", "Frank Herbert", 10.0, 3)])
+        book_store.books[0].quantity = 1
+        book_store.books[0].price = 4.0
+        self.assertEqual(book_store.stats()["total_value"], 4.0)
+        self.assertEqual(book_store.stats()["units_by_author"]["Frank Herbert"], 1)
+
+    def test_book_store_fuzzy_search(self):
+        """
+        Checks misspelled titles still find the closest books first.
+        """
+        book1 = Book("Dune", "Frank Herbert", 9.99, 5)
+        book2 = Book("Dune Messiah", "Frank Herbert", 8.99, 2)
+        book3 = Book("Pride and Prejudice", "Jane Austen", 5.99, 2)
+        book_store = BookStore()
+        book_store.add_books([book1, book2, book3])
+
+        self.assertEqual(book_store.fuzzy_search("Prde and Prejudise"), [book3])
+        self.assertEqual(book_store.fuzzy_search("dnue"), [book1])
+        self.assertEqual(book_store.fuzzy_search("Dune Mesiah", limit=1), [book2])
+        self.assertEqual(book_store.fuzzy_search("Dune Mesiah", max_distance=0), [])
+
+        book4 = Book("Dune Mesiah", "Anonymous", 1.0, 1)
+        book_store.books.append(book4)
+        self.assertEqual(book_store.fuzzy_search("Dune Mesiah"), [book4, book2])
+
+    def test_book_store_price_queries(self):
+        """
+        Checks price range and cheapest queries follow price and stock changes.
+        """
+        book1 = Book("Dune", "Frank Herbert", 9.99, 5)
+        book2 = Book("Emma", "Jane Austen", 5.99, 0)
+        book3 = Book("Ulysses", "James Joyce", 25.0, 1)
+        book_store = BookStore()
+        book_store.add_books([book1, book2, book3])
+
+        self.assertEqual(list(book_store.books_in_price_range(5, 10)), [book2, book1])
+        self.assertEqual(
+            list(book_store.books_in_price_range(5, 10, in_stock=True)), [book1]
+        )
+        self.assertEqual(list(book_store.cheapest_books()), [book1, book3])
+        self.assertEqual(list(book_store.cheapest_books(1, in_stock=False)), [book2])
+
+        book3.price = 4.0
+        book1.quantity = 0
+        book2.quantity = 3
+        self.assertEqual(list(book_store.cheapest_books()), [book3, book2])
+        self.assertEqual(
+            list(book_store.books_in_price_range(0, 100)), [book3, book2, book1]
+        )
+
+    def test_book_store_price_queries_changed_while_iterating(self):
+        """
+        Checks books changed during a price query are each visited once.
+        """
+        books = [Book(f"title{i}", "author", float(i + 1), 1) for i in range(6)]
+        book_store = BookStore()
+        book_store.add_books(books)
+
+        visited = []
+        for book in book_store.cheapest_books():
+            book.quantity = 0
+            visited.append(book)
+        self.assertEqual(visited, books)
+        self.assertEqual(list(book_store.cheapest_books()), [])
+
+        visited = []
+        for book in book_store.books_in_price_range(2, 4):
+            book.price += 10
+            visited.append(book)
+        self.assertEqual(visited, books[1:4])
+        self.assertEqual(list(book_store.books_in_price_range(2, 4)), [])
+
+    def test_book_store_price_queries_compact(self):
+        """
+        Checks price queries follow changes made through compact views.
+        """
+        book_store = BookStore(compact=True)
+        book_store.add_books(
+            [
+                Book("Dune", "Frank Herbert", 9.99, 5),
+                Book("Emma", "Jane Austen", 5.99, 2),
+            ]
+        )
+        book_store.books[1].price = 12.0
+        titles = [book.title for book in book_store.cheapest_books()]
+        self.assertEqual(titles, ["Dune", "Emma"])
+
+    def test_book_store_search_cache(self):
+        """
+        Checks repeated searches are served from the cache until a book with
+        the same title is added or changed.
+        """
+        book1 = Book("Dune", "Frank Herbert", 9.99, 5)
+        book_store = BookStore()
+        book_store.add_books([book1, Book("Emma", "Jane Austen", 5.99, 2)])
+
+        first, second = StringIO(), StringIO()
+        book_store.search_book("dune", out=first)
+        book_store.search_book("DUNE", out=second)
+        book_store.search_book("emma", out=StringIO())
+        self.assertEqual(second.getvalue(), first.getvalue().replace("dune", "DUNE"))
+        info = book_store.search_cache_info()
+        self.assertEqual((info["hits"], info["misses"], info["size"]), (1, 2, 2))
+
+        book_store.add_books([Book("Ulysses", "James Joyce", 12.0, 1)])
+        book_store.search_book("emma", out=StringIO())
+        self.assertEqual(book_store.search_cache_info()["hits"], 2)
+
+        book_store.books.append(Book("DUNE", "Someone Else", 1.0, 1))
+        book1.price = 4.0
+        out = StringIO()
+        book_store.search_book("dune", out=out)
+        self.assertIn("Found 2 book(s)", out.getvalue())
+        self.assertIn("Price: $4.0", out.getvalue())
+        self.assertEqual(book_store.search_cache_info()["misses"], 3)
+
+        book1.quantity = 0
+        with patch("builtins.print") as mock_print:
+            book_store.search_book("dune")
+        mock_print.assert_any_call("Quantity: 0")
+        self.assertEqual(book_store.search_cache_info()["misses"], 4)
+
+    def test_book_store_search_cache_evictions(self):
+        """
+        Checks the cache stays bounded and counts evictions.
+        """
+        book_store = BookStore(search_cache_size=2)
+        for title in ["a", "b", "c", "a"]:
+            book_store.search_book(title, out=StringIO())
+        info = book_store.search_cache_info()
+        self.assertEqual((info["size"], info["evictions"], info["misses"]), (2, 2, 4))
+
+    def test_book_store_merge_duplicates(self):
+        """
+        Checks merge mode adds the quantity of known books to their row.
+        """
+        book_store = BookStore(merge_duplicates=True)
+        counts = book_store.add_books(
+            [
+                Book("Dune", "Frank Herbert", 9.99, 5),
+                Book("Emma", "Jane Austen", 5.99, 0),
+                Book(" DUNE ", "frank  herbert", 7.99, 2),
+                Book("Dune", "Someone Else", 1.0, 1),
+            ]
+        )
+        self.assertEqual(counts, {"inserted": 3, "merged": 1})
+        self.assertEqual(len(book_store.books), 3)
+        self.assertEqual(book_store.books[0].quantity, 7)
+        self.assertEqual(book_store.books[0].price, 9.99)
+
+        with patch("builtins.print") as mock_print:
+            book_store.add_book(Book("emma", "Jane Austen", 5.99, 4))
+        mock_print.assert_called_once_with(
+            "Book 'emma' already in the store, quantity updated."
+        )
+        self.assertEqual(book_store.add_counts(), {"inserted": 3, "merged": 2})
+        self.assertEqual(book_store.stats()["out_of_stock"], 0)
+        self.assertAlmostEqual(
+            book_store.stats()["total_value"], 9.99 * 7 + 5.99 * 4 + 1.0
+        )
+        self.assertEqual(
+            [book.title for book in book_store.cheapest_books()],
+            ["Dune", "Emma", "Dune"],
+        )
+
+    def test_book_store_merge_duplicates_compact(self):
+        """
+        Checks merge mode works on compact stores, within a single batch too.
+        """
+        book_store = BookStore(compact=True, merge_duplicates=True)
+        counts = book_store.add_books(
+            [
+                Book("Dune", "Frank Herbert", 9.99, 5),
+                Book("Dune", "Frank Herbert", 9.99, 1),
+            ]
+        )
+        self.assertEqual(counts, {"inserted": 1, "merged": 1})
+        self.assertEqual(book_store.books[0].quantity, 6)
+        self.assertEqual(book_store.stats()["units_by_author"]["Frank Herbert"], 6)
+
+    def test_book_store_load_from_merge(self):
+        """
+        Checks bulk loads report merged and inserted rows.
+        """
+        catalog = StringIO(
+            "title,author,price,quantity\n"
+            "Dune,Frank Herbert,9.99,5\n"
+            "Dune,Frank Herbert,9.99,5\n"
+        )
+        report = BookStore(merge_duplicates=True).load_from(catalog)
+        self.assertEqual(
+            (report["rows"], report["inserted"], report["merged"]), (2, 1, 1)
+        )
+
 
 class TestMain(unittest.TestCase):
     """Class that tests the main function of the original file."""
@@ -146,6 +146,22 @@ class TestCalculateOrderTotal(unittest.TestCase):
         expected = (3 * 10) + (0.95 * 8 * 20) + (0.9 * 12 * 5)
         self.assertEqual(calculate_order_total(items), expected)
 
+    def test_calculate_order_total_exact_cents(self):
+        """Checks discounted lines round half to even to whole cents"""
+        items = [{"quantity": 7, "price": 0.1}, {"quantity": 11, "price": 19.99}]
+        total = calculate_order_total(items)
+        # 0.70 * 0.95 = 0.665 rounds to 0.66, 219.89 * 0.9 = 197.901 to 197.90
+        self.assertEqual(total.cents, 66 + 19790)
+        self.assertEqual(str(total), "198.56")
+
+    def test_calculate_order_total_float_path(self):
+        """Checks the Money total converts to float or takes a rate"""
+        total = calculate_order_total([{"quantity": 2, "price": 10}])
+        self.assertEqual(round(float(total) * 1.16, 2), 23.2)
+        self.assertEqual(total.times(1.16), 23.2)
+        with self.assertRaises(TypeError):
+            total * 1.16  # pylint: disable=pointless-statement
+
     def test_calculate_order_total_empty_list(self):
         """Checks order total for empty items list"""
         items = []
@@ -0,0 +1,79 @@
+"""
+Tests for the fee schedule.
+"""
+
+import unittest
+from unittest.mock import patch
+
+from white_box import fee_schedule
+from white_box.fee_schedule import DEFAULT_RATES, FeeSchedule
+from white_box.money import to_cents
+
+
+class TestFeeSchedule(unittest.TestCase):
+    """Tests for the FeeSchedule class."""
+
+    def setUp(self):
+        self.schedule = FeeSchedule()
+        self.amounts = [100, 250.5, 10, 0, 0.25]
+        self.types = ["regular", "express", "scheduled", "regular", "regular"]
+
+    def test_lookup(self):
+        """Checks rates, codes and single fees follow the table."""
+        self.assertEqual(self.schedule.rates, DEFAULT_RATES)
+        self.assertEqual(self.schedule.types, list(DEFAULT_RATES))
+        self.assertEqual(self.schedule.code("express"), 1)
+        self.assertEqual(self.schedule.fee(250, "regular"), 5)
+        self.assertEqual(self.schedule.fee(0.25, "regular").cents, 0)
+        with self.assertRaises(ValueError):
+            self.schedule.fee(250, "instant")
+
+    def test_set_rate_keeps_codes(self):
+        """Checks updating a rate keeps codes and new types get the next one."""
+        self.schedule.set_rate("regular", 0.03)
+        self.schedule.set_rate("instant", 0.1)
+        self.assertEqual(self.schedule.code("regular"), 0)
+        self.assertEqual(self.schedule.code("instant"), 3)
+        self.assertAlmostEqual(self.schedule.fee(100, "regular"), 3)
+        self.assertAlmostEqual(self.schedule.fee(100, "instant"), 10)
+
+    def check_batch(self):
+        """Checks a batch prices each transfer like fee does, in cents."""
+        cents = [to_cents(amount) for amount in self.amounts]
+        fees, totals = self.schedule.batch_fees(cents, self.schedule.encode(self.types))
+        expected = [
+            self.schedule.fee(amount, transaction_type).cents
+            for amount, transaction_type in zip(self.amounts, self.types)
+        ]
+        self.assertEqual(list(fees), expected)
+        self.assertEqual(list(fees), [200, 1252, 10, 0, 0])
+        self.assertEqual(
+            list(totals), [amount + fee for amount, fee in zip(cents, expected)]
+        )
+        with self.assertRaises(ValueError):
+            self.schedule.batch_fees([1, 2], [0, 3])
+        with self.assertRaises(ValueError):
+            self.schedule.batch_fees([1, 2], [0, -1])
+        with self.assertRaises(ValueError):
+            self.schedule.batch_fees([1, 2], [0])
+
+    def test_batch_fees_fallback(self):
+        """Checks the pure Python batch path."""
+        with patch.object(fee_schedule, "np", None):
+            self.check_batch()
+            fees, totals = self.schedule.batch_fees([], [])
+            self.assertEqual((len(fees), len(totals)), (0, 0))
+
+    @unittest.skipUnless(fee_schedule.np, "NumPy is not installed")
+    def test_batch_fees_numpy(self):
+        """Checks the vectorized path and that rate updates reach it."""
+        self.check_batch()
+        self.schedule.set_rate("regular", 0.5)
+        fees, _ = self.schedule.batch_fees(
+            fee_schedule.np.array([1000]), fee_schedule.np.array([0])
+        )
+        self.assertEqual(fees.tolist(), [500])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,7 @@
 import unittest
 from unittest.mock import patch
 
+from white_box.fee_schedule import FeeSchedule
 from white_box.integration_exercises import (  # pylint: disable=import-error
     BankAccount,
     BankingSystem,
@@ -31,6 +32,14 @@ class TestBankAccount(unittest.TestCase):
         )
         mock_print.assert_called_with(expected_msg)
 
+    @patch("builtins.print")
+    def test_view_account_formats_cents(self, mock_print):
+        """Test balances print whole amounts bare and others with two decimals."""
+        BankAccount(1, 100.0).view_account()
+        mock_print.assert_called_with("The account 1 has a balance of 100")
+        BankAccount(2, 4.5).view_account()
+        mock_print.assert_called_with("The account 2 has a balance of 4.50")
+
 
 class TestBankingSystem(unittest.TestCase):
     """Testing Banking System class"""
@@ -38,7 +47,7 @@ class TestBankingSystem(unittest.TestCase):
     def setUp(self):
         self.banking_system = BankingSystem()
         self.assertDictEqual(self.banking_system.users, {"user123": "pass123"})
-        self.assertSetEqual(self.banking_system.logged_in_users, set())
+        self.assertSetEqual(set(self.banking_system.logged_in_users), set())
 
     @patch("builtins.print")
     def test_authenticate(self, mock_print):
@@ -155,6 +164,131 @@ class TestBankingSystem(unittest.TestCase):
 
         mock_print.assert_called_with("Insufficient funds.")
 
+    @patch("builtins.print")
+    def test_transfer_money_moves_money(self, _mock_print):
+        """Test a transfer debits the sender and credits the receiver."""
+        self.banking_system.authenticate("user123", "pass123")
+        self.banking_system.transfer_money("user123", "ian", 250, "regular")
+        self.assertEqual(self.banking_system.account("user123").balance, 745)
+        self.assertEqual(self.banking_system.account("ian").balance, 250)
+        self.assertEqual(self.banking_system.fees_collected, 5)
+
+    @patch("builtins.print")
+    def test_transfer_money_fee_schedule(self, mock_print):
+        """Test fees and valid types follow the system's fee schedule."""
+        system = BankingSystem(FeeSchedule({"regular": 0.1, "instant": 0.2}))
+        system.authenticate("user123", "pass123")
+        self.assertTrue(system.transfer_money("user123", "ian", 100, "instant"))
+        self.assertEqual(system.fees_collected, 20)
+        system.fee_schedule.set_rate("regular", 0.5)
+        self.assertTrue(system.transfer_money("user123", "ian", 100, "regular"))
+        self.assertEqual(system.account("user123").balance, 730)
+        self.assertFalse(system.transfer_money("user123", "ian", 100, "express"))
+        mock_print.assert_called_with("Invalid transaction type.")
+
+    @patch("builtins.print")
+    def test_transfer_money_idempotent_retry(self, mock_print):
+        """Test a retry with the same key returns the original outcome once."""
+        self.banking_system.authenticate("user123", "pass123")
+        for _ in range(3):
+            self.assertTrue(
+                self.banking_system.transfer_money(
+                    "user123", "ian", 250, "regular", idempotency_key="k1"
+                )
+            )
+            mock_print.assert_called_with(
+                "Money transfer of $250 (regular transfer)"
+                " from user123 to ian processed successfully."
+            )
+        self.assertEqual(self.banking_system.account("ian").balance, 250)
+        self.assertEqual(self.banking_system.idempotency_cache.info()["hits"], 2)
+
+        self.assertFalse(
+            self.banking_system.transfer_money(
+                "user123", "ian", 100, "regular", idempotency_key="k1"
+            )
+        )
+        mock_print.assert_called_with(
+            "Idempotency key already used for another transfer."
+        )
+        self.assertTrue(
+            self.banking_system.transfer_money(
+                "user123", "ian", 100, "regular", idempotency_key="k2"
+            )
+        )
+        self.assertEqual(self.banking_system.account("ian").balance, 350)
+
+    @patch("builtins.print")
+    def test_transfer_money_retry_after_transient_rejection(self, mock_print):
+        """Test only final outcomes are kept for retries with the same key."""
+        transfer = ("user123", "ian", 250, "regular")
+        self.assertFalse(self.banking_system.transfer_money(*transfer, "k1"))
+        mock_print.assert_called_with("Sender not authenticated.")
+        self.banking_system.authenticate("user123", "pass123")
+        self.assertFalse(
+            self.banking_system.transfer_money("user123", "ian", 5000, "regular", "k1")
+        )
+        mock_print.assert_called_with("Insufficient funds.")
+        self.assertTrue(self.banking_system.transfer_money(*transfer, "k1"))
+        self.assertTrue(self.banking_system.transfer_money(*transfer, "k1"))
+        self.assertEqual(self.banking_system.account("ian").balance, 250)
+
+        for _ in range(2):
+            self.assertFalse(
+                self.banking_system.transfer_money(
+                    "user123", "ian", 10, "wire", idempotency_key="k2"
+                )
+            )
+        mock_print.assert_called_with("Invalid transaction type.")
+        self.assertEqual(self.banking_system.idempotency_cache.info()["hits"], 2)
+
+    @patch("builtins.print")
+    def test_transfer_money_balance_runs_out(self, mock_print):
+        """Test later transfers see the balance left by earlier ones."""
+        self.banking_system.authenticate("user123", "pass123")
+        self.assertTrue(
+            self.banking_system.transfer_money("user123", "ian", 900, "scheduled")
+        )
+        self.assertFalse(
+            self.banking_system.transfer_money("user123", "ian", 100, "scheduled")
+        )
+        mock_print.assert_called_with("Insufficient funds.")
+        self.assertEqual(self.banking_system.account("user123").balance, 91)
+
+    @patch("builtins.print")
+    def test_transfer_money_invalid_amount(self, mock_print):
+        """Test negative and zero amounts are rejected."""
+        self.banking_system.authenticate("user123", "pass123")
+        for amount in (0, -50):
+            self.assertFalse(
+                self.banking_system.transfer_money("user123", "ian", amount, "regular")
+            )
+            mock_print.assert_called_with("Invalid amount.")
+        self.assertEqual(self.banking_system.account("user123").balance, 1000)
+
+    @patch("builtins.print")
+    def test_transfer_batch(self, mock_print):
+        """Test a batch reports accepted and rejected transfers without printing."""
+        self.banking_system.authenticate("user123", "pass123")
+        mock_print.reset_mock()
+        report = self.banking_system.transfer_batch(
+            [
+                ("user123", "ian", 500, "regular"),
+                ("ian", "user123", 100, "regular"),
+                ("user123", "ana", 100, "other"),
+                ("user123", "ana", 490, "express"),
+                ("user123", "ana", 10, "scheduled"),
+            ]
+        )
+        self.assertEqual(report["accepted"], [0, 4])
+        self.assertEqual(
+            report["rejected"],
+            [(1, "not_authenticated"), (2, "invalid_type"), (3, "insufficient_funds")],
+        )
+        mock_print.assert_not_called()
+        self.assertAlmostEqual(self.banking_system.account("user123").balance, 479.9)
+        self.assertEqual(self.banking_system.account("ana").balance, 10)
+
 
 class TestProduct(unittest.TestCase):
     """Test cases for Product class."""
@@ -244,3 +378,22 @@ class TestShoppingCart(unittest.TestCase):
         self.shopping_cart.checkout()
         mock_print.assert_any_call(f"Total: ${total}")
         mock_print.assert_any_call("Checkout completed. Thank you for shopping!")
+
+    @patch("builtins.print")
+    def test_checkout_exact_cents(self, mock_print):
+        """Test checkout adds fractional prices without float drift."""
+        self.shopping_cart.add_product(Product("Pen", 0.1), 3)
+        self.shopping_cart.add_product(Product("Book", 19.99), 3)
+        self.shopping_cart.checkout()
+        mock_print.assert_any_call("Total: $60.27")
+
+    @patch("builtins.print")
+    def test_view_cart_and_checkout_format_cents(self, mock_print):
+        """Test fractional amounts print with two decimals."""
+        self.shopping_cart.add_product(Product("Pen", 1.5), 3)
+        self.shopping_cart.add_product(Product("Pad", 3), 1)
+        self.shopping_cart.view_cart()
+        mock_print.assert_any_call("3 x Pen - $4.50")
+        mock_print.assert_any_call("1 x Pad - $3")
+        self.shopping_cart.checkout()
+        mock_print.assert_any_call("Total: $7.50")
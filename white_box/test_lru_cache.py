@@ -0,0 +1,103 @@
+"""
+Tests for the bounded LRU cache.
+"""
+
+import unittest
+
+from white_box.lru_cache import LRUCache, TTLCache
+
+
+class TestLRUCache(unittest.TestCase):
+    """Tests for the LRUCache class."""
+
+    def test_get_missing(self):
+        """Checks a missing key returns the default."""
+        cache = LRUCache()
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("a", 0), 0)
+
+    def test_evicts_least_recently_used(self):
+        """Checks the entry used longest ago is dropped when full."""
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(len(cache), 2)
+
+    def test_put_existing_key(self):
+        """Checks overwriting a key replaces its value without growing."""
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("a", 2)
+        self.assertEqual(cache.get("a"), 2)
+        self.assertEqual(len(cache), 1)
+
+    def test_counters(self):
+        """Checks hits, misses and evictions are counted."""
+        cache = LRUCache(maxsize=1)
+        cache.get("a")
+        cache.put("a", 1)
+        cache.get("a")
+        cache.put("b", 2)
+        cache.discard("b")
+        cache.discard("missing")
+        self.assertEqual(
+            cache.info(),
+            {"hits": 1, "misses": 1, "evictions": 1, "size": 0, "maxsize": 1},
+        )
+
+    def test_clear(self):
+        """Checks clearing drops every entry."""
+        cache = LRUCache()
+        cache.put("a", 1)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+
+class TestTTLCache(unittest.TestCase):
+    """Tests for the TTLCache class."""
+
+    def setUp(self):
+        self.now = 0.0
+        self.cache = TTLCache(maxsize=2, ttl=10, clock=lambda: self.now)
+
+    def test_entries_expire(self):
+        """Checks entries are served until their ttl and then missed."""
+        self.cache.put("a", 1)
+        self.now = 9.5
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertIn("a", self.cache)
+        self.now = 10
+        self.assertNotIn("a", self.cache)
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_put_drops_expired_before_evicting(self):
+        """Checks expired entries make room before live ones are evicted."""
+        self.cache.put("a", 1)
+        self.now = 5
+        self.cache.put("b", 2)
+        self.now = 12
+        self.cache.put("c", 3)
+        self.assertEqual(self.cache.get("b"), 2)
+        self.cache.put("d", 4)
+        self.assertNotIn("c", self.cache)
+        self.assertEqual(
+            self.cache.info(),
+            {
+                "hits": 1,
+                "misses": 0,
+                "evictions": 1,
+                "size": 2,
+                "maxsize": 2,
+                "expirations": 1,
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Tests for the fixed-point money type.
+"""
+
+import unittest
+from decimal import ROUND_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_UP, Decimal
+
+from white_box.money import (
+    Money,
+    MoneyArray,
+    apply_rate,
+    divide_half_even,
+    rate_ppm,
+    to_cents,
+)
+
+
+class TestRates(unittest.TestCase):
+    """Tests for the conversion and rounding functions."""
+
+    def test_to_cents(self):
+        """Checks every kind of amount becomes whole cents."""
+        self.assertEqual(to_cents(12), 1200)
+        self.assertEqual(to_cents(0.1 + 0.2), 30)
+        self.assertEqual(to_cents(Decimal("19.99")), 1999)
+        self.assertEqual(to_cents(Money(5)), 5)
+        self.assertEqual(rate_ppm(0.02), 20_000)
+        self.assertEqual(rate_ppm(Decimal("0.95")), 950_000)
+
+    def test_apply_rate_roundings(self):
+        """Checks ties and non-ties for every rounding, both signs."""
+        cases = {
+            ROUND_HALF_EVEN: (2, 2, 3, -2),
+            ROUND_HALF_UP: (3, 2, 3, -3),
+            ROUND_DOWN: (2, 2, 2, -2),
+            ROUND_UP: (3, 3, 3, -3),
+        }
+        # 25 cents at 10% is 2.5, 21 cents is 2.1, 29 cents is 2.9.
+        for rounding, expected in cases.items():
+            self.assertEqual(
+                tuple(
+                    apply_rate(cents, 100_000, rounding) for cents in (25, 21, 29, -25)
+                ),
+                expected,
+                rounding,
+            )
+        self.assertEqual(apply_rate(35, 100_000), 4)
+        with self.assertRaises(ValueError):
+            apply_rate(25, 100_000, "ROUND_CEILING")
+
+    def test_divide_half_even_matches_apply_rate(self):
+        """Checks the batch rounding agrees with apply_rate."""
+        products = [cents * 100_000 for cents in range(-60, 60)]
+        self.assertEqual(
+            divide_half_even(products),
+            [apply_rate(cents, 100_000) for cents in range(-60, 60)],
+        )
+
+
+class TestMoney(unittest.TestCase):
+    """Tests for the Money class."""
+
+    def test_exact_sums(self):
+        """Checks sums do not drift like floats do."""
+        total = sum(Money.of(0.1) for _ in range(10))
+        self.assertEqual(total, 1)
+        self.assertEqual(total.cents, 100)
+        self.assertNotEqual(sum(0.1 for _ in range(10)), 1)
+
+    def test_compares_and_prints_like_units(self):
+        """Checks Money meets plain numbers in currency units."""
+        self.assertEqual(Money(74500), 745)
+        self.assertEqual(Money(47990), 479.9)
+        self.assertEqual(hash(Money(47990)), hash(479.9))
+        self.assertLess(Money(99), 1)
+        self.assertGreater(Money(101), Money(100))
+        self.assertEqual(str(Money(74500)), "745")
+        self.assertEqual(str(Money(47990)), "479.90")
+        self.assertEqual(str(Money(-5)), "-0.05")
+        self.assertEqual(repr(Money(5)), "Money('0.05')")
+
+    def test_arithmetic(self):
+        """Checks arithmetic stays in cents and rates round explicitly."""
+        self.assertEqual((Money(1000) - 2.5).cents, 750)
+        self.assertEqual((3 - Money(50)).cents, 250)
+        self.assertEqual((Money(333) * 3).cents, 999)
+        self.assertEqual(Money(1999).times(0.05).cents, 100)
+        self.assertEqual(Money(1999).times(0.05, ROUND_DOWN).cents, 99)
+        with self.assertRaises(TypeError):
+            Money(100) * 0.5  # pylint: disable=expression-not-assigned
+
+
+class TestMoneyArray(unittest.TestCase):
+    """Tests for the MoneyArray class."""
+
+    def test_batch(self):
+        """Checks totals and rates over a batch."""
+        amounts = MoneyArray.of([0.1, 19.99, 2])
+        amounts.append(Money(1))
+        self.assertEqual(len(amounts), 4)
+        self.assertEqual(amounts[1], 19.99)
+        self.assertEqual(amounts.total().cents, 2210)
+        for rounding in (ROUND_HALF_EVEN, ROUND_UP):
+            self.assertEqual(
+                list(amounts.times(0.05, rounding).cents),
+                [apply_rate(cents, 50_000, rounding) for cents in amounts.cents],
+            )
+        self.assertEqual(
+            [str(amount) for amount in amounts], ["0.10", "19.99", "2", "0.01"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
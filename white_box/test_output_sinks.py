@@ -0,0 +1,119 @@
+"""
+Tests for the output sinks.
+"""
+
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import call, patch
+
+from white_box.book_store import Book, BookStore
+from white_box.integration_exercises import BankingSystem, Product, ShoppingCart
+from white_box.output_sinks import (
+    BufferedSink,
+    NullSink,
+    QueueSink,
+    StdoutSink,
+    get_sink,
+    output,
+    set_sink,
+)
+
+
+def exercise(book_store, banking_system, cart):
+    """
+    Runs a bit of everything that shows messages.
+    """
+    book_store.add_book(Book("Dune", "Frank Herbert", 9.99, 5))
+    book_store.display_books()
+    book_store.search_book("dune")
+    book_store.search_book("emma")
+    banking_system.authenticate("user123", "pass123")
+    banking_system.transfer_money("user123", "ian", 250, "regular")
+    banking_system.transfer_money("user123", "ian", -1, "regular")
+    banking_system.account("user123").view_account()
+    cart.add_product(Product("Laptop", 1000), 2)
+    cart.view_cart()
+    cart.checkout()
+
+
+class TestSinks(unittest.TestCase):
+    """Tests for the sink classes."""
+
+    def test_stdout_sink_prints_lines(self):
+        """Checks each line gets its own print call."""
+        with patch("builtins.print") as mock_print:
+            self.assertEqual(StdoutSink().write("a\nb\n"), 4)
+            StdoutSink().write("")
+        self.assertEqual(mock_print.call_args_list, [call("a"), call("b")])
+
+    def test_buffered_sink(self):
+        """Checks text is written in bulk once the limit is reached."""
+        stream = StringIO()
+        with BufferedSink(stream, limit=6) as sink:
+            sink.write("abc")
+            self.assertEqual(stream.getvalue(), "")
+            sink.write("def")
+            self.assertEqual(stream.getvalue(), "abcdef")
+            sink.write("g")
+        self.assertEqual(stream.getvalue(), "abcdefg")
+
+    def test_queue_sink(self):
+        """Checks the writer thread keeps the order and flush waits for it."""
+        stream = StringIO()
+        with QueueSink(stream) as sink:
+            for number in range(1000):
+                sink.write(f"{number}\n")
+            sink.flush()
+            self.assertEqual(stream.getvalue().split(), [str(n) for n in range(1000)])
+            sink.write("last\n")
+        self.assertTrue(stream.getvalue().endswith("999\nlast\n"))
+        sink.close()
+
+    def test_set_sink(self):
+        """Checks the global sink can be swapped and restored."""
+        null = NullSink()
+        previous = set_sink(null)
+        try:
+            self.assertIs(get_sink(), null)
+            self.assertIs(output(None), null)
+            self.assertIsNot(output(previous), null)
+        finally:
+            set_sink(previous)
+        self.assertIs(get_sink(), previous)
+        set_sink(None)
+        self.assertIsInstance(get_sink(), StdoutSink)
+        set_sink(previous)
+
+
+class TestClassSinks(unittest.TestCase):
+    """Tests for the sinks of the exercise classes."""
+
+    def setUp(self):
+        self.printed = StringIO()
+        with redirect_stdout(self.printed):
+            exercise(BookStore(), BankingSystem(), ShoppingCart())
+
+    def test_per_instance_sink(self):
+        """Checks instance sinks get exactly the text that used to be printed."""
+        stream = StringIO()
+        sink = BufferedSink(stream)
+        with patch("builtins.print") as mock_print:
+            exercise(BookStore(sink=sink), BankingSystem(sink=sink), ShoppingCart(sink))
+            mock_print.assert_not_called()
+        sink.flush()
+        self.assertEqual(stream.getvalue(), self.printed.getvalue())
+
+    def test_global_sink(self):
+        """Checks instances without a sink follow the global one."""
+        stream = StringIO()
+        previous = set_sink(QueueSink(stream))
+        try:
+            exercise(BookStore(), BankingSystem(), ShoppingCart())
+        finally:
+            set_sink(previous).close()
+        self.assertEqual(stream.getvalue(), self.printed.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()